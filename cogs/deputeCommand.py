@@ -1,13 +1,71 @@
-from typing import Optional
+from typing import List, Optional
+
+import discord
+from discord import app_commands
 from discord.ext.commands import Context
 from typing_extensions import Self
 
 from handlers.deputeHandler import scr_handler, stat_handler, vote_handler, dep_handler, ciro_handler, nom_handler
 from utils.cogManager import ProtectedCog
 from utils.commandManager import protected_command
+from utils.dataManager import Dataset, current_dataset
 from utils.utils import send_embeds
 
 
+async def last_name_autocomplete(
+        _interaction: discord.Interaction,
+        current: str) -> List[app_commands.Choice[str]]:
+    """
+    Suggest the last names of the députés starting with the current input.
+
+    Parameters:
+        _interaction (discord.Interaction): The autocomplete interaction.
+        current (str): What the user has typed so far.
+    """
+    dataset: Dataset = current_dataset()
+    choices: List[app_commands.Choice[str]] = []
+    for depute in (dataset.database or dataset.deputes).complete_name(current):
+        choices.append(app_commands.Choice(
+            name=f"{depute.last_name} {depute.first_name} ({depute.dep}-{depute.circo})"[:100],
+            value=depute.last_name
+        ))
+    return choices
+
+
+async def code_dep_autocomplete(
+        _interaction: discord.Interaction,
+        current: str) -> List[app_commands.Choice[str]]:
+    """
+    Suggest the departments whose code or name starts with the current input.
+
+    Parameters:
+        _interaction (discord.Interaction): The autocomplete interaction.
+        current (str): What the user has typed so far.
+    """
+    dataset: Dataset = current_dataset()
+    return [
+        app_commands.Choice(name=f"{dep} ({dep_name})"[:100], value=dep)
+        for dep, dep_name in (dataset.database or dataset.deputes).complete_dep(current)
+    ]
+
+
+async def code_ref_autocomplete(
+        _interaction: discord.Interaction,
+        current: str) -> List[app_commands.Choice[str]]:
+    """
+    Suggest the scrutin numeros starting with the current input, most recent first.
+
+    Parameters:
+        _interaction (discord.Interaction): The autocomplete interaction.
+        current (str): What the user has typed so far.
+    """
+    dataset: Dataset = current_dataset()
+    return [
+        app_commands.Choice(name=f"Scrutin nº{numero}", value=numero)
+        for numero in (dataset.database or dataset.scrutins).complete(current.strip())
+    ]
+
+
 class DeputeCommand(ProtectedCog, name="depute"):
     """
     Cog that manages commands related to members of parliament (députés).
@@ -26,7 +84,9 @@ class DeputeCommand(ProtectedCog, name="depute"):
             last_name (str): The last name of the député.
             first_name (Optional[str]): The optional first name of the député.
         """
-        await send_embeds(context, lambda: nom_handler(last_name, first_name))
+        await send_embeds(context, nom_handler, last_name, first_name, cached=True)
+
+    nom.autocomplete("last_name")(last_name_autocomplete)
 
     @protected_command(
         name="stat",
@@ -41,7 +101,9 @@ class DeputeCommand(ProtectedCog, name="depute"):
             last_name (str): The last name of the député.
             first_name (Optional[str]): The optional first name of the député.
         """
-        await send_embeds(context, lambda: stat_handler(last_name, first_name))
+        await send_embeds(context, stat_handler, last_name, first_name, cached=True)
+
+    stat.autocomplete("last_name")(last_name_autocomplete)
 
     @protected_command(
         name="dep",
@@ -55,7 +117,9 @@ class DeputeCommand(ProtectedCog, name="depute"):
             context (Context): The context of the command.
             code_dep (str): Department code.
         """
-        await send_embeds(context, lambda: dep_handler(code_dep))
+        await send_embeds(context, dep_handler, code_dep, cached=True)
+
+    dep.autocomplete("code_dep")(code_dep_autocomplete)
 
     @protected_command(
         name="circo",
@@ -70,7 +134,9 @@ class DeputeCommand(ProtectedCog, name="depute"):
             code_dep (str): Department code.
             code_circo (str): Circonscription code.
         """
-        await send_embeds(context, lambda: ciro_handler(code_dep, code_circo))
+        await send_embeds(context, ciro_handler, code_dep, code_circo, cached=True)
+
+    circo.autocomplete("code_dep")(code_dep_autocomplete)
 
     @protected_command(
         name="scr",
@@ -84,7 +150,9 @@ class DeputeCommand(ProtectedCog, name="depute"):
             context (Context): The context of the command.
             code_ref (str): Reference of the scrutin.
         """
-        await send_embeds(context, lambda: scr_handler(code_ref))
+        await send_embeds(context, scr_handler, code_ref, cached=True)
+
+    scr.autocomplete("code_ref")(code_ref_autocomplete)
 
     @protected_command(
         name="vote",
@@ -100,7 +168,10 @@ class DeputeCommand(ProtectedCog, name="depute"):
             last_name (str): The last name of the député.
             first_name (Optional[str]): The optional first name of the député.
         """
-        await send_embeds(context, lambda: vote_handler(code_ref, last_name, first_name))
+        await send_embeds(context, vote_handler, code_ref, last_name, first_name, cached=True)
+
+    vote.autocomplete("code_ref")(code_ref_autocomplete)
+    vote.autocomplete("last_name")(last_name_autocomplete)
 
 async def setup(bot) -> None:
     """
@@ -5,6 +5,7 @@
 import discord
 from discord.ext import commands
 from utils.cogManager import ProtectedCog
+from utils.dataManager import is_loaded
 
 class GeneralCommands(ProtectedCog):
     @commands.hybrid_command(
@@ -14,10 +15,16 @@ class GeneralCommands(ProtectedCog):
     async def status(self, context) -> None:
         """Basic command to check if the bot is updating or available"""
 
-        if self.bot.is_updating:
+        if not is_loaded():
             embed = discord.Embed(
                 title=":red_circle: Indisponible",
-                description="Le bot est en cours de mise à jour.",
+                description="Le bot est en cours de chargement des données.",
+                color=0x367588,
+            )
+        elif self.bot.is_updating:
+            embed = discord.Embed(
+                title=":green_circle: Disponible",
+                description="Le bot est disponible, une mise à jour des données est en cours.",
                 color=0x367588,
             )
         else:
@@ -56,11 +56,31 @@ UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE = __load_env(
 UPDATE_HOUR = __load_env("UPDATE_HOUR", "08:00:00")  # Default update time
 UPDATE_AT_LAUNCH = __load_env("UPDATE_AT_LAUNCH", "TRUE").upper() in ("TRUE", "1", "T")  # Enable updates at launch
 UPDATE_PROGRESS_SECOND = int(__load_env("UPDATE_DOWNLOAD_PROGRESS_SECOND", "2")) # Download progress update in second, if 0 is disabled
+UPDATE_DOWNLOAD_BUFFER_SIZE = int(__load_env("UPDATE_DOWNLOAD_BUFFER_SIZE", "1048576"))  # Size in bytes of the buffers written to disk while downloading
+UPDATE_DOWNLOAD_RETRIES = int(__load_env("UPDATE_DOWNLOAD_RETRIES", "3"))  # Number of retries of an interrupted download
+UPDATE_DOWNLOAD_BACKOFF_SECOND = float(__load_env("UPDATE_DOWNLOAD_BACKOFF_SECOND", "2"))  # Delay before the first retry in second, doubled at each retry
+UPDATE_WORKERS = int(__load_env("UPDATE_WORKERS", str(os.cpu_count() or 1)))  # Number of threads unzipping and loading the data, default to the number of cores
+UPDATE_DOWNLOAD_CONNECTIONS = int(__load_env("UPDATE_DOWNLOAD_CONNECTIONS", "4"))  # Maximum number of connections shared by the downloads
+
+# Handlers
+HANDLER_WORKERS = int(__load_env("HANDLER_WORKERS", "4"))  # Number of threads running the command handlers
+HANDLER_TIMEOUT_SECOND = float(__load_env("HANDLER_TIMEOUT_SECOND", "10"))  # Command handler timeout in second, if 0 is disabled
+RESPONSE_CACHE_SIZE = int(__load_env("RESPONSE_CACHE_SIZE", "1024"))  # Number of command responses kept in cache, if 0 is disabled
+RESPONSE_CACHE_TTL_SECOND = float(__load_env("RESPONSE_CACHE_TTL_SECOND", "600"))  # Time to live of a cached response in second, if 0 kept until the next update
+PAGINATOR_TIMEOUT_SECOND = float(__load_env("PAGINATOR_TIMEOUT_SECOND", "180"))  # Time in second after which the page buttons of a result are disabled, if 0 never
 
 # Folders
 ACTEUR_FOLDER = Path(__load_env("ACTEUR_FOLDER", "data/acteur"))  # Path to "acteur" folder
 ORGANE_FOLDER = Path(__load_env("ORGANE_FOLDER", "data/organe"))  # Path to "organe" folder
 SCRUTINS_FOLDER = Path(__load_env("SCRUTINS_FOLDER", "data/scrutins"))  # Path to "scrutins" folder
+SNAPSHOT_FILE = Path(__load_env("SNAPSHOT_FILE", "data/snapshot.pickle"))  # Path to the parsed data snapshot
+VOTE_MATRIX_FILE = Path(__load_env("VOTE_MATRIX_FILE", "data/votes.matrix"))  # Path to the memory-mapped vote matrix
+SCRUTINS_MANIFEST_FILE = Path(__load_env("SCRUTINS_MANIFEST_FILE", "data/scrutins_manifest.json"))  # Path to the size and CRC-32 of the scrutin files
+SCRUTINS_ZIP_FILE = Path(__load_env("SCRUTINS_ZIP_FILE", "data/scrutins.zip"))  # Path to the scrutins zip file, used if SCRUTINS_FROM_ZIP is enabled
+SCRUTINS_FROM_ZIP = __load_env("SCRUTINS_FROM_ZIP", "FALSE").upper() in ("TRUE", "1", "T")  # Read the scrutins from the downloaded zip file instead of extracting them
+DATABASE_FILE = Path(__load_env("DATABASE_FILE", "data/database.sqlite"))  # Path of the SQLite databases, each data generation is written next to it under its own name, used if USE_DATABASE is enabled
+USE_DATABASE = __load_env("USE_DATABASE", "FALSE").upper() in ("TRUE", "1", "T")  # Serve the commands from the SQLite database instead of the in-memory stores
+DOWNLOAD_CACHE_FILE = Path(__load_env("DOWNLOAD_CACHE_FILE", "data/download_cache.json"))  # Path to the ETag / Last-Modified of the last downloads
 
 # Logs
 LOG_PATH = __load_env("LOG_PATH", "discord.log")  # Path to the log file
@@ -6,39 +6,196 @@ from __future__ import annotations
 import asyncio
 import os
 import shutil
+import time
 import zipfile
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
 from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO, Callable, Dict, List, Set, Tuple, Type, TypeVar
 
 import aiohttp
 
-from common.config import UPDATE_PROGRESS_SECOND
+from common.config import UPDATE_DOWNLOAD_BACKOFF_SECOND, UPDATE_DOWNLOAD_BUFFER_SIZE, UPDATE_DOWNLOAD_RETRIES, \
+    UPDATE_PROGRESS_SECOND, UPDATE_WORKERS
 from common.logger import logger
+from utils.utils import update_executor
+
+# number of buffers waiting to be written before the download pauses
+WRITE_BEHIND_BUFFERS = 8
+
+T = TypeVar("T")
 
 
 def show_progress(
         p_url: str,
         p_content_length: int | None,
-        p_chunk_size: int,
-        p_nb_chunks_wrote: int,
-        p_last_show: datetime | None) -> datetime:
-    """Show progress of download in log"""
-    now = datetime.now()
+        p_size_wrote: int,
+        p_last_show: float | None) -> float | None:
+    """Show progress of download in log, at most every UPDATE_PROGRESS_SECOND seconds"""
+    now = time.monotonic()
     update_second = UPDATE_PROGRESS_SECOND
-    if not p_last_show or (update_second != 0 and (now - p_last_show).seconds > update_second):
-        size_wrote_chunks_mb = ((p_chunk_size * p_nb_chunks_wrote) / 1024) / 1024
-        ct_length_mb = (int(p_content_length) / 1024) / 1024 if p_content_length else "???"
-        logger.info("Download %s : %.2f MB / %.2f MB",
+    if not p_last_show or (update_second != 0 and now - p_last_show > update_second):
+        size_wrote_mb = (p_size_wrote / 1024) / 1024
+        ct_length_mb = f"{(p_content_length / 1024) / 1024:.2f}" if p_content_length else "???"
+        logger.info("Download %s : %.2f MB / %s MB",
                    os.path.basename(p_url),
-                   size_wrote_chunks_mb,
+                   size_wrote_mb,
                    ct_length_mb)
         return now
     return p_last_show
 
-async def download_file_async(url: str, file_path: Path) -> None:
+
+class FileWriter:
+    """Write buffers to a file in a thread, behind the coroutine downloading them"""
+
+    def __init__(self, file: BinaryIO, max_pending: int = WRITE_BEHIND_BUFFERS) -> None:
+        self._file: BinaryIO = file
+        # bounded, the download waits for the disk when it is too far ahead
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(max_pending)
+        self._task: asyncio.Future[None] | None = None
+        self._error: OSError | None = None
+
+    async def __aenter__(self) -> FileWriter:
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def __aexit__(
+            self,
+            exc_type: Type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None) -> None:
+        await self._queue.put(None)
+        if self._task is not None:
+            await self._task
+        if self._error is not None and exc_type is None:
+            raise self._error
+
+    async def write(self, data: bytes) -> None:
+        """Queue data to be written, raise the error of a previous write if any."""
+        if self._error is not None:
+            raise self._error
+        await self._queue.put(data)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while (data := await self._queue.get()) is not None:
+            # after an error the queue is still drained, the download is never blocked
+            if self._error is None:
+                try:
+                    await loop.run_in_executor(update_executor, self._file.write, data)
+                except OSError as e:
+                    self._error = e
+
+# response headers kept to make the next request for the same url conditional
+VALIDATOR_HEADERS: Dict[str, str] = {
+    "etag": "If-None-Match",
+    "last-modified": "If-Modified-Since",
+}
+
+# errors after which a download is resumed
+RETRIED_ERRORS: Tuple[Type[BaseException], ...] = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+)
+
+
+def is_retried_error(error: BaseException) -> bool:
+    """Return True if a download failing with error is worth retrying, including the server errors."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500
+    return isinstance(error, RETRIED_ERRORS)
+
+
+def resume_validator(validators: Dict[str, str]) -> str | None:
+    """Return the If-Range value resuming a download with these validators, None if it cannot be resumed."""
+    etag: str | None = validators.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return validators.get("last-modified")
+
+
+async def download_part_async(
+        session: aiohttp.ClientSession,
+        url: str,
+        file_path: Path,
+        partial_path: Path,
+        headers: Dict[str, str],
+        resumed: Dict[str, str]) -> Dict[str, str] | None:
+    """
+    Download a file from url to a partial file, resuming it with a Range request when possible.
+
+    Parameters:
+        session (aiohttp.ClientSession) : The session to download with.
+        url (str) : The url of file to download.
+        file_path (Path) : The path where the file must be written, only used in logs.
+        partial_path (Path) : The path of the partial file, appended to when resuming.
+        headers (Dict[str, str]) : The conditional headers of the request.
+        resumed (Dict[str, str]) : The validators of the partial file, filled by the first response.
+
+    Returns:
+        Dict[str, str] | None: The response headers of the file, None if the file was not modified.
+    """
+    offset: int = partial_path.stat().st_size if partial_path.exists() else 0
+    request_headers: Dict[str, str] = dict(headers)
+    if offset and (if_range := resume_validator(resumed)) is not None:
+        request_headers["Range"] = f"bytes={offset}-"
+        request_headers["If-Range"] = if_range
+    else:
+        offset = 0
+
+    async with session.get(url, headers=request_headers) as response:
+        if response.status == 304:
+            return None
+        response.raise_for_status()
+        if response.status == 206:
+            logger.info("Resuming %s at %.2f MB", url, offset / 1024 / 1024)
+        else:
+            # the file changed or the server ignored the Range header, the download restarts
+            offset = 0
+            resumed.clear()
+            resumed.update({
+                header: response.headers[header] for header in VALIDATOR_HEADERS if header in response.headers
+            })
+        content_length = response.headers.get("content-length")
+        expected_size: int | None = offset + int(content_length) if content_length else None
+
+        size: int = offset
+        last_show: float | None = None
+        with open(partial_path, "ab" if offset else "wb") as f:
+            if not offset:
+                logger.info("Downloading %s to %s", url, file_path)
+            async with FileWriter(f) as writer:
+                # chunks of any size, as received, are gathered into buffers of UPDATE_DOWNLOAD_BUFFER_SIZE
+                chunks: List[bytes] = []
+                pending: int = 0
+                try:
+                    async for chunk in response.content.iter_any():
+                        chunks.append(chunk)
+                        pending += len(chunk)
+                        if pending >= UPDATE_DOWNLOAD_BUFFER_SIZE:
+                            await writer.write(b"".join(chunks))
+                            size += pending
+                            chunks, pending = [], 0
+                            last_show = show_progress(url, expected_size, size, last_show)
+                finally:
+                    # the bytes received before an interruption are kept to resume from them
+                    if chunks:
+                        await writer.write(b"".join(chunks))
+                        size += pending
+        if expected_size is not None and size != expected_size:
+            raise aiohttp.ClientPayloadError(f"Received {size} bytes out of {expected_size}")
+        return {**resumed, "content-length": str(size)}
+
+
+async def download_file_async(
+        url: str,
+        file_path: Path,
+        validators: Dict[str, str] | None = None,
+        session: aiohttp.ClientSession | None = None) -> Dict[str, str] | None:
     """
     Download a file from url to file path asynchronously.
+    An interrupted download is retried UPDATE_DOWNLOAD_RETRIES times with an exponential backoff,
+    resuming from the bytes already received when the server supports Range requests.
     Progress will show every DOWNLOAD_UPDATE_SECOND seconds (default 2).
     To hide progress set DOWNLOAD_UPDATE_SECOND to 0.
 
@@ -47,50 +204,202 @@ async def download_file_async(url: str, file_path: Path) -> None:
         file_path (Path) : 
             The path where the file must write. 
             Path must be writable and the parents folder must exist.
+        validators (Dict[str, str] | None) :
+            The validators returned by the previous download of url, if given the request is conditional.
+        session (aiohttp.ClientSession | None) :
+            The session to download with, shared with other downloads, a new one is opened if not given.
+
+    Returns:
+        Dict[str, str] | None: The ETag, Last-Modified and Content-Length of the downloaded file,
+        None if the file was not modified since the previous download.
     """
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                content_length = response.headers.get("content-length", 0)
-                chunk_size: int = 4096
-                nb_chunks_wrote: int = 0
-                last_show: datetime | None = None
-                with open(file_path, "wb") as f:
-                    logger.info("Downloading %s to %s", url, file_path)
-                    while True:
-                        chunk = await response.content.read(chunk_size)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-                        nb_chunks_wrote += 1
-                        last_show = show_progress(url, content_length,
-                                                  chunk_size, nb_chunks_wrote, last_show)
-        except (aiohttp.ClientConnectionError, aiohttp.InvalidURL):
-            logger.error("Connection error from %s", url)
-            raise
-        except aiohttp.ClientResponseError:
-            logger.error("Invalid response from %s", url)
-            raise
-        except FileNotFoundError:
-            logger.error("Invalid path %s", file_path)
-            raise
+    if session is None:
+        async with aiohttp.ClientSession() as own_session:
+            return await download_file_async(url, file_path, validators, own_session)
+
+    headers: Dict[str, str] = {
+        request_header: validators[header]
+        for header, request_header in VALIDATOR_HEADERS.items()
+        if validators and header in validators
+    }
+    # the file is only written once complete
+    partial_path: Path = file_path.with_name(file_path.name + ".part")
+    resumed: Dict[str, str] = {}
+    attempt: int = 0
+    try:
+        while True:
+            try:
+                new_validators = await download_part_async(session, url, file_path, partial_path, headers, resumed)
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not is_retried_error(e) or attempt >= UPDATE_DOWNLOAD_RETRIES:
+                    raise
+                delay: float = UPDATE_DOWNLOAD_BACKOFF_SECOND * 2 ** attempt
+                attempt += 1
+                logger.warning("Download of %s interrupted (%r), retry %s/%s in %s seconds",
+                               url, e, attempt, UPDATE_DOWNLOAD_RETRIES, delay)
+                await asyncio.sleep(delay)
+        if new_validators is None:
+            logger.info("%s not modified", url)
+            return None
+        os.replace(partial_path, file_path)
+    except (aiohttp.ClientConnectionError, aiohttp.InvalidURL):
+        logger.error("Connection error from %s", url)
+        raise
+    except (aiohttp.ClientResponseError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+        logger.error("Invalid response from %s", url)
+        raise
+    except FileNotFoundError:
+        logger.error("Invalid path %s", file_path)
+        raise
 
     logger.info("Download done")
+    return new_validators
+
+
+def split_batches(members: List[T], count: int, size: Callable[[T], int]) -> List[List[T]]:
+    """Split the files of a zip file into at most count batches of about the same size."""
+    ordered: List[T] = sorted(members, key=size, reverse=True)
+    return [batch for batch in (ordered[index::count] for index in range(count)) if batch]
+
+
+async def run_batches_async(
+        function: Callable[[Path, List[T]], None],
+        path: Path,
+        members: List[T],
+        size: Callable[[T], int]) -> None:
+    """
+    Run function(path, batch) on UPDATE_WORKERS batches of files of a zip file in parallel, in update_executor.
+
+    Parameters:
+        function (Callable[[Path, List[T]], None]) : The function processing a batch with its own handle of the zip file.
+        path (Path): The path of the zip file.
+        members (List[T]) : The files of the zip file.
+        size (Callable[[T], int]) : The size of a file, to balance the batches.
+    """
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(
+        loop.run_in_executor(update_executor, function, path, batch)
+        for batch in split_batches(members, UPDATE_WORKERS, size)
+    ))
+
+
+def check_members(path: Path, members: List[zipfile.ZipInfo]) -> None:
+    """
+    Check the CRC-32 of some files of a zip file, raise zipfile.BadZipFile if one differs.
+
+    Parameters:
+        path (Path): The path of the zip file.
+        members (List[zipfile.ZipInfo]) : The files to check.
+    """
+    with zipfile.ZipFile(path, "r") as zip_ref:
+        for info in members:
+            with zip_ref.open(info) as src:
+                # the CRC-32 is checked once the whole file is read
+                while src.read(1024 * 1024):
+                    pass
+
+
+def extract_members(path: Path, members: List[Tuple[zipfile.ZipInfo, Path]]) -> None:
+    """
+    Extract some files of a zip file, each file being replaced at once.
+
+    Parameters:
+        path (Path): The path of the zip file.
+        members (List[Tuple[zipfile.ZipInfo, Path]]) : The files to extract and their destination path.
+    """
+    with zipfile.ZipFile(path, "r") as zip_ref:
+        for info, dst_path in members:
+            # readers never see a partial file
+            temp_path: Path = dst_path.with_name(dst_path.name + ".tmp")
+            with zip_ref.open(info) as src, open(temp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(temp_path, dst_path)
+
+
+def read_infolist(path: Path, previous: Path | None = None) -> List[zipfile.ZipInfo]:
+    """
+    Return the files of a zip file, without the folders.
+
+    Parameters:
+        path (Path): The path of the zip file.
+        previous (Path | None) : The path of a previous zip file,
+            its files with the same name, size and CRC-32 are left out if it exists and is valid.
+    """
+    with zipfile.ZipFile(path, "r") as zip_ref:
+        members: List[zipfile.ZipInfo] = [info for info in zip_ref.infolist() if not info.is_dir()]
+    if previous is None:
+        return members
+    try:
+        unchanged: Set[Tuple[str, int, int]] = {
+            (info.filename, info.file_size, info.CRC) for info in read_infolist(previous)
+        }
+    except (FileNotFoundError, zipfile.BadZipFile):
+        return members
+    return [info for info in members if (info.filename, info.file_size, info.CRC) not in unchanged]
+
+
+def list_members(path: Path, dst_folder: Path) -> List[Tuple[zipfile.ZipInfo, Path]]:
+    """
+    Return the files of a zip file with their destination path, creating the folders they are extracted to.
+
+    Parameters:
+        path (Path): The path of the zip file.
+        dst_folder (Path) : The path of the destination folder.
+    """
+    members: List[Tuple[zipfile.ZipInfo, Path]] = []
+    with zipfile.ZipFile(path, "r") as zip_ref:
+        for info in zip_ref.infolist():
+            parts: Tuple[str, ...] = Path(info.filename).parts
+            if info.filename.startswith("/") or ".." in parts:
+                logger.warning("Skipping %s from %s, outside of the destination folder", info.filename, path)
+                continue
+            dst_path: Path = dst_folder.joinpath(*parts)
+            if info.is_dir():
+                dst_path.mkdir(parents=True, exist_ok=True)
+                continue
+            # created beforehand, the files are extracted concurrently
+            dst_path.parent.mkdir(parents=True, exist_ok=True)
+            members.append((info, dst_path))
+    return members
+
+
+async def check_zip_file_async(path: Path, previous: Path | None = None) -> None:
+    """
+    Check the CRC-32 of every file of a zip file asynchronously, the files being checked in parallel.
+    The files left as they were in a previous zip file, already checked, are skipped.
+
+    Parameters:
+        path (Path): The path of the zip file.
+        previous (Path | None) : The path of the previous zip file, see read_infolist.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        members: List[zipfile.ZipInfo] = await loop.run_in_executor(update_executor, read_infolist, path, previous)
+        await run_batches_async(check_members, path, members, lambda info: info.file_size)
+    except zipfile.BadZipFile:
+        logger.error("%s is not a correct Zip File.", path)
+        raise
+    except FileNotFoundError:
+        logger.error("%s does not exist.", path)
+        raise
 
 
-def unzip_file(path: Path, dst_folder: Path) -> None :
+async def unzip_file_async(path: Path, dst_folder: Path) -> None:
     """
-    Unzip a zip file to destination folder.
+    Unzip a zip file to destination folder asynchronously, the files being extracted in parallel.
 
     Parameters:
         path (Path): The path of the zip file.
         dst_folder (Path) : The path of the destination folder.
     """
     logger.info("Unzipping file %s to %s", path, dst_folder)
+    loop = asyncio.get_running_loop()
     try:
-        with zipfile.ZipFile(path, "r") as zip_ref:
-            zip_ref.extractall(dst_folder)
+        members: List[Tuple[zipfile.ZipInfo, Path]] = await loop.run_in_executor(
+            update_executor, list_members, path, dst_folder
+        )
+        await run_batches_async(extract_members, path, members, lambda member: member[0].file_size)
     except zipfile.BadZipFile:
         logger.error("%s is not a correct Zip File.", path)
         raise
@@ -99,20 +408,207 @@ def unzip_file(path: Path, dst_folder: Path) -> None :
         raise
     logger.info("Unzip done")
 
-async def unzip_file_async(path: Path, dst_folder: Path) -> None:
+def plan_zip_sync(
+        path: Path,
+        member_folder: str,
+        dst_folder: Path,
+        manifest: Dict[str, List[int]]) -> Tuple[Dict[str, List[int]], List[Tuple[zipfile.ZipInfo, Path]], List[str]]:
+    """
+    Return what synchronizing destination folder with a folder of a zip file changes, see sync_zip_folder_async.
+
+    Returns:
+        Tuple[Dict[str, List[int]], List[Tuple[zipfile.ZipInfo, Path]], List[str]]:
+        The new manifest, the files to extract with their destination path and the file names to remove.
+    """
+    prefix: str = member_folder.rstrip("/") + "/"
+    with zipfile.ZipFile(path, "r") as zip_ref:
+        members: Dict[str, zipfile.ZipInfo] = {
+            info.filename[len(prefix):]: info
+            for info in zip_ref.infolist()
+            if info.filename.startswith(prefix) and not info.is_dir() and "/" not in info.filename[len(prefix):]
+        }
+    new_manifest: Dict[str, List[int]] = {
+        name: [info.file_size, info.CRC] for name, info in members.items()
+    }
+
+    dst_folder.mkdir(parents=True, exist_ok=True)
+    existing: Set[str] = set(os.listdir(dst_folder))
+    modified: List[Tuple[zipfile.ZipInfo, Path]] = [
+        (members[name], dst_folder / name) for name, entry in new_manifest.items()
+        if name not in existing or manifest.get(name) != entry
+    ]
+    removed: List[str] = sorted(existing - new_manifest.keys())
+    return new_manifest, modified, removed
+
+def remove_files(folder: Path, names: List[str]) -> None:
+    """Remove files of a folder."""
+    for name in names:
+        os.remove(folder / name)
+
+async def sync_zip_folder_async(
+        path: Path,
+        member_folder: str,
+        dst_folder: Path,
+        manifest: Dict[str, List[int]]) -> Dict[str, List[int]]:
     """
-    Unzip a zip file to destination folder asynchronously.
+    Make destination folder hold the files of a folder of a zip file asynchronously,
+    only extracting the files whose size or CRC-32 differ from the previous synchronization.
+    The added or modified files are extracted in parallel.
 
     Parameters:
         path (Path): The path of the zip file.
+        member_folder (str): The folder of the zip file to synchronize, e.g. "json".
         dst_folder (Path) : The path of the destination folder.
+        manifest (Dict[str, List[int]]) : The size and CRC-32 by file name of the previous synchronization.
+
+    Returns:
+        Dict[str, List[int]]: The size and CRC-32 by file name, read from the zip central directory.
     """
+    logger.info("Synchronizing %s/%s to %s", path, member_folder, dst_folder)
     loop = asyncio.get_running_loop()
-    with ThreadPoolExecutor() as pool:
-        await loop.run_in_executor(
-            pool,
-            unzip_file, path, dst_folder
+    try:
+        new_manifest, modified, removed = await loop.run_in_executor(
+            update_executor, plan_zip_sync, path, member_folder, dst_folder, manifest
         )
+        await run_batches_async(extract_members, path, modified, lambda member: member[0].file_size)
+    except zipfile.BadZipFile:
+        logger.error("%s is not a correct Zip File.", path)
+        raise
+    except FileNotFoundError:
+        logger.error("%s does not exist.", path)
+        raise
+
+    await loop.run_in_executor(update_executor, remove_files, dst_folder, removed)
+    logger.info("Synchronization done, %s added or modified, %s removed", len(modified), len(removed))
+    return new_manifest
+
+def replace_zip_file(path: Path, dst_path: Path) -> None:
+    """
+    Replace destination file with a zip file, checked by check_zip_file_async beforehand.
+    Readers holding the previous destination file open keep reading it.
+
+    Parameters:
+        path (Path): The path of the zip file.
+        dst_path (Path) : The path of the destination file.
+    """
+    logger.info("Replacing %s with %s", dst_path, path)
+    # the file is moved next to the destination first, then replaced at once
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path: Path = dst_path.with_name(dst_path.name + ".tmp")
+    try:
+        shutil.move(path, temp_path)
+    except FileNotFoundError:
+        logger.error("%s does not exist.", path)
+        raise
+    os.replace(temp_path, dst_path)
+    logger.info("Replace done")
+
+async def replace_zip_file_async(path: Path, dst_path: Path) -> None:
+    """
+    Replace destination file with a zip file asynchronously, see replace_zip_file.
+
+    Parameters:
+        path (Path): The path of the zip file.
+        dst_path (Path) : The path of the destination file.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        update_executor,
+        replace_zip_file, path, dst_path
+    )
+
+def link_file(src_path: str, dst_path: str) -> None:
+    """Hard-link a file, copy it if the file system does not support hard links"""
+    try:
+        os.link(src_path, dst_path)
+    except OSError:
+        shutil.copy2(src_path, dst_path)
+
+def copy_folder(src_folder: Path, dst_folder: Path) -> None:
+    """
+    Replace destination folder with a copy of source folder.
+    The files are hard-linked when possible, a copy keeps its content as long as the files of source folder
+    are replaced rather than modified, as extract_members does.
+
+    Parameters:
+        src_folder (Path) : The path of the folder to copy.
+        dst_folder (Path) : The path of the copy.
+    """
+    logger.info("Copying %s to %s", src_folder, dst_folder)
+    shutil.rmtree(dst_folder, ignore_errors=True)
+    shutil.copytree(src_folder, dst_folder, copy_function=link_file)
+    logger.info("Copy done")
+
+def backup_path(path: Path) -> Path:
+    """Return the path of the copy of a file or folder kept by backup_paths."""
+    return path.with_name(path.name + ".bak")
+
+def remove_path(path: Path) -> None:
+    """Remove a file or a folder, if it exists."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        os.remove(path)
+
+def backup_paths(paths: List[Path]) -> None:
+    """
+    Keep a copy of every existing file and folder next to it, until restore_paths or discard_backups.
+    The files are hard-linked when possible, a copy keeps its content as long as the files
+    are replaced rather than modified, as every commit of the update does.
+
+    Parameters:
+        paths (List[Path]) : The paths of the files and folders to copy.
+    """
+    for path in paths:
+        backup: Path = backup_path(path)
+        remove_path(backup)
+        if path.is_dir():
+            copy_folder(path, backup)
+        elif path.exists():
+            link_file(str(path), str(backup))
+
+def restore_paths(paths: List[Path]) -> None:
+    """
+    Put back the files and folders copied by backup_paths, the paths which did not exist are removed.
+
+    Parameters:
+        paths (List[Path]) : The paths given to backup_paths.
+    """
+    logger.info("Restoring %s", ", ".join(str(path) for path in paths))
+    for path in paths:
+        backup: Path = backup_path(path)
+        if backup.is_file():
+            os.replace(backup, path)
+            continue
+        remove_path(path)
+        if backup.exists():
+            os.replace(backup, path)
+    logger.info("Restore done")
+
+def discard_backups(paths: List[Path]) -> None:
+    """
+    Remove the copies made by backup_paths.
+
+    Parameters:
+        paths (List[Path]) : The paths given to backup_paths.
+    """
+    for path in paths:
+        remove_path(backup_path(path))
+
+async def backup_paths_async(paths: List[Path]) -> None:
+    """Keep a copy of files and folders asynchronously, see backup_paths."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(update_executor, backup_paths, paths)
+
+async def restore_paths_async(paths: List[Path]) -> None:
+    """Put back files and folders asynchronously, see restore_paths."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(update_executor, restore_paths, paths)
+
+async def discard_backups_async(paths: List[Path]) -> None:
+    """Remove the copies of files and folders asynchronously, see discard_backups."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(update_executor, discard_backups, paths)
 
 def moving_folder(src_folder: Path, dst_folder: Path) -> None:
     """
@@ -124,13 +620,23 @@ def moving_folder(src_folder: Path, dst_folder: Path) -> None:
     """
     logger.info("Moving file from %s to %s", src_folder, dst_folder)
 
+    staging_folder: Path = dst_folder.with_name(dst_folder.name + ".new")
+    previous_folder: Path = dst_folder.with_name(dst_folder.name + ".old")
     try:
-        shutil.rmtree(dst_folder, ignore_errors=True)
-        shutil.move(src_folder, dst_folder)
+        # the destination is left untouched until the new content is next to it
+        shutil.rmtree(staging_folder, ignore_errors=True)
+        shutil.move(src_folder, staging_folder)
     except FileNotFoundError:
         logger.error("%s and/or %s does not exist", src_folder, dst_folder)
         raise
 
+    # two renames, the destination is missing only in between
+    shutil.rmtree(previous_folder, ignore_errors=True)
+    if dst_folder.exists():
+        os.replace(dst_folder, previous_folder)
+    os.replace(staging_folder, dst_folder)
+    shutil.rmtree(previous_folder, ignore_errors=True)
+
     logger.info("Move file done")
 
 async def moving_folder_async(src_folder: Path, dst_folder: Path) -> None:
@@ -142,8 +648,7 @@ async def moving_folder_async(src_folder: Path, dst_folder: Path) -> None:
         dst_folder (str) : The path of destination folder where the folder must be moved
     """
     loop = asyncio.get_running_loop()
-    with ThreadPoolExecutor() as pool:
-        await loop.run_in_executor(
-            pool,
-            moving_folder, src_folder, dst_folder
-        )
+    await loop.run_in_executor(
+        update_executor,
+        moving_folder, src_folder, dst_folder
+    )
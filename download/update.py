@@ -4,83 +4,196 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import os
 from pathlib import Path
 import tempfile
-from typing import TYPE_CHECKING
+from typing import Any, Awaitable, Dict, List, TYPE_CHECKING, TypeVar
+
+import aiohttp
 
 from common.config import UPDATE_HOUR, UPDATE_URL_DOWNLOAD_SCRUTINS,    \
-    UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, SCRUTINS_FOLDER, ACTEUR_FOLDER,  \
-    ORGANE_FOLDER
-from download.core import download_file_async, moving_folder_async, unzip_file_async
-from utils.utils import compute_time_for_update
+    UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, UPDATE_DOWNLOAD_CONNECTIONS, SCRUTINS_FOLDER, ACTEUR_FOLDER,  \
+    ORGANE_FOLDER, DOWNLOAD_CACHE_FILE, SCRUTINS_MANIFEST_FILE, SCRUTINS_FROM_ZIP, SCRUTINS_ZIP_FILE
+from download.core import backup_paths_async, check_zip_file_async, discard_backups_async, download_file_async, \
+    moving_folder_async, replace_zip_file_async, restore_paths_async, sync_zip_folder_async, unzip_file_async
+from utils.dataManager import keep_scrutin_files_async, load_data_async
+from utils.utils import compute_time_for_update, read_json_file
 from common.logger import logger
 
 if TYPE_CHECKING:
     from utils.botManager import DiscordBot
 
+T = TypeVar("T")
+
 def show_error_on_exception(msg: str, exception: Exception) -> None:
     """Standard log output when an exception occur"""
     logger.error("Update failed : %s", msg)
     logger.error("Error : %s", str(exception))
     logger.error("=== Update failed ===")
 
-async def update_scrutins(download_temp: Path, zip_temp: Path) -> None:
+def __read_cache(path: Path) -> Dict[str, Any]:
+    """Return the content of a JSON cache file, empty if it is missing or invalid."""
+    try:
+        return read_json_file(path)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Cannot read cache %s: %s", path, e)
+        return {}
+
+def __write_cache(path: Path, content: Dict[str, Any]) -> None:
+    """Write a JSON cache file, replacing it at once."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path: Path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(content, f, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.error("Cannot write cache %s: %s", path, e)
+
+def load_validators() -> Dict[str, Dict[str, str]]:
+    """Return the validators of the last applied download of every url, see download_file_async."""
+    return __read_cache(DOWNLOAD_CACHE_FILE)
+
+def save_validators(validators: Dict[str, Dict[str, str]]) -> None:
+    """Write the validators of the last applied download of every url."""
+    __write_cache(DOWNLOAD_CACHE_FILE, validators)
+
+def load_manifest() -> Dict[str, List[int]]:
+    """Return the size and CRC-32 of every scrutin file of the last applied archive, see sync_zip_folder_async."""
+    return __read_cache(SCRUTINS_MANIFEST_FILE)
+
+def save_manifest(manifest: Dict[str, List[int]]) -> None:
+    """Write the size and CRC-32 of every scrutin file of the last applied archive."""
+    __write_cache(SCRUTINS_MANIFEST_FILE, manifest)
+
+async def fetch_scrutins(
+        download_temp: Path,
+        validators: Dict[str, Dict[str, str]] | None = None,
+        session: aiohttp.ClientSession | None = None) -> Dict[str, str] | None:
     """
-    Update the data folder with fresh data from UPDATE_URL_DOWNLOAD_SCRUTINS.
+    Download fresh data from UPDATE_URL_DOWNLOAD_SCRUTINS, without touching the data folder.
+    If SCRUTINS_FROM_ZIP is enabled the files modified since SCRUTINS_ZIP_FILE are checked.
+
+    Parameters:
+        download_temp (Path) : The folder where the zip file is downloaded.
+        validators (Dict[str, Dict[str, str]] | None) :
+            The validators by url of the last applied downloads, the download is conditional if given.
+        session (aiohttp.ClientSession | None) : The session shared by the downloads.
+
+    Returns:
+        Dict[str, str] | None: The validators of the download, None if the data was not modified since the last update.
     """
-    # Download File to zip download folder
+    # Download File to zip download folder, only if modified when the data folder is there
     zip_file_scrutins: Path = download_temp / "data_scrutins.zip"
+    previous: Dict[str, str] | None = None
+    scrutins_path: Path = SCRUTINS_ZIP_FILE if SCRUTINS_FROM_ZIP else SCRUTINS_FOLDER
+    if validators is not None and scrutins_path.exists():
+        previous = validators.get(UPDATE_URL_DOWNLOAD_SCRUTINS)
     try:
-        await download_file_async(UPDATE_URL_DOWNLOAD_SCRUTINS, zip_file_scrutins)
+        downloaded = await download_file_async(UPDATE_URL_DOWNLOAD_SCRUTINS, zip_file_scrutins, previous, session)
     except Exception as e:
         show_error_on_exception("download failed", e)
         raise e
+    if downloaded is None:
+        return None
+
+    # Only a zip file kept as is is checked, for the files modified since the previous one,
+    # the CRC-32 of the files extracted to the data folder is checked as they are extracted
+    if SCRUTINS_FROM_ZIP:
+        try:
+            await check_zip_file_async(zip_file_scrutins, SCRUTINS_ZIP_FILE)
+        except Exception as e:
+            show_error_on_exception("checking zip failed", e)
+            raise e
+    return downloaded
 
-    await asyncio.sleep(0.1)
+async def commit_scrutins(download_temp: Path) -> None:
+    """
+    Update the data folder with the data downloaded by fetch_scrutins.
+    Only the added or modified scrutin files are extracted,
+    if SCRUTINS_FROM_ZIP is enabled the downloaded zip file replaces SCRUTINS_ZIP_FILE instead.
 
-    # Unzip File to zip temp folder
-    zip_temp_scrutins: Path = zip_temp / "scrutins"
+    Parameters:
+        download_temp (Path) : The folder where the zip file was downloaded.
+    """
+    zip_file_scrutins: Path = download_temp / "data_scrutins.zip"
+    if SCRUTINS_FROM_ZIP:
+        # Keep the zip file, the scrutins are read from it
+        try:
+            await replace_zip_file_async(zip_file_scrutins, SCRUTINS_ZIP_FILE)
+        except Exception as e:
+            show_error_on_exception("replacing zip failed", e)
+            raise e
+        return
+
+    # Extract the added or modified files to data folder,
+    # the served generation reads a copy of the previous files until the next one is published
     try:
-        await unzip_file_async(zip_file_scrutins, zip_temp_scrutins)
+        await keep_scrutin_files_async()
     except Exception as e:
-        show_error_on_exception("unzipping failed", e)
+        show_error_on_exception("copying folder failed", e)
         raise e
-
-    await asyncio.sleep(0.1)
-
-    # Move folder to data folder
     try:
-        await moving_folder_async(zip_temp_scrutins / "json",
-                                  SCRUTINS_FOLDER)
+        manifest: Dict[str, List[int]] = await sync_zip_folder_async(
+            zip_file_scrutins, "json", SCRUTINS_FOLDER, load_manifest()
+        )
     except Exception as e:
-        show_error_on_exception("moving folder failed", e)
+        show_error_on_exception("unzipping failed", e)
         raise e
+    save_manifest(manifest)
 
-async def update_acteur_organe(download_temp: Path, zip_temp: Path) -> None:
+async def fetch_acteur_organe(
+        download_temp: Path,
+        zip_temp: Path,
+        validators: Dict[str, Dict[str, str]] | None = None,
+        session: aiohttp.ClientSession | None = None) -> Dict[str, str] | None:
     """
-    Update the data folder with fresh data from UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE.
+    Download and unzip fresh data from UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, without touching the data folders.
+
+    Parameters:
+        download_temp (Path) : The folder where the zip file is downloaded.
+        zip_temp (Path) : The folder where the zip file is unzipped.
+        validators (Dict[str, Dict[str, str]] | None) :
+            The validators by url of the last applied downloads, the download is conditional if given.
+        session (aiohttp.ClientSession | None) : The session shared by the downloads.
+
+    Returns:
+        Dict[str, str] | None: The validators of the download, None if the data was not modified since the last update.
     """
-    # Download File to zip download folder
+    # Download File to zip download folder, only if modified when the data folders are there
     zip_file_acteur_organe: Path = download_temp / "data_acteur_organe.zip"
+    previous: Dict[str, str] | None = None
+    if validators is not None and ACTEUR_FOLDER.exists() and ORGANE_FOLDER.exists():
+        previous = validators.get(UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE)
     try:
-        await download_file_async(UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, zip_file_acteur_organe)
+        downloaded = await download_file_async(
+            UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, zip_file_acteur_organe, previous, session
+        )
     except Exception as e:
         show_error_on_exception("download failed", e)
         raise e
-
-    await asyncio.sleep(0.1)
+    if downloaded is None:
+        return None
 
     # Unzip File to zip temp folder
-    zip_temp_acteur_organe: Path = zip_temp / "acteur_organe"
     try:
-        await unzip_file_async(zip_file_acteur_organe, zip_temp_acteur_organe)
+        await unzip_file_async(zip_file_acteur_organe, zip_temp / "acteur_organe")
     except Exception as e:
         show_error_on_exception("unzipping failed", e)
         raise e
+    return downloaded
 
-    await asyncio.sleep(0.1)
+async def commit_acteur_organe(zip_temp: Path) -> None:
+    """
+    Update the data folders with the data unzipped by fetch_acteur_organe.
 
-    # Move folder to data folder
+    Parameters:
+        zip_temp (Path) : The folder where the zip file was unzipped.
+    """
+    zip_temp_acteur_organe: Path = zip_temp / "acteur_organe"
     try:
         await moving_folder_async(zip_temp_acteur_organe / "json" / "acteur",
                                   ACTEUR_FOLDER)
@@ -90,46 +203,124 @@ async def update_acteur_organe(download_temp: Path, zip_temp: Path) -> None:
         show_error_on_exception("moving folder failed", e)
         raise e
 
+async def commit_all(download_temp: Path, zip_temp: Path, scrutins: bool, acteur_organe: bool) -> None:
+    """
+    Update the data folders with the data of fetch_scrutins and fetch_acteur_organe together,
+    every data folder is put back as it was if any of the commits fails.
 
-async def update_async(is_update_acteur_organe: bool) -> None:
+    Parameters:
+        download_temp (Path) : The folder where the zip files were downloaded.
+        zip_temp (Path) : The folder where the zip files were unzipped.
+        scrutins (bool) : if True commit the scrutins.
+        acteur_organe (bool) : if True commit acteur and organe.
+    """
+    paths: List[Path] = []
+    if scrutins:
+        paths += [SCRUTINS_ZIP_FILE] if SCRUTINS_FROM_ZIP else [SCRUTINS_FOLDER, SCRUTINS_MANIFEST_FILE]
+    if acteur_organe:
+        paths += [ACTEUR_FOLDER, ORGANE_FOLDER]
+    try:
+        await backup_paths_async(paths)
+    except Exception as e:
+        show_error_on_exception("copying data failed", e)
+        raise e
+
+    try:
+        if scrutins:
+            await __log_failure(commit_scrutins(download_temp), "=== Update scrutins failed ===")
+        if acteur_organe:
+            await __log_failure(commit_acteur_organe(zip_temp), "=== Update acteur and organe failed ===")
+    except Exception:
+        await restore_paths_async(paths)
+        raise
+    await discard_backups_async(paths)
+
+async def __log_failure(awaitable: Awaitable[T], message: str) -> T:
+    """Log message if awaitable fails."""
+    try:
+        return await awaitable
+    except Exception as e:
+        logger.error(message)
+        raise e
+
+async def __gather_or_cancel(*awaitables: Awaitable[T]) -> List[T]:
+    """Run awaitables concurrently, cancelling the others as soon as one fails."""
+    tasks: List[asyncio.Future[T]] = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+async def update_async(is_update_acteur_organe: bool) -> bool:
     """
     Update the data folder with fresh data from 
     UPDATE_URL_DOWNLOAD_SCRUTINS and UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE.
+    The archives are downloaded concurrently, the data folders are only replaced once all of them are ready
+    and are put back as they were if one of them cannot be replaced.
 
     Parameters:
-        log (Logger) : The logger use by the function.
         is_update_acteur_organe (bool) : if True will update acteur and organe.
+
+    Returns:
+        bool: False if no data was modified since the last update.
     """
 
     logger.info("=== Update starting ===")
 
+    validators: Dict[str, Dict[str, str]] = load_validators()
+    changed: bool = False
     with tempfile.TemporaryDirectory() as download_temp, tempfile.TemporaryDirectory() as zip_temp:
         download_path: Path = Path(download_temp)
         zip_path: Path = Path(zip_temp)
-        try:
-            await update_scrutins(download_path, zip_path)
-        except Exception as e:
-            logger.error("=== Update scrutins failed ===")
-            raise e
-        try:
+        connector = aiohttp.TCPConnector(limit=UPDATE_DOWNLOAD_CONNECTIONS)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            fetches: List[Awaitable[Dict[str, str] | None]] = [__log_failure(
+                fetch_scrutins(download_path, validators, session),
+                "=== Update scrutins failed ===",
+            )]
             if is_update_acteur_organe:
-                await update_acteur_organe(download_path, zip_path)
-        except Exception as e:
-            logger.error("=== Update acteur and organe failed ===")
-            raise e
+                fetches.append(__log_failure(
+                    fetch_acteur_organe(download_path, zip_path, validators, session),
+                    "=== Update acteur and organe failed ===",
+                ))
+            downloaded: List[Dict[str, str] | None] = await __gather_or_cancel(*fetches)
+
+        # the validators are only saved once every data folder is replaced
+        scrutins_downloaded: Dict[str, str] | None = downloaded[0]
+        acteur_organe_downloaded: Dict[str, str] | None = downloaded[1] if is_update_acteur_organe else None
+        if scrutins_downloaded is not None or acteur_organe_downloaded is not None:
+            await commit_all(
+                download_path, zip_path, scrutins_downloaded is not None, acteur_organe_downloaded is not None
+            )
+            if scrutins_downloaded is not None:
+                validators[UPDATE_URL_DOWNLOAD_SCRUTINS] = scrutins_downloaded
+            if acteur_organe_downloaded is not None:
+                validators[UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE] = acteur_organe_downloaded
+            save_validators(validators)
+            changed = True
 
     logger.info("=== Update success ===")
+    return changed
 
 async def update(bot: DiscordBot, is_update_acteur_organe: bool = True) -> None:
     """Async version of update ot make it compatible with asyncio"""
     async with bot.update_lock:
         bot.is_updating = True
+        # a failed update may have replaced some of the data folders
+        changed: bool = True
         try:
-            await update_async(is_update_acteur_organe)
+            changed = await update_async(is_update_acteur_organe)
         except Exception:
             logger.error("=== Update failed ===")
         finally:
             bot.is_updating = False
+        if changed:
+            await load_data_async()
+        else:
+            logger.info("Data not modified, keeping the current data generation")
 
 async def start_planning(bot: DiscordBot, upload_at_launch: bool, *, max_iterations=None) -> None:
     """
@@ -138,6 +329,8 @@ async def start_planning(bot: DiscordBot, upload_at_launch: bool, *, max_iterati
     Parameters:
         upload_at_launch (bool): If True run an update at launch.
     """
+    # serve the last known data (from the snapshot when possible) while the first update runs
+    await load_data_async()
     if upload_at_launch:
         logger.info("First update...")
         await update(bot)
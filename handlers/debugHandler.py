@@ -8,11 +8,9 @@ from typing import Optional
 
 import discord
 
-from common.config import ACTEUR_FOLDER, SCRUTINS_FOLDER, DISCORD_EMBED_COLOR_DEBUG
+from common.config import DISCORD_EMBED_COLOR_DEBUG
 from handlers.commonHandler import error_handler
-from utils.deputeManager import Depute
-from utils.scrutinManager import Scrutin
-from utils.utils import read_files_from_directory
+from utils.dataManager import Dataset, current_dataset
 
 
 def debugd_handler(last_name: str, first_name: Optional[str] = None) -> list[discord.Embed]:
@@ -23,8 +21,8 @@ def debugd_handler(last_name: str, first_name: Optional[str] = None) -> list[dis
         last_name (str): The last_name of the député to search.
         first_name (str | None): The optional first name of the député.
     """
-    deputes = [ depute for data in read_files_from_directory(ACTEUR_FOLDER)
-                if (depute := Depute.from_json_by_name(data, last_name, first_name)) ]
+    dataset: Dataset = current_dataset()
+    deputes = (dataset.database or dataset.deputes).find_by_name(last_name, first_name)
     if len(deputes) > 0 :
         deputes.sort(key=lambda x: int(x.circo))
         return [
@@ -49,13 +47,13 @@ def debugs_handler(code_ref: str) -> discord.Embed:
     Parameters:
         code_ref (str): The reference code of the scrutin.
     """
-    for data in read_files_from_directory(SCRUTINS_FOLDER):
-        if scrutin := Scrutin.from_json_by_ref(data, code_ref):
-            embed = discord.Embed(
-                title=f"Scrutin nº{scrutin.ref}",
-                description=scrutin,
-                color=DISCORD_EMBED_COLOR_DEBUG,
-            )
-            return embed
+    dataset: Dataset = current_dataset()
+    if scrutin := (dataset.database.scrutin(code_ref) if dataset.database else dataset.scrutins.get(code_ref)):
+        embed = discord.Embed(
+            title=f"Scrutin nº{scrutin.ref}",
+            description=scrutin,
+            color=DISCORD_EMBED_COLOR_DEBUG,
+        )
+        return embed
 
     return error_handler(description=f"Je n'ai pas trouvé le scrutin {code_ref}.")
\ No newline at end of file
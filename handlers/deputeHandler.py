@@ -3,15 +3,22 @@
 # This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Sequence
 
 import discord
 
-from common.config import SCRUTINS_FOLDER, ACTEUR_FOLDER, DISCORD_EMBED_COLOR_MSG
+from common.config import DISCORD_EMBED_COLOR_MSG
 from handlers.commonHandler import error_handler
-from utils.deputeManager import Depute
-from utils.scrutinManager import Scrutin, ResultBallot
-from utils.utils import read_files_from_directory
+from utils.dataManager import Dataset, current_dataset
+from utils.databaseManager import Database
+from utils.deputeManager import Depute, DeputeRepository
+from utils.paginatorManager import Pages
+from utils.scrutinManager import Scrutin
+
+# beyond this number of députés found by name, they are displayed one per page
+NOM_MAX_EMBEDS = 10
+# number of députés listed per page of a department
+DEP_PAGE_SIZE = 10
 
 
 def __depute_to_embed(depute: Depute) -> discord.Embed:
@@ -48,6 +55,46 @@ def __scrutin_to_embed(scrutin):
     return embed
 
 
+def __depute_not_found(
+        repository: DeputeRepository | Database,
+        last_name: str,
+        first_name: Optional[str] = None) -> discord.Embed:
+    """
+    Return an error embed for a député not found, suggesting the closest names.
+
+    Parameters:
+        repository (DeputeRepository | Database): The députés of the generation being served.
+        last_name (str): The last name of the député.
+        first_name (Optional[str]): The optional first name of the député.
+
+    Returns:
+        discord.Embed: The error message embed.
+    """
+    full_name = f"{first_name + ' ' if first_name else ''}{last_name}"
+    description = f"Je n'ai pas trouvé le député {full_name}."
+    suggestions = repository.search(last_name, first_name)
+    if suggestions:
+        names = ", ".join(f"{depute.first_name} {depute.last_name}" for depute in suggestions)
+        description += f"\nVouliez-vous dire : {names} ?"
+    return error_handler(title="Député non trouvé", description=description)
+
+
+def __get_scrutin(dataset: Dataset, code_ref: str) -> Scrutin | None:
+    """
+    Return a scrutin from the database of a generation if it has one, from its scrutin store otherwise.
+
+    Parameters:
+        dataset (Dataset): The generation being served.
+        code_ref (str): Reference of the scrutin.
+
+    Returns:
+        Scrutin | None: The scrutin, None if not found.
+    """
+    if dataset.database:
+        return dataset.database.scrutin(code_ref)
+    return dataset.scrutins.get(code_ref)
+
+
 def __vote_emoticon(k: str) -> str:
     """
     Returns an emoji corresponding to a given key.
@@ -72,7 +119,7 @@ def __vote_emoticon(k: str) -> str:
         "absent": ":orange_circle:",
     }.get(k, "")
 
-def nom_handler(last_name: str, first_name: Optional[str] = None) -> list[discord.Embed] | discord.Embed:
+def nom_handler(last_name: str, first_name: Optional[str] = None) -> list[discord.Embed] | discord.Embed | Pages:
     """
     Retrieve embeds with député information based on the given name.
 
@@ -81,21 +128,20 @@ def nom_handler(last_name: str, first_name: Optional[str] = None) -> list[discor
         first_name (Optional[str]): The optional first name of the député.
 
     Returns:
-        list[discord.Embed]: A list of embeds with député info or an error message.
+        list[discord.Embed] | Pages: A list of embeds with député info, one page per député if they are
+            more than NOM_MAX_EMBEDS, or an error message.
     """
-    deputes = [ depute for data in read_files_from_directory(ACTEUR_FOLDER)
-                if (depute := Depute.from_json_by_name(data, last_name, first_name)) ]
+    dataset: Dataset = current_dataset()
+    deputes = (dataset.database or dataset.deputes).find_by_name(last_name, first_name)
     if len(deputes) > 0 :
         deputes.sort(key=lambda x: x.first_name)
+        if len(deputes) > NOM_MAX_EMBEDS:
+            return Pages(items=deputes, per_page=1, render=lambda page: __depute_to_embed(page[0]))
         return [
             __depute_to_embed(depute)
             for depute in deputes
         ]
-    full_name = f"{first_name + ' ' if first_name else ''}{last_name}"
-    return error_handler(
-        title="Député non trouvé",
-        description=f"Je n'ai pas trouvé le député {full_name}."
-    )
+    return __depute_not_found(dataset.database or dataset.deputes, last_name, first_name)
 
 
 def ciro_handler(code_dep: str, code_circo: str) -> discord.Embed:
@@ -109,9 +155,9 @@ def ciro_handler(code_dep: str, code_circo: str) -> discord.Embed:
     Returns:
         discord.Embed: Embed with député info or error.
     """
-    for data in read_files_from_directory(ACTEUR_FOLDER):
-        if depute := Depute.from_json_by_circo(data, code_dep, code_circo):
-            return __depute_to_embed(depute)
+    dataset: Dataset = current_dataset()
+    if depute := (dataset.database or dataset.deputes).find_by_circo(code_dep, code_circo):
+        return __depute_to_embed(depute)
 
     return error_handler(
         title="Député non trouvé",
@@ -119,7 +165,30 @@ def ciro_handler(code_dep: str, code_circo: str) -> discord.Embed:
     )
 
 
-def dep_handler(code_dep: str) -> discord.Embed:
+def __dep_page_to_embed(deputes: Sequence[Depute]) -> discord.Embed:
+    """
+    Converts the députés of a department into a Discord Embed message listing them.
+
+    Parameters:
+        deputes (Sequence[Depute]): The députés, from the same department.
+
+    Returns:
+        discord.Embed: A Discord Embed with a line per député.
+    """
+    description = '\n'.join([
+        f":bust_in_silhouette: [{depute.first_name} {depute.last_name}]({depute.url}) — "
+        f":round_pushpin: **Circoncription** : {depute.dep}-{depute.circo} | "
+        f":classical_building: **Groupe** : {depute.gp}"
+        for depute in deputes
+    ])
+    return discord.Embed(
+        title=f":pushpin: Département {deputes[0].dep} ({deputes[0].dep_name})",
+        description=description,
+        color=DISCORD_EMBED_COLOR_MSG,
+    )
+
+
+def dep_handler(code_dep: str) -> discord.Embed | Pages:
     """
     Return embed listing all députés from a department.
 
@@ -127,24 +196,16 @@ def dep_handler(code_dep: str) -> discord.Embed:
         code_dep (str): Department code.
 
     Returns:
-        discord.Embed: Embed with list of députés or error.
+        discord.Embed | Pages: Embed with list of députés, pages of DEP_PAGE_SIZE députés if they are more, or error.
     """
-    deputes = [ depute for data in read_files_from_directory(ACTEUR_FOLDER)
-                if (depute := Depute.from_json_by_dep(data, code_dep)) ]
+    dataset: Dataset = current_dataset()
+    deputes = (dataset.database or dataset.deputes).find_by_dep(code_dep)
 
     if len(deputes) > 0:
         deputes.sort(key=lambda x: int(x.circo))
-        description = '\n'.join([
-            f":bust_in_silhouette: [{depute.first_name} {depute.last_name}]({depute.url}) — "
-            f":round_pushpin: **Circoncription** : {depute.dep}-{depute.circo} | "
-            f":classical_building: **Groupe** : {depute.gp}"
-            for depute in deputes
-        ])
-        return discord.Embed(
-            title=f":pushpin: Département {deputes[0].dep} ({deputes[0].dep_name})",
-            description=description,
-            color=DISCORD_EMBED_COLOR_MSG,
-        )
+        if len(deputes) > DEP_PAGE_SIZE:
+            return Pages(items=deputes, per_page=DEP_PAGE_SIZE, render=__dep_page_to_embed)
+        return __dep_page_to_embed(deputes)
 
     return error_handler(title="Député non trouvé", description=f"Je n'ai pas trouvé de députés dans le département {code_dep}.")
 
@@ -161,24 +222,20 @@ def vote_handler(code_ref: str, last_name: str, first_name: Optional[str] = None
     Returns:
         discord.Embed: Embed showing the voting result or error.
     """
-    deputes = [
-        depute for x in read_files_from_directory(ACTEUR_FOLDER) if (depute := Depute.from_json_by_name(x, last_name, first_name))
-    ]
-    scrutin : Scrutin | None = next(
-        (scrutin for x in read_files_from_directory(SCRUTINS_FOLDER) if (scrutin := Scrutin.from_json_by_ref(x, code_ref))),
-        None
-    )
+    dataset: Dataset = current_dataset()
+    deputes = (dataset.database or dataset.deputes).find_by_name(last_name, first_name)
+    scrutin : Scrutin | None = __get_scrutin(dataset, code_ref)
     if scrutin and len(deputes) > 0:
         deputes.sort(key=lambda x: x.first_name)
         embeds = []
         for depute in deputes:
             embed = __scrutin_to_embed(scrutin)
             embed.title += f" - {depute.first_name} {depute.last_name}"
-            position = scrutin.depute_vote(depute)
+            position = (dataset.database or dataset.matrix).result(depute.ref, scrutin.ref) or scrutin.depute_vote(depute)
             vote = f":bust_in_silhouette: **Député** : {depute.first_name} {depute.last_name}\n" \
                    f":round_pushpin: **Circoncription** : {depute.dep}-{depute.circo} ({depute.dep_name})\n"\
                    f":classical_building: **Groupe** : {depute.gp}\n" \
-                   f":bar_chart: **Position** : {scrutin.depute_vote(depute).name.capitalize()} {__vote_emoticon(position.name)} \n"
+                   f":bar_chart: **Position** : {position.name.capitalize()} {__vote_emoticon(position.name)} \n"
             embed.add_field(
                 name="Vote",
                 value=vote,
@@ -187,8 +244,7 @@ def vote_handler(code_ref: str, last_name: str, first_name: Optional[str] = None
             embeds.append(embed)
         return embeds
     elif scrutin:
-        full_name = f"{first_name + ' ' if first_name else ''}{last_name}"
-        return error_handler(title="Député non trouvé", description=f"Je n'ai pas trouvé le député {full_name}.")
+        return __depute_not_found(dataset.database or dataset.deputes, last_name, first_name)
     elif len(deputes) > 0:
         return error_handler(title="Scrutin non trouvé", description=f"Je n'ai pas trouvé le scrutin {code_ref}.")
     else:
@@ -209,37 +265,14 @@ def stat_handler(last_name: str, first_name: Optional[str] = None) -> list[disco
     Returns:
         discord.Embed: Embed showing statistics or error.
     """
-
-    def update_stat(stat: dict[str, int], scrutin: Scrutin, depute: Depute):
-        result = scrutin.result(depute)
-        if result == ResultBallot.ABSENT:
-            stat["absent"] += 1
-        elif result == ResultBallot.NONVOTANT:
-            stat["nonvotant"] += 1
-        elif result == ResultBallot.POUR:
-            stat["pour"] += 1
-        elif result == ResultBallot.CONTRE:
-            stat["contre"] += 1
-        elif result == ResultBallot.ABSTENTION:
-            stat["abstention"] += 1
-
-
-    deputes = [
-        depute
-        for data in read_files_from_directory(ACTEUR_FOLDER)
-        if (depute := Depute.from_json_by_name(data, last_name, first_name))
-    ]
+    dataset: Dataset = current_dataset()
+    deputes = (dataset.database or dataset.deputes).find_by_name(last_name, first_name)
 
     if len(deputes) > 0:
         deputes.sort(key=lambda d: int(d.circo))
 
-        default_stat = { "absent": 0, "pour": 0, "contre": 0, "abstention": 0, "nonvotant": 0}
-        stats = {depute.ref: default_stat.copy() for depute in deputes}
-
-        for data in read_files_from_directory(SCRUTINS_FOLDER):
-            scrutin = Scrutin.from_json(data)
-            for depute in deputes:
-                update_stat(stats[depute.ref], scrutin, depute)
+        statistics = dataset.database.statistics if dataset.database else dataset.statistics.get
+        stats = {depute.ref: statistics(depute.ref) for depute in deputes}
 
         embeds = []
         for depute in deputes:
@@ -255,11 +288,7 @@ def stat_handler(last_name: str, first_name: Optional[str] = None) -> list[disco
         return embeds
 
 
-    full_name = f"{first_name + ' ' if first_name else ''}{last_name}"
-    return error_handler(
-        title="Député non trouvé",
-        description=f"Je n'ai pas trouvé le député {full_name}."
-    )
+    return __depute_not_found(dataset.database or dataset.deputes, last_name, first_name)
 
 
 def scr_handler(code_ref: str) -> discord.Embed:
@@ -272,26 +301,25 @@ def scr_handler(code_ref: str) -> discord.Embed:
     Returns:
         discord.Embed: Embed with scrutin info or error.
     """
-    for data in read_files_from_directory(SCRUTINS_FOLDER):
-        if scrutin := Scrutin.from_json_by_ref(data, code_ref):
-            embed = __scrutin_to_embed(scrutin)
-            embed.add_field(
-                name="Participations",
-                value=
-                f":ballot_box: Nombre de votants: {scrutin.nombreVotants}\n"
-                f":exclamation: Non votants: {scrutin.nonVotant}\n"
-                f":no_entry_sign: Non votants volontaires: {scrutin.nonVotantsVolontaire}",
-                inline=True
-            )
-            embed.add_field(
-                name="Résultats",
-                value=
-                f":green_circle: Pour: {scrutin.pour}\n"
-                f":red_circle: Contre: {scrutin.contre}\n"
-                f":white_circle: Abstentions: {scrutin.abstention}",
-                inline=True
-            )
-            return embed
+    if scrutin := __get_scrutin(current_dataset(), code_ref):
+        embed = __scrutin_to_embed(scrutin)
+        embed.add_field(
+            name="Participations",
+            value=
+            f":ballot_box: Nombre de votants: {scrutin.nombreVotants}\n"
+            f":exclamation: Non votants: {scrutin.nonVotant}\n"
+            f":no_entry_sign: Non votants volontaires: {scrutin.nonVotantsVolontaire}",
+            inline=True
+        )
+        embed.add_field(
+            name="Résultats",
+            value=
+            f":green_circle: Pour: {scrutin.pour}\n"
+            f":red_circle: Contre: {scrutin.contre}\n"
+            f":white_circle: Abstentions: {scrutin.abstention}",
+            inline=True
+        )
+        return embed
     return error_handler(
         title="Scrutin non trouvé",
         description=f"Je n'ai pas trouvé le scrutin {code_ref}."
@@ -4,8 +4,11 @@ import discord
 import pytest
 from discord.ext.commands import Context
 
-from cogs.deputeCommand import DeputeCommand
+from cogs.deputeCommand import DeputeCommand, code_dep_autocomplete, code_ref_autocomplete, \
+    last_name_autocomplete
 from tests.conftest import mock_bot
+from tests.handlers.conftest import make_dataset, make_repository
+from utils.deputeManager import Depute
 
 @pytest.fixture
 def mock_context():
@@ -16,4 +19,79 @@ def mock_context():
     return ctx
 
 
-# TODO
+def make_depute(ref: str, last_name: str, dep: str, dep_name: str) -> Depute:
+    return Depute(
+        ref=ref,
+        last_name=last_name,
+        first_name="Test",
+        dep=dep,
+        dep_name=dep_name,
+        circo="1",
+        gp_ref="GP001",
+        gp="Groupe Test"
+    )
+
+
+sample_repository = make_repository(
+    make_depute("PA1", "Martin", "75", "Paris"),
+    make_depute("PA2", "Martinez", "69", "Rhône"),
+    make_depute("PA3", "Le Pen", "62", "Pas-de-Calais"),
+)
+
+
+@pytest.mark.asyncio
+@patch('cogs.deputeCommand.current_dataset', make_dataset(deputes=sample_repository))
+async def test_last_name_autocomplete() -> None:
+    choices = await last_name_autocomplete(MagicMock(), "mart")
+
+    assert [choice.value for choice in choices] == ["Martin", "Martinez"]
+    assert choices[0].name == "Martin Test (75-1)"
+    assert [choice.value for choice in await last_name_autocomplete(MagicMock(), "le p")] == ["Le Pen"]
+    assert await last_name_autocomplete(MagicMock(), "dupont") == []
+
+
+@pytest.mark.asyncio
+@patch('cogs.deputeCommand.current_dataset', make_dataset(deputes=sample_repository))
+async def test_code_dep_autocomplete() -> None:
+    assert [choice.value for choice in await code_dep_autocomplete(MagicMock(), "6")] == ["62", "69"]
+    assert [choice.name for choice in await code_dep_autocomplete(MagicMock(), "rhone")] == ["69 (Rhône)"]
+    assert len(await code_dep_autocomplete(MagicMock(), "")) == 3
+
+
+@pytest.mark.asyncio
+@patch('cogs.deputeCommand.current_dataset')
+async def test_code_ref_autocomplete(mock_dataset: MagicMock) -> None:
+    mock_dataset.return_value.database = None
+    mock_store = mock_dataset.return_value.scrutins
+    mock_store.complete.return_value = ["12", "1"]
+    choices = await code_ref_autocomplete(MagicMock(), " 1")
+
+    mock_store.complete.assert_called_once_with("1")
+    assert [choice.value for choice in choices] == ["12", "1"]
+    assert choices[0].name == "Scrutin nº12"
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_database() -> None:
+    database = MagicMock()
+    database.complete_name.return_value = [make_depute("PA1", "Martin", "75", "Paris")]
+    database.complete_dep.return_value = [("75", "Paris")]
+    database.complete.return_value = ["12"]
+    with patch('cogs.deputeCommand.current_dataset', make_dataset(deputes=sample_repository, database=database)):
+        names = await last_name_autocomplete(MagicMock(), "le p")
+        deps = await code_dep_autocomplete(MagicMock(), "6")
+        numeros = await code_ref_autocomplete(MagicMock(), "1")
+
+    database.complete_name.assert_called_once_with("le p")
+    database.complete_dep.assert_called_once_with("6")
+    database.complete.assert_called_once_with("1")
+    assert [choice.value for choice in names] == ["Martin"]
+    assert [choice.value for choice in deps] == ["75"]
+    assert [choice.value for choice in numeros] == ["12"]
+
+
+def test_autocomplete_registered() -> None:
+    params = DeputeCommand.vote.app_command._params
+    assert params["code_ref"].autocomplete is code_ref_autocomplete
+    assert params["last_name"].autocomplete is last_name_autocomplete
+    assert DeputeCommand.dep.app_command._params["code_dep"].autocomplete is code_dep_autocomplete
@@ -2,16 +2,21 @@
 # See LICENSE file for extended copyright information.
 # This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
 
+import asyncio
 import hashlib
 import os
 from pathlib import Path
 import tempfile
+import threading
+from typing import Dict, List
 from unittest.mock import call, patch, MagicMock
 
 import aiohttp
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 
-from download.core import download_file_async
+from download.core import FileWriter, download_file_async
 
 
 @pytest.mark.asyncio
@@ -87,6 +92,7 @@ async def test_download_invalid_url(
 @pytest.mark.asyncio
 @patch("download.core.logger")
 @patch("download.core.show_progress")
+@patch("download.core.UPDATE_DOWNLOAD_RETRIES", 0)
 async def test_download_client_connection_error(
     mock_show_progress: MagicMock,
     mock_log: MagicMock,
@@ -179,3 +185,243 @@ async def test_download_invalid_path(
     mock_bot.assert_not_called()
     mock_bot.update_lock.__aenter__.assert_not_called()
     mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.core.logger")
+@patch("download.core.show_progress")
+async def test_download_conditional(
+    mock_show_progress: MagicMock,
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+    """Test a download sending the validators of the previous one"""
+
+    # Setup a local server answering 304 when the ETag matches
+    async def handler(request: web.Request) -> web.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(body=b"data", headers={"ETag": '"v1"', "Last-Modified": "Sat, 01 Mar 2025 00:00:00 GMT"})
+
+    app = web.Application()
+    app.router.add_get("/data.zip", handler)
+    mock_show_progress.return_value = None # No print
+
+    async with TestServer(app) as server:
+        url: str = str(server.make_url("/data.zip"))
+        validators = await download_file_async(url, tmp_path / "first.zip")
+        not_modified = await download_file_async(url, tmp_path / "second.zip", validators)
+
+    # Assertions result
+    assert validators == {
+        "etag": '"v1"',
+        "last-modified": "Sat, 01 Mar 2025 00:00:00 GMT",
+        "content-length": "4",
+    }
+    assert not_modified is None
+    assert (tmp_path / "first.zip").read_bytes() == b"data"
+    assert not (tmp_path / "second.zip").exists()
+
+    # Assertions logs
+    mock_log.info.assert_has_calls([
+        call("Downloading %s to %s", url, tmp_path / "first.zip"),
+        call("Download done"),
+        call("%s not modified", url),
+    ])
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.core.logger")
+@patch("download.core.show_progress")
+@patch("download.core.UPDATE_DOWNLOAD_BACKOFF_SECOND", 0)
+async def test_download_resume(
+    mock_show_progress: MagicMock,
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+    """Test a download interrupted twice, retried and resumed with a Range request"""
+
+    # Setup a local server failing once, then cutting the connection in the middle of the file
+    requests: List[Dict[str, str]] = []
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        requests.append(dict(request.headers))
+        if len(requests) == 1:
+            return web.Response(status=503)
+        if request.headers.get("Range") == "bytes=4-" and request.headers.get("If-Range") == '"v1"':
+            return web.Response(status=206, body=b"more", headers={"ETag": '"v1"', "Content-Range": "bytes 4-7/8"})
+        response = web.StreamResponse(headers={"ETag": '"v1"'})
+        response.content_length = 8
+        await response.prepare(request)
+        await response.write(b"data")
+        # the connection is cut once the first bytes are received
+        await asyncio.sleep(0.1)
+        request.transport.close()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/data.zip", handler)
+    mock_show_progress.return_value = None # No print
+
+    async with TestServer(app) as server:
+        url: str = str(server.make_url("/data.zip"))
+        validators = await download_file_async(url, tmp_path / "data.zip")
+
+    # Assertions result
+    assert validators == {"etag": '"v1"', "content-length": "8"}
+    assert (tmp_path / "data.zip").read_bytes() == b"datamore"
+    assert not (tmp_path / "data.zip.part").exists()
+    assert len(requests) == 3
+    assert "Range" not in requests[1]
+
+    # Assertions logs
+    assert mock_log.warning.call_count == 2
+    mock_log.info.assert_has_calls([
+        call("Downloading %s to %s", url, tmp_path / "data.zip"),
+        call("Resuming %s at %.2f MB", url, 4 / 1024 / 1024),
+        call("Download done"),
+    ])
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.core.logger")
+@patch("download.core.show_progress")
+@patch("download.core.UPDATE_DOWNLOAD_RETRIES", 2)
+@patch("download.core.UPDATE_DOWNLOAD_BACKOFF_SECOND", 0)
+async def test_download_retries_exhausted(
+    mock_show_progress: MagicMock,
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+    """Test a download failing after every retry"""
+
+    # Setup a local server always failing
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(status=502)
+
+    app = web.Application()
+    app.router.add_get("/data.zip", handler)
+    mock_show_progress.return_value = None # No print
+
+    async with TestServer(app) as server:
+        url: str = str(server.make_url("/data.zip"))
+        with pytest.raises(aiohttp.ClientResponseError):
+            await download_file_async(url, tmp_path / "data.zip")
+
+    # Assertions result
+    assert not (tmp_path / "data.zip").exists()
+
+    # Assertions logs
+    assert mock_log.warning.call_count == 2
+    mock_log.error.assert_called_once_with("Invalid response from %s", url)
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.core.logger")
+@patch("download.core.show_progress")
+@patch("download.core.UPDATE_DOWNLOAD_BUFFER_SIZE", 1000)
+async def test_download_buffered(
+    mock_show_progress: MagicMock,
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+    """Test a download written by buffers of UPDATE_DOWNLOAD_BUFFER_SIZE bytes"""
+
+    # Setup a local server streaming a file by small chunks
+    body: bytes = bytes(range(256)) * 20
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse()
+        response.content_length = len(body)
+        await response.prepare(request)
+        for start in range(0, len(body), 100):
+            await response.write(body[start:start + 100])
+        return response
+
+    app = web.Application()
+    app.router.add_get("/data.zip", handler)
+    mock_show_progress.return_value = None # No print
+
+    async with TestServer(app) as server:
+        url: str = str(server.make_url("/data.zip"))
+        validators = await download_file_async(url, tmp_path / "data.zip")
+
+    # Assertions result
+    assert validators == {"content-length": str(len(body))}
+    assert (tmp_path / "data.zip").read_bytes() == body
+    # progress is only computed once per buffer written
+    assert 1 <= mock_show_progress.call_count <= len(body) // 1000
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+    mock_log.warning.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_file_writer_error(
+    mock_bot: MagicMock) -> None:
+    """Test a write error raised by the next write and when closing the writer"""
+
+    # Setup a file failing on its first write
+    mock_file = MagicMock()
+    mock_file.write.side_effect = OSError("No space left on device")
+
+    with pytest.raises(OSError):
+        async with FileWriter(mock_file, max_pending=1) as writer:
+            await writer.write(b"first")
+            for _ in range(10):
+                await writer.write(b"next")
+
+    # Assertions result
+    mock_file.write.assert_called_once_with(b"first")
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_file_writer_executor(
+    mock_bot: MagicMock) -> None:
+    """Test the buffers are written by the update workers, not the default executor"""
+
+    # Setup a file recording the thread of every write
+    threads: List[str] = []
+    mock_file = MagicMock()
+    mock_file.write.side_effect = lambda data: threads.append(threading.current_thread().name)
+
+    async with FileWriter(mock_file) as writer:
+        await writer.write(b"first")
+        await writer.write(b"next")
+
+    # Assertions result
+    assert mock_file.write.call_args_list == [call(b"first"), call(b"next")]
+    assert all(thread.startswith("update") for thread in threads)
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
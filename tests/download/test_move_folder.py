@@ -9,7 +9,7 @@ from unittest.mock import call, patch, MagicMock
 
 import pytest
 
-from download.core import moving_folder, moving_folder_async
+from download.core import backup_paths, discard_backups, moving_folder, moving_folder_async, restore_paths
 
 
 @patch("download.core.logger")
@@ -83,6 +83,105 @@ def test_moving_folder_src_not_exist(
     mock_bot.update_lock.__aexit__.assert_not_called()
 
 
+@patch("download.core.logger")
+def test_moving_folder_replace_existing(
+    mock_log: MagicMock,
+    setup_folders: Tuple[Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    """Test replacing a folder, no staging folder is left behind"""
+    src_folder, dst_folder = setup_folders
+    os.makedirs(dst_folder)
+    with open(dst_folder / "old.txt", "w", encoding="utf-8") as f:
+        f.write("This is an old file.")
+
+    moving_folder(src_folder, dst_folder)
+
+    # Assertions result
+    assert sorted(os.listdir(dst_folder)) == ["test.txt"]
+    assert sorted(os.listdir(dst_folder.parent)) == ["dst_folder"]
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("download.core.logger")
+def test_moving_folder_src_not_exist_keep_destination(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+
+    """Test the destination folder is untouched when the source folder does not exist"""
+    src_folder: Path = tmp_path / "non_existent_folder"
+    dst_folder: Path = tmp_path / "dst_folder"
+    os.makedirs(dst_folder)
+    with open(dst_folder / "old.txt", "w", encoding="utf-8") as f:
+        f.write("This is an old file.")
+
+    with pytest.raises(FileNotFoundError):
+        moving_folder(src_folder, dst_folder)
+
+    # Assertions result
+    assert os.listdir(dst_folder) == ["old.txt"]
+
+    # Assertions logs
+    mock_log.error.assert_called_once()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("download.core.logger")
+def test_restore_paths(
+    mock_log: MagicMock,
+    setup_folders: Tuple[Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    """Test putting back replaced folders and files, the ones which did not exist are removed"""
+    src_folder, dst_folder = setup_folders
+    os.makedirs(dst_folder)
+    with open(dst_folder / "old.txt", "w", encoding="utf-8") as f:
+        f.write("This is an old file.")
+    manifest: Path = dst_folder.parent / "manifest.json"
+    manifest.write_text("old", encoding="utf-8")
+    new_folder: Path = dst_folder.parent / "new_folder"
+    paths = [dst_folder, manifest, new_folder]
+
+    backup_paths(paths)
+    moving_folder(src_folder, dst_folder)
+    manifest.with_name("manifest.json.tmp").write_text("new", encoding="utf-8")
+    os.replace(manifest.with_name("manifest.json.tmp"), manifest)
+    os.makedirs(new_folder)
+    restore_paths(paths)
+
+    # Assertions result
+    assert os.listdir(dst_folder) == ["old.txt"]
+    assert manifest.read_text(encoding="utf-8") == "old"
+    assert sorted(os.listdir(dst_folder.parent)) == ["dst_folder", "manifest.json"]
+
+    # a discarded copy leaves the replaced content
+    backup_paths(paths)
+    moving_folder(dst_folder, new_folder)
+    discard_backups(paths)
+    assert os.listdir(new_folder) == ["old.txt"]
+    assert sorted(os.listdir(dst_folder.parent)) == ["manifest.json", "new_folder"]
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
 @pytest.mark.asyncio
 @patch("download.core.logger")
 @patch("download.core.moving_folder", return_value=None)
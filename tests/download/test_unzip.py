@@ -10,11 +10,13 @@ import zipfile
 
 import pytest
 
-from download.core import unzip_file, unzip_file_async
+from download.core import check_zip_file_async, extract_members, replace_zip_file, sync_zip_folder_async, \
+    unzip_file_async
 
 
+@pytest.mark.asyncio
 @patch("download.core.logger")
-def test_unzip_file_success(
+async def test_unzip_file_success(
         mock_log: MagicMock,
         valid_zip: Tuple[Path, Path],
         mock_bot: MagicMock) -> None:
@@ -27,7 +29,7 @@ def test_unzip_file_success(
     os.makedirs(dst_folder, exist_ok=True)
 
     # Call the unzip function
-    unzip_file(zip_path, dst_folder)
+    await unzip_file_async(zip_path, dst_folder)
 
     # Check if the file has been extracted
     extracted_file_path: Path = dst_folder / "test.txt"
@@ -52,8 +54,9 @@ def test_unzip_file_success(
     mock_bot.update_lock.__aexit__.assert_not_called()
 
 
+@pytest.mark.asyncio
 @patch("download.core.logger")
-def test_unzip_file_bad_zip(
+async def test_unzip_file_bad_zip(
         mock_log: MagicMock,
         tmp_path: Path,
         mock_bot: MagicMock) -> None:
@@ -66,7 +69,7 @@ def test_unzip_file_bad_zip(
 
         # Call the unzip function and expect it to raise an exception
         with pytest.raises(zipfile.BadZipFile):
-            unzip_file(bad_zip_path, tmp_path)
+            await unzip_file_async(bad_zip_path, tmp_path)
 
     # Assertions logs
     mock_log.info.assert_has_calls([
@@ -83,8 +86,9 @@ def test_unzip_file_bad_zip(
     mock_bot.update_lock.__aexit__.assert_not_called()
 
 
+@pytest.mark.asyncio
 @patch("download.core.logger")
-def test_unzip_file_file_not_found(
+async def test_unzip_file_file_not_found(
     mock_log: MagicMock,
     tmp_path: Path,
     mock_bot: MagicMock) -> None:
@@ -95,7 +99,7 @@ def test_unzip_file_file_not_found(
 
     # Call the unzip function and expect it to raise an exception
     with pytest.raises(FileNotFoundError):
-        unzip_file(non_existent_zip_path, tmp_path)
+        await unzip_file_async(non_existent_zip_path, tmp_path)
 
     # Assertions logs
     mock_log.info.assert_has_calls([
@@ -114,29 +118,127 @@ def test_unzip_file_file_not_found(
 
 @pytest.mark.asyncio
 @patch("download.core.logger")
-@patch("download.core.unzip_file", return_value=None)
+@patch("download.core.UPDATE_WORKERS", 3)
 async def test_unzip_file_async_success(
-    mock_unzip_file: MagicMock,
     mock_log: MagicMock,
-    valid_zip: Tuple[Path, Path],
+    tmp_path: Path,
     mock_bot: MagicMock) -> None:
 
-    """Test a correct unzipping"""
-    # Get the zip file path and destination folder
-    zip_path, dst_folder = valid_zip
+    """Test a correct unzipping, the files being extracted in parallel"""
+    zip_path: Path = tmp_path / "data.zip"
+    dst_folder: Path = tmp_path / "dst"
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.writestr("json/acteur/", "")
+        for index in range(10):
+            zipf.writestr(f"json/acteur/PA{index}.json", str(index) * index)
+        zipf.writestr("json/organe/PO1.json", "organe")
+        zipf.writestr("../outside.json", "ignored")
 
     # Call the unzip function
-    await unzip_file_async(zip_path, dst_folder)
+    with patch("download.core.extract_members", wraps=extract_members) as mock_extract_members:
+        await unzip_file_async(zip_path, dst_folder)
+
+    # Assertions result
+    assert sorted(os.listdir(dst_folder / "json" / "acteur")) == sorted(f"PA{index}.json" for index in range(10))
+    assert (dst_folder / "json" / "acteur" / "PA9.json").read_text(encoding="utf-8") == "9" * 9
+    assert (dst_folder / "json" / "organe" / "PO1.json").read_text(encoding="utf-8") == "organe"
+    assert not (tmp_path / "outside.json").exists()
 
     # Assertions subfunctions
-    mock_unzip_file.assert_has_calls([
-        call(zip_path, dst_folder)
+    assert mock_extract_members.call_count == 3
+    assert sum(len(args[1]) for args, _ in mock_extract_members.call_args_list) == 11
+
+    # Assertions logs
+    mock_log.info.assert_has_calls([
+        call("Unzipping file %s to %s", zip_path, dst_folder),
+        call("Unzip done"),
+    ])
+    mock_log.warning.assert_called_once()
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.core.logger")
+async def test_sync_zip_folder(
+        mock_log: MagicMock,
+        tmp_path: Path,
+        mock_bot: MagicMock) -> None:
+
+    """Test a synchronization only extracting the added or modified files"""
+    zip_path: Path = tmp_path / "data.zip"
+    dst_folder: Path = tmp_path / "dst"
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.writestr("json/V1.json", "unchanged")
+        zipf.writestr("json/V2.json", "modified")
+        zipf.writestr("json/V3.json", "added")
+        zipf.writestr("other/V4.json", "ignored")
+    dst_folder.mkdir()
+    for name, content in (("V1.json", "unchanged"), ("V2.json", "old"), ("V9.json", "removed")):
+        with open(dst_folder / name, "w", encoding="utf-8") as f:
+            f.write(content)
+    with zipfile.ZipFile(zip_path) as zipf:
+        previous_manifest = {"V1.json": [9, zipf.getinfo("json/V1.json").CRC], "V2.json": [3, 0], "V9.json": [7, 0]}
+    mtime_unchanged: int = os.stat(dst_folder / "V1.json").st_mtime_ns
+
+    # Call the sync function
+    manifest = await sync_zip_folder_async(zip_path, "json", dst_folder, previous_manifest)
+
+    # Assertions result
+    assert sorted(manifest) == ["V1.json", "V2.json", "V3.json"]
+    assert manifest["V1.json"] == previous_manifest["V1.json"]
+    assert sorted(os.listdir(dst_folder)) == ["V1.json", "V2.json", "V3.json"]
+    assert (dst_folder / "V2.json").read_text(encoding="utf-8") == "modified"
+    assert (dst_folder / "V3.json").read_text(encoding="utf-8") == "added"
+    assert os.stat(dst_folder / "V1.json").st_mtime_ns == mtime_unchanged
+
+    # Assertions logs
+    mock_log.info.assert_has_calls([
+        call("Synchronizing %s/%s to %s", zip_path, "json", dst_folder),
+        call("Synchronization done, %s added or modified, %s removed", 2, 1),
     ])
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("download.core.logger")
+def test_replace_zip_file(
+        mock_log: MagicMock,
+        tmp_path: Path,
+        mock_bot: MagicMock) -> None:
+
+    """Test replacing a zip file, the previous one staying readable when open"""
+    zip_path: Path = tmp_path / "download" / "data.zip"
+    dst_path: Path = tmp_path / "data" / "scrutins.zip"
+    zip_path.parent.mkdir()
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.writestr("json/V1.json", "new")
+    dst_path.parent.mkdir()
+    with zipfile.ZipFile(dst_path, "w") as zipf:
+        zipf.writestr("json/V1.json", "old")
+
+    # Call the replace function
+    with zipfile.ZipFile(dst_path) as previous:
+        replace_zip_file(zip_path, dst_path)
+        previous_content: bytes = previous.read("json/V1.json")
+
+    # Assertions result
+    assert previous_content == b"old"
+    with zipfile.ZipFile(dst_path) as zipf:
+        assert zipf.read("json/V1.json") == b"new"
+    assert not zip_path.exists()
+    assert sorted(os.listdir(dst_path.parent)) == ["scrutins.zip"]
 
     # Assertions logs
-    mock_log.info.assert_not_called()
     mock_log.error.assert_not_called()
-    mock_log.warning.assert_not_called()
 
     # Assertions bot
     mock_bot.assert_not_called()
@@ -146,31 +248,108 @@ async def test_unzip_file_async_success(
 
 @pytest.mark.asyncio
 @patch("download.core.logger")
-@patch("download.core.unzip_file", side_effect=Exception("Unzip failure"))
-async def test_unzip_file_async_failure(
-    mock_unzip_file: MagicMock,
-    mock_log: MagicMock,
-    tmp_path: Path,
-    mock_bot: MagicMock) -> None:
+@patch("download.core.UPDATE_WORKERS", 2)
+async def test_sync_zip_folder_async(
+        mock_log: MagicMock,
+        tmp_path: Path,
+        mock_bot: MagicMock) -> None:
 
-    """Test unzipping an invalid file"""
-    # Create an invalid zip file (not actually a zip file)
-    bad_zip_path: Path = tmp_path / "bad.zip"
-    with open(bad_zip_path, "w", encoding="utf-8") as f:
-        f.write("This is not a zip file.")
+    """Test a synchronization extracting the added or modified files in parallel"""
+    zip_path: Path = tmp_path / "data.zip"
+    dst_folder: Path = tmp_path / "dst"
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        for index in range(5):
+            zipf.writestr(f"json/V{index}.json", f"new {index}")
+    dst_folder.mkdir()
+    (dst_folder / "V9.json").write_text("removed", encoding="utf-8")
 
-    # Call the unzip function and expect it to raise an exception
-    with pytest.raises(Exception):
-        await unzip_file_async(bad_zip_path, tmp_path)
+    # Call the sync function
+    manifest = await sync_zip_folder_async(zip_path, "json", dst_folder, {})
 
-    # Assertions subfunctions
-    mock_unzip_file.assert_has_calls([
-        call(bad_zip_path, tmp_path)
-    ])
+    # Assertions result
+    assert sorted(manifest) == [f"V{index}.json" for index in range(5)]
+    assert sorted(os.listdir(dst_folder)) == [f"V{index}.json" for index in range(5)]
+    assert (dst_folder / "V3.json").read_text(encoding="utf-8") == "new 3"
 
     # Assertions logs
-    mock_log.info.assert_not_called()
+    mock_log.info.assert_has_calls([
+        call("Synchronizing %s/%s to %s", zip_path, "json", dst_folder),
+        call("Synchronization done, %s added or modified, %s removed", 5, 1),
+    ])
     mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.core.logger")
+@patch("download.core.UPDATE_WORKERS", 2)
+async def test_check_zip_file_async_bad_crc(
+        mock_log: MagicMock,
+        tmp_path: Path,
+        mock_bot: MagicMock) -> None:
+
+    """Test a zip file with a corrupted file being rejected by the parallel check"""
+    zip_path: Path = tmp_path / "data.zip"
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.writestr("json/V1.json", "content")
+        zipf.writestr("json/V2.json", "other")
+    await check_zip_file_async(zip_path)
+    data: bytes = zip_path.read_bytes()
+    zip_path.write_bytes(data.replace(b"content", b"CONTENT"))
+
+    # Call the check function
+    with pytest.raises(zipfile.BadZipFile):
+        await check_zip_file_async(zip_path)
+
+    # Assertions logs
+    mock_log.error.assert_called_once_with("%s is not a correct Zip File.", zip_path)
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.core.logger")
+async def test_check_zip_file_async_previous(
+        mock_log: MagicMock,
+        tmp_path: Path,
+        mock_bot: MagicMock) -> None:
+
+    """Test only the files modified since a previous zip file being checked"""
+    previous_path: Path = tmp_path / "previous.zip"
+    with zipfile.ZipFile(previous_path, "w") as zipf:
+        zipf.writestr("json/V1.json", "content")
+        zipf.writestr("json/V2.json", "other")
+    zip_path: Path = tmp_path / "data.zip"
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.writestr("json/V1.json", "content")
+        zipf.writestr("json/V2.json", "modified")
+    data: bytes = zip_path.read_bytes()
+
+    # Call the check function, the corrupted file is left as it was in the previous zip file
+    zip_path.write_bytes(data.replace(b"content", b"CONTENT"))
+    await check_zip_file_async(zip_path, previous_path)
+
+    # every file is checked without a valid previous zip file
+    with pytest.raises(zipfile.BadZipFile):
+        await check_zip_file_async(zip_path, tmp_path / "missing.zip")
+
+    # a corrupted modified file is still rejected
+    zip_path.write_bytes(data.replace(b"modified", b"MODIFIED"))
+    with pytest.raises(zipfile.BadZipFile):
+        await check_zip_file_async(zip_path, previous_path)
+
+    # Assertions logs
+    mock_log.error.assert_has_calls([
+        call("%s is not a correct Zip File.", zip_path),
+        call("%s is not a correct Zip File.", zip_path),
+    ])
     mock_log.warning.assert_not_called()
 
     # Assertions bot
@@ -2,49 +2,47 @@
 # See LICENSE file for extended copyright information.
 # This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
 
+import asyncio
 from datetime import datetime
 from pathlib import Path
-from unittest.mock import call, patch, MagicMock
+from typing import Any, Dict, Optional
+from unittest.mock import ANY, AsyncMock, call, patch, MagicMock
 
 import pytest
 
 from common import config
-from download.update import start_planning, update, \
-    update_async, update_scrutins, update_acteur_organe
+from download.update import commit_acteur_organe, commit_scrutins, fetch_acteur_organe, fetch_scrutins, \
+    load_validators, save_validators, start_planning, update, update_async
 
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
-@patch("download.update.moving_folder_async")
-@patch("download.update.unzip_file_async")
+@patch("download.update.check_zip_file_async")
 @patch("download.update.download_file_async")
-async def test_update_scrutins_success(
+async def test_fetch_scrutins_success(
     mock_download_file_async: MagicMock,
-    mock_unzip_file_async: MagicMock,
-    mock_moving_file_async: MagicMock,
+    mock_check_zip_file_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
     # Setup
     mock_temp_dir_path = Path("/tmp_dir/")
+    mock_session = MagicMock()
 
     # Mock the behavior of each function to simulate success
-    mock_download_file_async.return_value = None  # No error
-    mock_unzip_file_async.return_value = None  # No error
-    mock_moving_file_async.return_value = None  # No error
+    mock_download_file_async.return_value = {"etag": "\"1\""}  # Modified
 
-    # Call the update_scrutins function
-    await update_scrutins(mock_temp_dir_path, mock_temp_dir_path)
+    # Call the fetch_scrutins function
+    result = await fetch_scrutins(mock_temp_dir_path, None, mock_session)
+
+    # Assertions result
+    assert result == {"etag": "\"1\""}
 
     # Assertions subfunctions
     mock_download_file_async.assert_has_calls([
-        call(config.UPDATE_URL_DOWNLOAD_SCRUTINS, Path("/tmp_dir/data_scrutins.zip"))
-    ])
-    mock_unzip_file_async.assert_has_calls([
-        call(Path("/tmp_dir/data_scrutins.zip"), Path("/tmp_dir/scrutins"))
-    ])
-    mock_moving_file_async.assert_has_calls([
-        call(Path("/tmp_dir/scrutins/json"), config.SCRUTINS_FOLDER)
+        call(config.UPDATE_URL_DOWNLOAD_SCRUTINS, Path("/tmp_dir/data_scrutins.zip"), None, mock_session)
     ])
+    # the extracted files are checked as they are extracted
+    mock_check_zip_file_async.assert_not_called()
 
     # Assertions log
     mock_log.info.assert_not_called()
@@ -59,13 +57,79 @@ async def test_update_scrutins_success(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
-@patch("download.update.moving_folder_async")
-@patch("download.update.unzip_file_async")
+@patch("download.update.check_zip_file_async")
 @patch("download.update.download_file_async")
-async def test_update_scrutins_download_fail(
+async def test_fetch_scrutins_not_modified(
+    mock_download_file_async: MagicMock,
+    mock_check_zip_file_async: MagicMock,
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+    # Setup
+    mock_temp_dir_path = Path("/tmp_dir/")
+    previous = {"etag": "\"1\""}
+    validators = {config.UPDATE_URL_DOWNLOAD_SCRUTINS: previous}
+
+    # Mock a 304 response
+    mock_download_file_async.return_value = None
+
+    # Call the fetch_scrutins function with an existing data folder
+    with patch("download.update.SCRUTINS_FOLDER", tmp_path):
+        result = await fetch_scrutins(mock_temp_dir_path, validators)
+
+    # Assertions result
+    assert result is None
+    assert validators == {config.UPDATE_URL_DOWNLOAD_SCRUTINS: previous}
+
+    # Assertions subfunctions
+    mock_download_file_async.assert_has_calls([
+        call(config.UPDATE_URL_DOWNLOAD_SCRUTINS, Path("/tmp_dir/data_scrutins.zip"), previous, None)
+    ])
+    mock_check_zip_file_async.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.update.logger")
+@patch("download.update.check_zip_file_async", AsyncMock())
+@patch("download.update.download_file_async")
+async def test_fetch_scrutins_missing_folder(
+    mock_download_file_async: MagicMock,
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+    # Setup
+    mock_temp_dir_path = Path("/tmp_dir/")
+    validators = {config.UPDATE_URL_DOWNLOAD_SCRUTINS: {"etag": "\"1\""}}
+    mock_download_file_async.return_value = {"etag": "\"2\""}
+
+    # Call the fetch_scrutins function without data folder, the download is not conditional
+    with patch("download.update.SCRUTINS_FOLDER", tmp_path / "missing"):
+        result = await fetch_scrutins(mock_temp_dir_path, validators)
+
+    # Assertions result
+    assert result == {"etag": "\"2\""}
+
+    # Assertions subfunctions
+    mock_download_file_async.assert_has_calls([
+        call(config.UPDATE_URL_DOWNLOAD_SCRUTINS, Path("/tmp_dir/data_scrutins.zip"), None, None)
+    ])
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.update.logger")
+@patch("download.update.download_file_async")
+async def test_fetch_scrutins_download_fail(
     mock_download_file_async: MagicMock,
-    mock_unzip_file_async: MagicMock,
-    mock_moving_file_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
     # Setup
@@ -74,16 +138,14 @@ async def test_update_scrutins_download_fail(
     # Mock download failure (download_file raises an exception)
     mock_download_file_async.side_effect = Exception("Download failed")
 
-    # Call the update_scrutins function and assert exception
+    # Call the fetch_scrutins function and assert exception
     with pytest.raises(Exception):
-        await update_scrutins(mock_temp_dir_path, mock_temp_dir_path)
+        await fetch_scrutins(mock_temp_dir_path)
 
     # Assertions subfunctions
     mock_download_file_async.assert_has_calls([
-        call(config.UPDATE_URL_DOWNLOAD_SCRUTINS, Path("/tmp_dir/data_scrutins.zip"))
+        call(config.UPDATE_URL_DOWNLOAD_SCRUTINS, Path("/tmp_dir/data_scrutins.zip"), None, None)
     ])
-    mock_unzip_file_async.assert_not_called()
-    mock_moving_file_async.assert_not_called()
 
     # Assertions log
     mock_log.error.assert_has_calls([
@@ -102,45 +164,82 @@ async def test_update_scrutins_download_fail(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
-@patch("download.update.moving_folder_async")
-@patch("download.update.unzip_file_async")
+@patch("download.update.SCRUTINS_FROM_ZIP", True)
+@patch("download.update.SCRUTINS_ZIP_FILE", Path("/data/scrutins.zip"))
+@patch("download.update.check_zip_file_async")
 @patch("download.update.download_file_async")
-async def test_update_scrutins_unzip_fail(
+async def test_fetch_scrutins_check_fail(
     mock_download_file_async: MagicMock,
-    mock_unzip_file_async: MagicMock,
-    mock_moving_file_async: MagicMock,
+    mock_check_zip_file_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
     # Setup
     mock_temp_dir_path = Path("/tmp_dir/")
 
-    # Mock download success and unzip failure
-    mock_download_file_async.return_value = None  # No error
-    mock_unzip_file_async.side_effect = Exception("Unzip failed")
+    # Mock download success and a corrupted archive
+    mock_download_file_async.return_value = {"etag": "\"1\""}  # Modified
+    mock_check_zip_file_async.side_effect = Exception("Bad CRC-32")
 
-    # Call the update_scrutins function and assert exception
+    # Call the fetch_scrutins function and assert exception
     with pytest.raises(Exception):
-        await update_scrutins(mock_temp_dir_path, mock_temp_dir_path)
+        await fetch_scrutins(mock_temp_dir_path)
 
-    # Assertions subfunctions
-    mock_download_file_async.assert_has_calls([
-        call(config.UPDATE_URL_DOWNLOAD_SCRUTINS, Path("/tmp_dir/data_scrutins.zip"))
-    ])
-    mock_unzip_file_async.assert_has_calls([
-        call(Path("/tmp_dir/data_scrutins.zip"), Path("/tmp_dir/scrutins"))
-    ])
-    mock_moving_file_async.assert_not_called()
+    # Assertions subfunctions, only the files modified since the kept zip file are checked
+    mock_check_zip_file_async.assert_awaited_once_with(
+        Path("/tmp_dir/data_scrutins.zip"), Path("/data/scrutins.zip")
+    )
 
     # Assertions log
     mock_log.error.assert_has_calls([
-        call("Update failed : %s", "unzipping failed"),
-        call("Error : %s", "Unzip failed"),
+        call("Update failed : %s", "checking zip failed"),
+        call("Error : %s", "Bad CRC-32"),
         call("=== Update failed ===")
     ])
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.update.logger")
+@patch("download.update.save_manifest")
+@patch("download.update.load_manifest")
+@patch("download.update.sync_zip_folder_async")
+@patch("download.update.keep_scrutin_files_async")
+async def test_commit_scrutins_success(
+    mock_keep_scrutin_files_async: MagicMock,
+    mock_sync_zip_folder_async: MagicMock,
+    mock_load_manifest: MagicMock,
+    mock_save_manifest: MagicMock,
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+    # Setup
+    mock_temp_dir_path = Path("/tmp_dir/")
+    previous_manifest = {"VTANR5L17V1.json": [10, 1]}
+    manifest = {"VTANR5L17V1.json": [10, 1], "VTANR5L17V2.json": [20, 2]}
+
+    # Mock the behavior of each function to simulate success
+    mock_load_manifest.return_value = previous_manifest
+    mock_sync_zip_folder_async.return_value = manifest
+
+    # Call the commit_scrutins function
+    await commit_scrutins(mock_temp_dir_path)
+
+    # Assertions subfunctions
+    mock_keep_scrutin_files_async.assert_called_once_with()
+    mock_sync_zip_folder_async.assert_has_calls([
+        call(Path("/tmp_dir/data_scrutins.zip"), "json", config.SCRUTINS_FOLDER, previous_manifest)
+    ])
+    mock_save_manifest.assert_called_once_with(manifest)
+
+    # Assertions log
     mock_log.info.assert_not_called()
+    mock_log.error.assert_not_called()
     mock_log.warning.assert_not_called()
 
-    ## Assertions bot
+    # Assertions bot
     mock_bot.assert_not_called()
     mock_bot.update_lock.__aenter__.assert_not_called()
     mock_bot.update_lock.__aexit__.assert_not_called()
@@ -148,48 +247,75 @@ async def test_update_scrutins_unzip_fail(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
-@patch("download.update.moving_folder_async")
-@patch("download.update.unzip_file_async")
-@patch("download.update.download_file_async")
-async def test_update_scrutins_move_fail(
-    mock_download_file_async: MagicMock,
-    mock_unzip_file_async: MagicMock,
-    mock_moving_file_async: MagicMock,
+@patch("download.update.SCRUTINS_FROM_ZIP", True)
+@patch("download.update.SCRUTINS_ZIP_FILE", Path("/data/scrutins.zip"))
+@patch("download.update.save_manifest")
+@patch("download.update.sync_zip_folder_async")
+@patch("download.update.replace_zip_file_async")
+async def test_commit_scrutins_from_zip(
+    mock_replace_zip_file_async: MagicMock,
+    mock_sync_zip_folder_async: MagicMock,
+    mock_save_manifest: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
     # Setup
     mock_temp_dir_path = Path("/tmp_dir/")
 
-    # Mock download and unzip success, and move folder failure
-    mock_download_file_async.return_value = None  # No error
-    mock_unzip_file_async.return_value = None  # No error
-    mock_moving_file_async.side_effect = Exception("Move folder failed")
+    # Call the commit_scrutins function
+    await commit_scrutins(mock_temp_dir_path)
 
-    # Call the update_scrutins function and assert exception
+    # Assertions subfunctions
+    mock_replace_zip_file_async.assert_called_once_with(
+        Path("/tmp_dir/data_scrutins.zip"), Path("/data/scrutins.zip")
+    )
+    mock_sync_zip_folder_async.assert_not_called()
+    mock_save_manifest.assert_not_called()
+
+    # Assertions log
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.update.logger")
+@patch("download.update.save_manifest")
+@patch("download.update.load_manifest", MagicMock(return_value={}))
+@patch("download.update.sync_zip_folder_async")
+async def test_commit_scrutins_unzip_fail(
+    mock_sync_zip_folder_async: MagicMock,
+    mock_save_manifest: MagicMock,
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+    # Setup
+    mock_temp_dir_path = Path("/tmp_dir/")
+
+    # Mock unzip failure
+    mock_sync_zip_folder_async.side_effect = Exception("Unzip failed")
+
+    # Call the commit_scrutins function and assert exception
     with pytest.raises(Exception):
-        await update_scrutins(mock_temp_dir_path, mock_temp_dir_path)
+        await commit_scrutins(mock_temp_dir_path)
 
     # Assertions subfunctions
-    mock_download_file_async.assert_has_calls([
-        call(config.UPDATE_URL_DOWNLOAD_SCRUTINS, Path("/tmp_dir/data_scrutins.zip"))
-    ])
-    mock_unzip_file_async.assert_has_calls([
-        call(Path("/tmp_dir/data_scrutins.zip"), Path("/tmp_dir/scrutins"))
-    ])
-    mock_moving_file_async.assert_has_calls([
-        call(Path("/tmp_dir/scrutins/json"), config.SCRUTINS_FOLDER)
+    mock_sync_zip_folder_async.assert_has_calls([
+        call(Path("/tmp_dir/data_scrutins.zip"), "json", config.SCRUTINS_FOLDER, {})
     ])
+    mock_save_manifest.assert_not_called()
 
     # Assertions log
     mock_log.error.assert_has_calls([
-        call("Update failed : %s", "moving folder failed"),
-        call("Error : %s", "Move folder failed"),
+        call("Update failed : %s", "unzipping failed"),
+        call("Error : %s", "Unzip failed"),
         call("=== Update failed ===")
     ])
     mock_log.info.assert_not_called()
     mock_log.warning.assert_not_called()
 
-    # Assertions bot
+    ## Assertions bot
     mock_bot.assert_not_called()
     mock_bot.update_lock.__aenter__.assert_not_called()
     mock_bot.update_lock.__aexit__.assert_not_called()
@@ -197,13 +323,11 @@ async def test_update_scrutins_move_fail(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
-@patch("download.update.moving_folder_async")
 @patch("download.update.unzip_file_async")
 @patch("download.update.download_file_async")
-async def test_update_acteur_organe_success(
+async def test_fetch_acteur_organe_success(
     mock_download_file_async: MagicMock,
     mock_unzip_file_async: MagicMock,
-    mock_moving_file_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
@@ -211,24 +335,22 @@ async def test_update_acteur_organe_success(
     mock_temp_dir_path = Path("/tmp_dir/")
 
     # Mock the behavior of each function to simulate success
-    mock_download_file_async.return_value = None  # No error
+    mock_download_file_async.return_value = {"etag": "\"1\""}  # Modified
     mock_unzip_file_async.return_value = None  # No error
-    mock_moving_file_async.return_value = None  # No error
 
-    # Call the update_acteur_organe function
-    await update_acteur_organe(mock_temp_dir_path, mock_temp_dir_path)
+    # Call the fetch_acteur_organe function
+    result = await fetch_acteur_organe(mock_temp_dir_path, mock_temp_dir_path)
+
+    # Assertions result
+    assert result == {"etag": "\"1\""}
 
     # Assertions subfunctions
     mock_download_file_async.assert_has_calls([
-        call(config.UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, Path("/tmp_dir/data_acteur_organe.zip"))
+        call(config.UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, Path("/tmp_dir/data_acteur_organe.zip"), None, None)
     ])
     mock_unzip_file_async.assert_has_calls([
         call(Path("/tmp_dir/data_acteur_organe.zip"), Path("/tmp_dir/acteur_organe"))
     ])
-    mock_moving_file_async.assert_has_calls([
-        call(Path("/tmp_dir/acteur_organe/json/acteur"), config.ACTEUR_FOLDER),
-        call(Path("/tmp_dir/acteur_organe/json/organe"), config.ORGANE_FOLDER),
-    ])
 
     # Assertions log
     mock_log.info.assert_not_called()
@@ -243,13 +365,11 @@ async def test_update_acteur_organe_success(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
-@patch("download.update.moving_folder_async")
 @patch("download.update.unzip_file_async")
 @patch("download.update.download_file_async")
-async def test_update_acteur_organe_download_fail(
+async def test_fetch_acteur_organe_download_fail(
     mock_download_file_async: MagicMock,
     mock_unzip_file_async: MagicMock,
-    mock_moving_file_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
@@ -259,16 +379,15 @@ async def test_update_acteur_organe_download_fail(
     # Mock download failure (download_file raises an exception)
     mock_download_file_async.side_effect = Exception("Download failed")
 
-    # Call the update_acteur_organe function and assert exception
+    # Call the fetch_acteur_organe function and assert exception
     with pytest.raises(Exception):
-        await update_acteur_organe(mock_temp_dir_path, mock_temp_dir_path)
+        await fetch_acteur_organe(mock_temp_dir_path, mock_temp_dir_path)
 
     # Assertions subfunctions
     mock_download_file_async.assert_has_calls([
-        call(config.UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, Path("/tmp_dir/data_acteur_organe.zip"))
+        call(config.UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, Path("/tmp_dir/data_acteur_organe.zip"), None, None)
     ])
     mock_unzip_file_async.assert_not_called()
-    mock_moving_file_async.assert_not_called()
 
     # Assertions log
     mock_log.error.assert_has_calls([
@@ -287,13 +406,11 @@ async def test_update_acteur_organe_download_fail(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
-@patch("download.update.moving_folder_async")
 @patch("download.update.unzip_file_async")
 @patch("download.update.download_file_async")
-async def test_update_acteur_organe_unzip_fail(
+async def test_fetch_acteur_organe_unzip_fail(
     mock_download_file_async: MagicMock,
     mock_unzip_file_async: MagicMock,
-    mock_moving_file_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
@@ -301,21 +418,17 @@ async def test_update_acteur_organe_unzip_fail(
     mock_temp_dir_path = Path("/tmp_dir/")
 
     # Mock download and unzip failure
-    mock_download_file_async.return_value = None  # No error
+    mock_download_file_async.return_value = {"etag": "\"1\""}  # Modified
     mock_unzip_file_async.side_effect = Exception("Unzip failed")
 
-    # Call the update_acteur_organe function and assert exception
+    # Call the fetch_acteur_organe function and assert exception
     with pytest.raises(Exception):
-        await update_acteur_organe(mock_temp_dir_path, mock_temp_dir_path)
+        await fetch_acteur_organe(mock_temp_dir_path, mock_temp_dir_path)
 
     # Assertions subfunctions
-    mock_download_file_async.assert_has_calls([
-        call(config.UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, Path("/tmp_dir/data_acteur_organe.zip"))
-    ])
     mock_unzip_file_async.assert_has_calls([
         call(Path("/tmp_dir/data_acteur_organe.zip"), Path("/tmp_dir/acteur_organe"))
     ])
-    mock_moving_file_async.assert_not_called()
 
     # Assertions log
     mock_log.error.assert_has_calls([
@@ -335,34 +448,54 @@ async def test_update_acteur_organe_unzip_fail(
 @pytest.mark.asyncio
 @patch("download.update.logger")
 @patch("download.update.moving_folder_async")
-@patch("download.update.unzip_file_async")
-@patch("download.update.download_file_async")
-async def test_update_acteur_organe_move_fail(
-    mock_download_file_async: MagicMock,
-    mock_unzip_file_async: MagicMock,
+async def test_commit_acteur_organe_success(
     mock_moving_file_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
     # Setup
     mock_temp_dir_path = Path("/tmp_dir/")
+    mock_moving_file_async.return_value = None  # No error
 
-    # Mock download and unzip success, and move folder failure
-    mock_download_file_async.return_value = None  # No error
-    mock_unzip_file_async.return_value = None  # No error
+    # Call the commit_acteur_organe function
+    await commit_acteur_organe(mock_temp_dir_path)
+
+    # Assertions subfunctions
+    mock_moving_file_async.assert_has_calls([
+        call(Path("/tmp_dir/acteur_organe/json/acteur"), config.ACTEUR_FOLDER),
+        call(Path("/tmp_dir/acteur_organe/json/organe"), config.ORGANE_FOLDER),
+    ])
+
+    # Assertions log
+    mock_log.info.assert_not_called()
+    mock_log.error.assert_not_called()
+    mock_log.warning.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.update.logger")
+@patch("download.update.moving_folder_async")
+async def test_commit_acteur_organe_move_fail(
+    mock_moving_file_async: MagicMock,
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    # Setup
+    mock_temp_dir_path = Path("/tmp_dir/")
+
+    # Mock move folder failure
     mock_moving_file_async.side_effect = Exception("Move folder failed")
 
-    # Call the update_acteur_organe function and assert exception
+    # Call the commit_acteur_organe function and assert exception
     with pytest.raises(Exception):
-        await update_acteur_organe(mock_temp_dir_path, mock_temp_dir_path)
+        await commit_acteur_organe(mock_temp_dir_path)
 
     # Assertions subfunctions
-    mock_download_file_async.assert_has_calls([
-        call(config.UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE, Path("/tmp_dir/data_acteur_organe.zip"))
-    ])
-    mock_unzip_file_async.assert_has_calls([
-        call(Path("/tmp_dir/data_acteur_organe.zip"), Path("/tmp_dir/acteur_organe"))
-    ])
     mock_moving_file_async.assert_has_calls([
         call(Path("/tmp_dir/acteur_organe/json/acteur"), config.ACTEUR_FOLDER)
     ])
@@ -384,11 +517,24 @@ async def test_update_acteur_organe_move_fail(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
-@patch("download.update.update_acteur_organe")
-@patch("download.update.update_scrutins")
+@patch("download.update.save_validators")
+@patch("download.update.load_validators", MagicMock(return_value={}))
+@patch("download.update.discard_backups_async")
+@patch("download.update.restore_paths_async")
+@patch("download.update.backup_paths_async")
+@patch("download.update.commit_acteur_organe")
+@patch("download.update.commit_scrutins")
+@patch("download.update.fetch_acteur_organe")
+@patch("download.update.fetch_scrutins")
 async def test_update_async_success(
-    mock_update_scrutins: MagicMock,
-    mock_update_acteur_organe: MagicMock,
+    mock_fetch_scrutins: MagicMock,
+    mock_fetch_acteur_organe: MagicMock,
+    mock_commit_scrutins: MagicMock,
+    mock_commit_acteur_organe: MagicMock,
+    mock_backup_paths_async: MagicMock,
+    mock_restore_paths_async: MagicMock,
+    mock_discard_backups_async: MagicMock,
+    mock_save_validators: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
@@ -400,19 +546,35 @@ async def test_update_async_success(
 
     with patch('tempfile.TemporaryDirectory', mock_temp_dir):
         # Mock the behavior of each function to simulate success
-        mock_update_scrutins.return_value = None  # No error
-        mock_update_acteur_organe.return_value = None  # No error
+        mock_fetch_scrutins.return_value = {"etag": "\"1\""}  # Modified
+        mock_fetch_acteur_organe.return_value = {"etag": "\"2\""}  # Modified
 
         # Call the update_async function
-        await update_async(True)
+        result = await update_async(True)
+
+    # Assertions result
+    assert result is True
 
     # Assertions subfunctions
-    mock_update_scrutins.assert_has_calls([
-        call(mock_temp_dir_path, mock_temp_dir_path)
+    mock_fetch_scrutins.assert_has_calls([
+        call(mock_temp_dir_path, ANY, ANY)
     ])
-    mock_update_acteur_organe.assert_has_calls([
-        call(mock_temp_dir_path, mock_temp_dir_path)
+    mock_fetch_acteur_organe.assert_has_calls([
+        call(mock_temp_dir_path, mock_temp_dir_path, ANY, ANY)
     ])
+    # both downloads share the same session
+    assert mock_fetch_scrutins.call_args[0][2] is mock_fetch_acteur_organe.call_args[0][3]
+    mock_backup_paths_async.assert_awaited_once_with([
+        config.SCRUTINS_FOLDER, config.SCRUTINS_MANIFEST_FILE, config.ACTEUR_FOLDER, config.ORGANE_FOLDER
+    ])
+    mock_commit_scrutins.assert_awaited_once_with(mock_temp_dir_path)
+    mock_commit_acteur_organe.assert_awaited_once_with(mock_temp_dir_path)
+    mock_restore_paths_async.assert_not_called()
+    mock_discard_backups_async.assert_awaited_once_with(mock_backup_paths_async.call_args[0][0])
+    mock_save_validators.assert_called_once_with({
+        config.UPDATE_URL_DOWNLOAD_SCRUTINS: {"etag": "\"1\""},
+        config.UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE: {"etag": "\"2\""},
+    })
 
     # Assertions log
     mock_log.info.assert_has_calls([
@@ -430,11 +592,82 @@ async def test_update_async_success(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
-@patch("download.update.update_acteur_organe")
-@patch("download.update.update_scrutins")
+@patch("download.update.save_validators")
+@patch("download.update.load_validators", MagicMock(return_value={}))
+@patch("download.update.discard_backups_async")
+@patch("download.update.restore_paths_async")
+@patch("download.update.backup_paths_async")
+@patch("download.update.commit_acteur_organe")
+@patch("download.update.commit_scrutins")
+@patch("download.update.fetch_acteur_organe")
+@patch("download.update.fetch_scrutins")
+async def test_update_async_concurrent(
+    mock_fetch_scrutins: MagicMock,
+    mock_fetch_acteur_organe: MagicMock,
+    mock_commit_scrutins: MagicMock,
+    mock_commit_acteur_organe: MagicMock,
+    mock_backup_paths_async: MagicMock,
+    mock_restore_paths_async: MagicMock,
+    mock_discard_backups_async: MagicMock,
+    mock_save_validators: MagicMock,
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    mock_temp_dir_path = Path("/tmp_dir/")
+    mock_temp_dir_context_manager = MagicMock()
+    mock_temp_dir_context_manager.__enter__.return_value = mock_temp_dir_path
+    mock_temp_dir = MagicMock(return_value=mock_temp_dir_context_manager)
+
+    # the scrutins download only ends once the acteur and organe one started
+    acteur_organe_started = asyncio.Event()
+
+    async def fetch_scrutins(*args: Any) -> Optional[Dict[str, str]]:
+        await asyncio.wait_for(acteur_organe_started.wait(), 1)
+        return None  # Not modified
+
+    async def fetch_acteur_organe(*args: Any) -> Optional[Dict[str, str]]:
+        acteur_organe_started.set()
+        return {"etag": "\"2\""}  # Modified
+
+    with patch('tempfile.TemporaryDirectory', mock_temp_dir):
+        mock_fetch_scrutins.side_effect = fetch_scrutins
+        mock_fetch_acteur_organe.side_effect = fetch_acteur_organe
+
+        # Call the update_async function
+        result = await update_async(True)
+
+    # Assertions result
+    assert result is True
+
+    # Assertions subfunctions
+    mock_backup_paths_async.assert_awaited_once_with([config.ACTEUR_FOLDER, config.ORGANE_FOLDER])
+    mock_commit_scrutins.assert_not_called()
+    mock_commit_acteur_organe.assert_awaited_once_with(mock_temp_dir_path)
+    mock_save_validators.assert_called_once_with({config.UPDATE_URL_DOWNLOAD_ACTEUR_ORGANE: {"etag": "\"2\""}})
+
+    # Assertions log
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.update.logger")
+@patch("download.update.save_validators")
+@patch("download.update.load_validators", MagicMock(return_value={}))
+@patch("download.update.commit_acteur_organe")
+@patch("download.update.commit_scrutins")
+@patch("download.update.fetch_acteur_organe")
+@patch("download.update.fetch_scrutins")
 async def test_update_async_scrutins_fail(
-    mock_update_scrutins: MagicMock,
-    mock_update_acteur_organe: MagicMock,
+    mock_fetch_scrutins: MagicMock,
+    mock_fetch_acteur_organe: MagicMock,
+    mock_commit_scrutins: MagicMock,
+    mock_commit_acteur_organe: MagicMock,
+    mock_save_validators: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
@@ -444,18 +677,18 @@ async def test_update_async_scrutins_fail(
     mock_temp_dir = MagicMock(return_value=mock_temp_dir_context_manager)
 
     with patch('tempfile.TemporaryDirectory', mock_temp_dir):
-        # Mock update_scrutins failure
-        mock_update_scrutins.side_effect = Exception("Scrutins failed")
+        # Mock fetch_scrutins failure
+        mock_fetch_scrutins.side_effect = Exception("Scrutins failed")
+        mock_fetch_acteur_organe.return_value = {"etag": "\"2\""}  # Modified
 
        # Call the update_async function and assert exception
         with pytest.raises(Exception):
             await update_async(True)
 
-    # Assertions subfunctions
-    mock_update_scrutins.assert_has_calls([
-        call(mock_temp_dir_path, mock_temp_dir_path)
-    ])
-    mock_update_acteur_organe.assert_not_called()
+    # Assertions subfunctions, nothing is replaced
+    mock_commit_scrutins.assert_not_called()
+    mock_commit_acteur_organe.assert_not_called()
+    mock_save_validators.assert_not_called()
 
     # Assertions log
     mock_log.info.assert_has_calls([
@@ -474,11 +707,18 @@ async def test_update_async_scrutins_fail(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
-@patch("download.update.update_acteur_organe")
-@patch("download.update.update_scrutins")
+@patch("download.update.save_validators")
+@patch("download.update.load_validators", MagicMock(return_value={}))
+@patch("download.update.commit_acteur_organe")
+@patch("download.update.commit_scrutins")
+@patch("download.update.fetch_acteur_organe")
+@patch("download.update.fetch_scrutins")
 async def test_update_async_acteur_organe_fail(
-    mock_update_scrutins: MagicMock,
-    mock_update_acteur_organe: MagicMock,
+    mock_fetch_scrutins: MagicMock,
+    mock_fetch_acteur_organe: MagicMock,
+    mock_commit_scrutins: MagicMock,
+    mock_commit_acteur_organe: MagicMock,
+    mock_save_validators: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
@@ -487,22 +727,30 @@ async def test_update_async_acteur_organe_fail(
     mock_temp_dir_context_manager.__enter__.return_value = mock_temp_dir_path
     mock_temp_dir = MagicMock(return_value=mock_temp_dir_context_manager)
 
+    # the scrutins download is still running when the acteur and organe one fails
+    scrutins_cancelled = asyncio.Event()
+
+    async def fetch_scrutins(*args: Any) -> Optional[Dict[str, str]]:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            scrutins_cancelled.set()
+            raise
+        return None
+
     with patch('tempfile.TemporaryDirectory', mock_temp_dir):
-        # Mock update_scrutins success and update_acteur_organe failure
-        mock_update_scrutins.return_value = None  # No error
-        mock_update_acteur_organe.side_effect = Exception("Acteur_organe failed")
+        mock_fetch_scrutins.side_effect = fetch_scrutins
+        mock_fetch_acteur_organe.side_effect = Exception("Acteur_organe failed")
 
        # Call the update_async function and assert exception
         with pytest.raises(Exception):
             await update_async(True)
 
-    # Assertions subfunctions
-    mock_update_scrutins.assert_has_calls([
-        call(mock_temp_dir_path, mock_temp_dir_path)
-    ])
-    mock_update_acteur_organe.assert_has_calls([
-        call(mock_temp_dir_path, mock_temp_dir_path)
-    ])
+    # Assertions subfunctions, nothing is replaced
+    assert scrutins_cancelled.is_set()
+    mock_commit_scrutins.assert_not_called()
+    mock_commit_acteur_organe.assert_not_called()
+    mock_save_validators.assert_not_called()
 
     # Assertions log
     mock_log.info.assert_has_calls([
@@ -521,13 +769,77 @@ async def test_update_async_acteur_organe_fail(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
+@patch("download.update.save_validators")
+@patch("download.update.load_validators", MagicMock(return_value={}))
+@patch("download.update.discard_backups_async")
+@patch("download.update.restore_paths_async")
+@patch("download.update.backup_paths_async")
+@patch("download.update.commit_acteur_organe")
+@patch("download.update.commit_scrutins")
+@patch("download.update.fetch_acteur_organe")
+@patch("download.update.fetch_scrutins")
+async def test_update_async_commit_fail(
+    mock_fetch_scrutins: MagicMock,
+    mock_fetch_acteur_organe: MagicMock,
+    mock_commit_scrutins: MagicMock,
+    mock_commit_acteur_organe: MagicMock,
+    mock_backup_paths_async: MagicMock,
+    mock_restore_paths_async: MagicMock,
+    mock_discard_backups_async: MagicMock,
+    mock_save_validators: MagicMock,
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    mock_temp_dir_path = Path("/tmp_dir/")
+    mock_temp_dir_context_manager = MagicMock()
+    mock_temp_dir_context_manager.__enter__.return_value = mock_temp_dir_path
+    mock_temp_dir = MagicMock(return_value=mock_temp_dir_context_manager)
+
+    with patch('tempfile.TemporaryDirectory', mock_temp_dir):
+        # Mock commit_acteur_organe failure, after the scrutins are replaced
+        mock_fetch_scrutins.return_value = {"etag": "\"1\""}  # Modified
+        mock_fetch_acteur_organe.return_value = {"etag": "\"2\""}  # Modified
+        mock_commit_acteur_organe.side_effect = Exception("Acteur_organe failed")
+
+       # Call the update_async function and assert exception
+        with pytest.raises(Exception):
+            await update_async(True)
+
+    # Assertions subfunctions, the scrutins are put back with acteur and organe
+    paths = [config.SCRUTINS_FOLDER, config.SCRUTINS_MANIFEST_FILE, config.ACTEUR_FOLDER, config.ORGANE_FOLDER]
+    mock_backup_paths_async.assert_awaited_once_with(paths)
+    mock_commit_scrutins.assert_awaited_once_with(mock_temp_dir_path)
+    mock_commit_acteur_organe.assert_awaited_once_with(mock_temp_dir_path)
+    mock_restore_paths_async.assert_awaited_once_with(paths)
+    mock_discard_backups_async.assert_not_called()
+    mock_save_validators.assert_not_called()
+
+    # Assertions log
+    mock_log.error.assert_has_calls([
+        call("=== Update acteur and organe failed ===")
+    ])
+    mock_log.info.assert_has_calls([
+        call("=== Update starting ===")
+    ])
+    mock_log.warning.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.update.logger")
+@patch("download.update.load_data_async")
 @patch("download.update.update_async")
 async def test_update_success(
     mock_update_async: MagicMock,
+    mock_load_data_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
-    mock_update_async.return_value = None  # No error
+    mock_update_async.return_value = True  # Modified
 
     # Call the update function
     await update(mock_bot, False)
@@ -536,6 +848,7 @@ async def test_update_success(
     mock_update_async.assert_has_calls([
         call(False)
     ])
+    mock_load_data_async.assert_awaited_once()
 
     # Assertions log
     mock_log.info.assert_not_called()
@@ -550,9 +863,72 @@ async def test_update_success(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
+@patch("download.update.load_data_async")
+@patch("download.update.update_async")
+async def test_update_not_modified(
+    mock_update_async: MagicMock,
+    mock_load_data_async: MagicMock,
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    mock_update_async.return_value = False  # Not modified
+
+    # Call the update function
+    await update(mock_bot, False)
+
+    # Assertions subfunctions
+    mock_load_data_async.assert_not_called()
+
+    # Assertions log
+    mock_log.info.assert_has_calls([
+        call("Data not modified, keeping the current data generation")
+    ])
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_awaited_once()
+    mock_bot.update_lock.__aexit__.assert_awaited_once()
+
+
+@patch("download.update.logger")
+def test_validators(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+
+    validators = {"https://example.com/data.zip": {"etag": "\"1\"", "content-length": "42"}}
+    with patch("download.update.DOWNLOAD_CACHE_FILE", tmp_path / "cache" / "download_cache.json"):
+        missing = load_validators()
+        save_validators(validators)
+        loaded = load_validators()
+    with open(tmp_path / "invalid.json", "w", encoding="utf-8") as f:
+        f.write("not json")
+    with patch("download.update.DOWNLOAD_CACHE_FILE", tmp_path / "invalid.json"):
+        invalid = load_validators()
+
+    # Assertions result
+    assert missing == {}
+    assert loaded == validators
+    assert invalid == {}
+
+    # Assertions log
+    mock_log.warning.assert_called_once()
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.update.logger")
+@patch("download.update.load_data_async")
 @patch("download.update.update_async")
 async def test_update_fail(
     mock_update_async: MagicMock,
+    mock_load_data_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
@@ -565,6 +941,7 @@ async def test_update_fail(
     mock_update_async.assert_has_calls([
         call(False)
     ])
+    mock_load_data_async.assert_awaited_once()
 
     # Assertions log
     mock_log.info.assert_not_called()
@@ -581,11 +958,13 @@ async def test_update_fail(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
+@patch("download.update.load_data_async")
 @patch("download.update.compute_time_for_update")
 @patch("download.update.update")
 async def test_start_planning(
     mock_update: MagicMock,
     mock_compute_time_for_update: MagicMock,
+    mock_load_data_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
@@ -622,11 +1001,13 @@ async def test_start_planning(
 
 @pytest.mark.asyncio
 @patch("download.update.logger")
+@patch("download.update.load_data_async")
 @patch("download.update.compute_time_for_update")
 @patch("download.update.update")
 async def test_start_planning_update_compute_time_fail(
     mock_update: MagicMock,
     mock_compute_time_for_update: MagicMock,
+    mock_load_data_async: MagicMock,
     mock_log: MagicMock,
     mock_bot: MagicMock) -> None:
 
@@ -657,3 +1038,41 @@ async def test_start_planning_update_compute_time_fail(
     mock_bot.assert_not_called()
     mock_bot.update_lock.__aenter__.assert_not_called()
     mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("download.update.logger")
+@patch("download.update.load_data_async")
+@patch("download.update.compute_time_for_update")
+@patch("download.update.update")
+async def test_start_planning_without_update_at_launch(
+    mock_update: MagicMock,
+    mock_compute_time_for_update: MagicMock,
+    mock_load_data_async: MagicMock,
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    mock_update.return_value = None # No error
+    target_time = datetime(2020, 5, 17)
+    seconds_until_target = .01
+    max_iterations = 1
+    mock_compute_time_for_update.return_value = (target_time, seconds_until_target)
+
+    # Call the start_planning function
+    await start_planning(mock_bot, False, max_iterations=max_iterations)
+
+    # Assertions subfunctions
+    mock_load_data_async.assert_awaited_once()
+    assert mock_update.call_count == max_iterations
+
+    # Assertions log
+    mock_log.info.assert_has_calls([
+        call("Update planed at %s in %s seconds.", target_time, seconds_until_target),
+    ])
+    mock_log.error.assert_not_called()
+    mock_log.warning.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
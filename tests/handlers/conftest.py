@@ -3,10 +3,14 @@
 # This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
 
 import pathlib
+from typing import Any, Callable
 from unittest.mock import patch
 
 import pytest
 
+from utils.dataManager import Dataset
+from utils.deputeManager import Depute, DeputeRepository
+
 DATA_TEST = pathlib.Path(__file__).parent.resolve() / ".." / "data" / "2024-04-07"
 DATA_TEST_SCRUTINS = DATA_TEST / 'scrutins'
 DATA_TEST_ACTEUR = DATA_TEST / 'acteur'
@@ -19,6 +23,17 @@ def mock_folder_paths():
             patch('utils.deputeManager.ORGANE_FOLDER', DATA_TEST_ORGANE):
         yield
 
+def make_repository(*deputes: Depute) -> DeputeRepository:
+    """Build a député repository holding the given députés"""
+    repository = DeputeRepository()
+    repository.index(deputes)
+    return repository
+
+def make_dataset(**stores: Any) -> Callable[[], Dataset]:
+    """Build a current_dataset replacement serving a generation holding the given stores"""
+    dataset = Dataset(generation=1, **stores)
+    return lambda: dataset
+
 @pytest.fixture(params=[
     ("Panot", "Mathilde Panot"),
     ("PaNoT", "Mathilde Panot"),
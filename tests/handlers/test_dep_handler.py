@@ -1,13 +1,16 @@
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock
 import pytest
 from discord import Embed
 
 from common.config import DISCORD_EMBED_COLOR_MSG, DISCORD_EMBED_COLOR_ERR
 from handlers.deputeHandler import dep_handler
+from utils.paginatorManager import Pages
+from tests.handlers.conftest import make_dataset, make_repository
 
 
 def mock_depute():
     depute = MagicMock()
+    depute.ref = "PA1"
     depute.first_name = "Lucie"
     depute.last_name = "Durand"
     depute.url = "http://example.com/lucie"
@@ -21,6 +24,7 @@ def mock_depute():
 
 def mock_depute_2():
     depute = MagicMock()
+    depute.ref = "PA2"
     depute.first_name = "Jean"
     depute.last_name = "Martin"
     depute.url = "http://example.com/jean"
@@ -33,10 +37,9 @@ def mock_depute_2():
     return depute
 
 
-@patch('os.listdir', return_value=["depute_data_75_01.json", "depute_data_99_10.json"])
-@patch('utils.deputeManager.Depute.from_json_by_dep', side_effect=[mock_depute(), mock_depute_2()])
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_dep_handler_found(_mock_depute, _mock_listdir):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute(), mock_depute_2())))
+def test_dep_handler_found():
     embed = dep_handler("75")
     print(embed.description)
     assert isinstance(embed, Embed)
@@ -48,10 +51,9 @@ def test_dep_handler_found(_mock_depute, _mock_listdir):
 
 
 @pytest.mark.parametrize("code_dep", ["00", "XX"])
-@patch('os.listdir', return_value=["depute_data_75_01.json", "depute_data_99_10.json"])
-@patch('utils.deputeManager.Depute.from_json_by_dep', return_value=None)
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_dep_handler_not_found(_mock_depute, _mock_listdir, code_dep):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute(), mock_depute_2())))
+def test_dep_handler_not_found(code_dep):
     embed = dep_handler(code_dep)
 
     assert embed.title == "Député non trouvé"
@@ -60,9 +62,9 @@ def test_dep_handler_not_found(_mock_depute, _mock_listdir, code_dep):
 
 
 @pytest.mark.parametrize("code_dep", ["75"])
-@patch('os.listdir', return_value=[])
-@patch('utils.deputeManager.Depute.from_json_by_dep', return_value=None)
-def test_dep_handler_no_files(_mock_listdir, _mock_depute, code_dep):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository()))
+def test_dep_handler_empty_repository(code_dep):
     embed = dep_handler(code_dep)
 
     assert embed.title == "Député non trouvé"
@@ -70,13 +72,22 @@ def test_dep_handler_no_files(_mock_listdir, _mock_depute, code_dep):
     assert int(embed.color) == DISCORD_EMBED_COLOR_ERR
 
 
-@pytest.mark.parametrize("code_dep", ["75"])
-@patch('os.listdir', return_value=["bad_file.json"])
-@patch('utils.deputeManager.Depute.from_json_by_dep', side_effect=lambda data, code_dep: mock_depute() if "75" in data else None)
-@patch('builtins.open', mock_open(read_data='not json'))
-def test_dep_handler_malformed_json(_mock_depute, _mock_listdir, code_dep):
-    embed = dep_handler(code_dep)
+def make_depute(circo: int) -> MagicMock:
+    depute = mock_depute()
+    depute.ref = f"PA{circo}"
+    depute.circo = str(circo)
+    return depute
 
-    assert isinstance(embed, Embed) or embed.title == "Député non trouvé"
-    assert f"Je n'ai pas trouvé de députés dans le département {code_dep}." in embed.description
-    assert int(embed.color) == DISCORD_EMBED_COLOR_ERR
\ No newline at end of file
+
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(*(make_depute(circo) for circo in range(21, 0, -1)))))
+def test_dep_handler_pages() -> None:
+    pages = dep_handler("75")
+
+    assert isinstance(pages, Pages)
+    assert pages.count == 3
+    assert [depute.circo for depute in pages.items[:2]] == ["1", "2"]
+    embed = pages.page(2)
+    assert embed.title == ":pushpin: Département 75 (Paris)"
+    assert embed.description.startswith(":bust_in_silhouette: [Lucie Durand](http://example.com/lucie) — :round_pushpin: **Circoncription** : 75-21 |")
+    assert embed.footer.text == "Page 3/3"
@@ -1,13 +1,16 @@
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock
 
 import pytest
 from discord import Embed
 
 from common.config import DISCORD_EMBED_COLOR_MSG, DISCORD_EMBED_COLOR_ERR
 from handlers.deputeHandler import nom_handler
+from utils.paginatorManager import Pages
+from tests.handlers.conftest import make_dataset, make_repository
 
 def mock_depute(last_name, first_name, circo):
     depute = MagicMock()
+    depute.ref = f"PA{last_name}{first_name}"
     depute.first_name = first_name
     depute.last_name = last_name
     depute.url = f"http://example.com/{last_name.replace(' ', '_').lower()}"
@@ -20,11 +23,9 @@ def mock_depute(last_name, first_name, circo):
 
 
 
-@patch('os.listdir', return_value=["depute_1.json"])
-@patch('utils.deputeManager.Depute.from_json_by_name',
-       side_effect=[mock_depute("Bernard", "Claire", "1")])
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_nom_handler_found(_mock_from_json_by_name, _mock_listdir):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute("Bernard", "Claire", "1"))))
+def test_nom_handler_found():
     embeds = nom_handler("Bernard")
 
     assert isinstance(embeds, list)
@@ -36,16 +37,14 @@ def test_nom_handler_found(_mock_from_json_by_name, _mock_listdir):
     assert int(embed.color) == DISCORD_EMBED_COLOR_MSG
 
 
-@patch('os.listdir', return_value=["depute_1.json", "depute_2.json", "depute_3.json", "depute_4.json"])
-@patch('utils.deputeManager.Depute.from_json_by_name',
-       side_effect=[
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(
            mock_depute("Bernard", "Sam", "2"),
            mock_depute("Bernard", "Claire", "1"),
-           None,
+           mock_depute("Martin", "Paul", "4"),
            mock_depute("Bernard", "Bob", "3")
-       ])
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_nom_handler_found_multiple(_mock_from_json_by_name, _mock_listdir):
+       )))
+def test_nom_handler_found_multiple():
     embeds = nom_handler("Bernard")
 
     assert isinstance(embeds, list)
@@ -54,27 +53,45 @@ def test_nom_handler_found_multiple(_mock_from_json_by_name, _mock_listdir):
     assert embeds[1].title == ":bust_in_silhouette: Claire Bernard"
     assert embeds[2].title == ":bust_in_silhouette: Sam Bernard"
 
-@patch('os.listdir', return_value=["depute_1.json", "depute_2.json", "depute_3.json", "depute_4.json"])
-@patch('utils.deputeManager.Depute.from_json_by_name',
-       side_effect=[
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(
+           *(mock_depute("Bernard", f"Prénom{i:02}", str(i)) for i in range(11, 0, -1))
+       )))
+def test_nom_handler_found_pages() -> None:
+    pages = nom_handler("Bernard")
+
+    assert isinstance(pages, Pages)
+    assert pages.count == 11
+    embed = pages.page(1)
+    assert embed.title == ":bust_in_silhouette: Prénom02 Bernard"
+    assert embed.footer.text == "Page 2/11"
+
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(
            mock_depute("Bernard", "Sam", "2"),
-           None,
-           None,
-           None
-       ])
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_nom_handler_found_first_name(_mock_from_json_by_name, _mock_listdir):
+           mock_depute("Bernard", "Claire", "1"),
+           mock_depute("Martin", "Sam", "4")
+       )))
+def test_nom_handler_found_first_name():
     embeds = nom_handler("Bernard", "Sam")
 
     assert isinstance(embeds, list)
     assert len(embeds) == 1
     assert embeds[0].title == ":bust_in_silhouette: Sam Bernard"
 
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute("Thiébault-Martinez", "Céline", "1"))))
+def test_nom_handler_found_normalized():
+    embeds = nom_handler("thiebault martinez", "celine")
+
+    assert isinstance(embeds, list)
+    assert len(embeds) == 1
+    assert embeds[0].title == ":bust_in_silhouette: Céline Thiébault-Martinez"
+
 @pytest.mark.parametrize("name", ["Inconnu"])
-@patch('os.listdir', return_value=["depute_1.json", "depute_2.json"])
-@patch('utils.deputeManager.Depute.from_json_by_name', return_value=[])
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_nom_handler_not_found(_mock_from_json_by_name, _mock_listdir, name):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute("Bernard", "Claire", "1"))))
+def test_nom_handler_not_found(name):
     embed = nom_handler(name)
 
     assert embed.title == "Député non trouvé"
@@ -83,9 +100,9 @@ def test_nom_handler_not_found(_mock_from_json_by_name, _mock_listdir, name):
 
 
 @pytest.mark.parametrize("name", ["Bernard"])
-@patch('os.listdir', return_value=[])
-@patch('utils.deputeManager.Depute.from_json_by_name', return_value=[])
-def test_nom_handler_no_files(_mock_listdir, _mock_from_json_by_name, name):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository()))
+def test_nom_handler_empty_repository(name):
     embed = nom_handler(name)
 
     assert embed.title == "Député non trouvé"
@@ -93,14 +110,12 @@ def test_nom_handler_no_files(_mock_listdir, _mock_from_json_by_name, name):
     assert int(embed.color) == DISCORD_EMBED_COLOR_ERR
 
 
-@pytest.mark.parametrize("name", ["Bernard"])
-@patch('os.listdir', return_value=["depute_1.json"])
-@patch('utils.deputeManager.Depute.from_json_by_name',
-       side_effect=[mock_depute("Bernard", "Claire", "1")])
-@patch('builtins.open', mock_open(read_data='not json'))
-def test_nom_handler_malformed_json(_mock_from_json_by_name, _mock_listdir, name):
-    embed = nom_handler(name)
+@pytest.mark.parametrize("last_name, first_name", [("Bernad", None), ("bernar", "claire"), ("Bernardo", "Claire")])
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute("Bernard", "Claire", "1"), mock_depute("Martin", "Paul", "2"))))
+def test_nom_handler_suggestions(last_name, first_name):
+    embed = nom_handler(last_name, first_name)
 
     assert embed.title == "Député non trouvé"
-    assert f"Je n'ai pas trouvé le député {name}." in embed.description
+    assert embed.description.endswith("Vouliez-vous dire : Claire Bernard ?")
     assert int(embed.color) == DISCORD_EMBED_COLOR_ERR
@@ -1,4 +1,4 @@
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock
 import pytest
 from discord import Embed
 
@@ -22,12 +22,14 @@ def mock_scrutin_adopte():
 
 
 @pytest.mark.parametrize("code_ref", [("456")])
-@patch('os.listdir', return_value=["scrutin_456.json"])
-@patch('utils.scrutinManager.Scrutin.from_json_by_ref', side_effect=lambda data, ref: mock_scrutin_adopte() if ref == "456" else None)
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_scr_handler_found(_mock_scrutin, _mock_listdir, code_ref):
+@patch('handlers.deputeHandler.current_dataset')
+def test_scr_handler_found(mock_dataset, code_ref):
+    mock_dataset.return_value.database = None
+    mock_store = mock_dataset.return_value.scrutins
+    mock_store.get.side_effect = lambda ref: mock_scrutin_adopte() if ref == "456" else None
     embed = scr_handler(code_ref)
 
+    mock_store.get.assert_called_once_with(code_ref)
     assert isinstance(embed, Embed)
     assert f":ballot_box: Scrutin nº{code_ref}" == embed.title
     assert "Projet de loi sur l'énergie propre" in embed.description
@@ -35,10 +37,11 @@ def test_scr_handler_found(_mock_scrutin, _mock_listdir, code_ref):
 
 
 @pytest.mark.parametrize("code_ref", [("999"), ("ABC")])
-@patch('os.listdir', return_value=["scrutin_456.json"])
-@patch('utils.scrutinManager.Scrutin.from_json_by_ref', return_value=None)
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_scr_handler_not_found(_mock_scrutin, _mock_listdir, code_ref):
+@patch('handlers.deputeHandler.current_dataset')
+def test_scr_handler_not_found(mock_dataset, code_ref):
+    mock_dataset.return_value.database = None
+    mock_store = mock_dataset.return_value.scrutins
+    mock_store.get.return_value = None
     embed = scr_handler(code_ref)
 
     assert embed.title == "Scrutin non trouvé"
@@ -47,24 +50,13 @@ def test_scr_handler_not_found(_mock_scrutin, _mock_listdir, code_ref):
 
 
 
-@pytest.mark.parametrize("code_ref", [("456")])
-@patch('os.listdir', return_value=[])
-@patch('utils.scrutinManager.Scrutin.from_json_by_ref', return_value=None)
-def test_scr_handler_no_files(_mock_listdir, _mock_scrutin, code_ref):
-    embed = scr_handler(code_ref)
-
-    assert embed.title == "Scrutin non trouvé"
-    assert f"Je n'ai pas trouvé le scrutin {code_ref}." in embed.description
-    assert int(embed.color) == DISCORD_EMBED_COLOR_ERR
-
+@patch('handlers.deputeHandler.current_dataset')
+def test_scr_handler_database(mock_dataset):
+    mock_database = mock_dataset.return_value.database
+    mock_database.scrutin.return_value = mock_scrutin_adopte()
+    embed = scr_handler("456")
 
-@pytest.mark.parametrize("code_ref", [("456")])
-@patch('os.listdir', return_value=["scrutin_456.json"])
-@patch('utils.scrutinManager.Scrutin.from_json_by_ref', side_effect=lambda data, ref: mock_scrutin_adopte())
-@patch('builtins.open', mock_open(read_data='not json'))
-def test_scr_handler_malformed_json(_mock_scrutin, _mock_listdir, code_ref):
-    embed = scr_handler(code_ref)
-
-    assert embed.title == "Scrutin non trouvé"
-    assert f"Je n'ai pas trouvé le scrutin {code_ref}." in embed.description
-    assert int(embed.color) == DISCORD_EMBED_COLOR_ERR
+    mock_database.scrutin.assert_called_once_with("456")
+    mock_dataset.return_value.scrutins.get.assert_not_called()
+    assert embed.title == ":ballot_box: Scrutin nº456"
+    assert int(embed.color) == DISCORD_EMBED_COLOR_MSG
@@ -1,10 +1,10 @@
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock
 import pytest
 from discord import Embed
 
 from common.config import DISCORD_EMBED_COLOR_MSG, DISCORD_EMBED_COLOR_ERR
 from handlers.deputeHandler import stat_handler
-from utils.scrutinManager import ResultBallot
+from tests.handlers.conftest import make_dataset, make_repository
 
 
 def mock_depute(first_name="Nora", last_name="Lemoine", circo="1"):
@@ -21,23 +21,12 @@ def mock_depute(first_name="Nora", last_name="Lemoine", circo="1"):
     return depute
 
 
-def make_mock_scrutin(result: ResultBallot):
-    scrutin = MagicMock()
-    scrutin.result.return_value = result
-    scrutin.to_string_depute.return_value = f"Vote: {result.name}"
-    return scrutin
-
-
-@patch('os.listdir', return_value=["depute.json"])
-@patch('utils.scrutinManager.Scrutin.from_json', side_effect=[
-    make_mock_scrutin(ResultBallot.POUR),
-    make_mock_scrutin(ResultBallot.CONTRE),
-    make_mock_scrutin(ResultBallot.ABSTENTION)
-])
-@patch('utils.deputeManager.Depute.from_json_by_name',
-       side_effect=[mock_depute()])
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_stat_handler_found(_mock_from_json_by_name, _mock_scrutin, _mock_listdir):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute()),
+                    statistics=MagicMock(get=MagicMock(return_value={
+                        "absent": 4, "pour": 1, "contre": 1, "abstention": 1, "nonvotant": 0
+                    }))))
+def test_stat_handler_found():
     embeds = stat_handler("Lemoine", "Nora")
 
     assert isinstance(embeds, list)
@@ -49,14 +38,14 @@ def test_stat_handler_found(_mock_from_json_by_name, _mock_scrutin, _mock_listdi
     assert ":green_circle: Pour" in embed.fields[0].value
     assert ":red_circle: Contre" in embed.fields[0].value
     assert ":white_circle: Abstention" in embed.fields[0].value
+    assert ":orange_circle: Absent : 4" in embed.fields[0].value
     assert int(embed.color) == DISCORD_EMBED_COLOR_MSG
 
 
 @pytest.mark.parametrize("last_name", ["Perdu"])
-@patch('os.listdir', return_value=["depute.json"])
-@patch('utils.deputeManager.Depute.from_json_by_name', return_value=None)
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_stat_handler_depute_not_found(_mock_from_json_by_name, _mock_listdir, last_name):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute())))
+def test_stat_handler_depute_not_found(last_name):
     embed = stat_handler(last_name)
 
     assert embed.title == "Député non trouvé"
@@ -65,9 +54,9 @@ def test_stat_handler_depute_not_found(_mock_from_json_by_name, _mock_listdir, l
 
 
 @pytest.mark.parametrize("last_name", ["Lemoine"])
-@patch('os.listdir', return_value=[])
-@patch('utils.deputeManager.Depute.from_json_by_name', return_value=None)
-def test_stat_handler_no_files(_mock_from_json_by_name, _mock_listdir, last_name):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository()))
+def test_stat_handler_empty_repository(last_name):
     embed = stat_handler(last_name)
 
     assert embed.title == "Député non trouvé"
@@ -75,14 +64,17 @@ def test_stat_handler_no_files(_mock_from_json_by_name, _mock_listdir, last_name
     assert int(embed.color) == DISCORD_EMBED_COLOR_ERR
 
 
-@pytest.mark.parametrize("last_name", ["Lemoine"])
-@patch('os.listdir', side_effect=[["depute_data.json"], ["scrutin1.json"]])
-@patch('utils.scrutinManager.Scrutin.from_json', side_effect=[make_mock_scrutin(ResultBallot.NONVOTANT)])
-@patch('utils.deputeManager.Depute.from_json_by_name', side_effect=[mock_depute()])
-@patch('builtins.open', mock_open(read_data='not json'))
-def test_stat_handler_malformed_json(_mock_from_json_by_name, _mock_scrutin, _mock_listdir, last_name):
-    embed = stat_handler(last_name)
+def test_stat_handler_database() -> None:
+    database = MagicMock()
+    database.find_by_name.return_value = [mock_depute()]
+    database.statistics.return_value = {"absent": 2, "pour": 3, "contre": 0, "abstention": 0, "nonvotant": 0}
+    statistics = MagicMock()
+    with patch('handlers.deputeHandler.current_dataset', make_dataset(database=database, statistics=statistics)):
+        embeds = stat_handler("Lemoine", "Nora")
 
-    assert embed.title == "Député non trouvé"
-    assert f"Je n'ai pas trouvé le député {last_name}." in embed.description
-    assert int(embed.color) == DISCORD_EMBED_COLOR_ERR
+    assert len(embeds) == 1
+    assert ":green_circle: Pour : 3" in embeds[0].fields[0].value
+    assert ":orange_circle: Absent : 2" in embeds[0].fields[0].value
+    database.find_by_name.assert_called_once_with("Lemoine", "Nora")
+    database.statistics.assert_called_once_with("nora-lemoine")
+    statistics.get.assert_not_called()
@@ -1,18 +1,24 @@
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock
 import pytest
 from discord import Embed
 
 from common.config import DISCORD_EMBED_COLOR_MSG, DISCORD_EMBED_COLOR_ERR
 from handlers.deputeHandler import vote_handler
+from utils.scrutinManager import ResultBallot
+from tests.handlers.conftest import make_dataset, make_repository
 
 
 def mock_depute():
     depute = MagicMock()
+    depute.ref = "PA1"
     depute.first_name = "Alice"
     depute.last_name = "Martin"
     depute.url = "http://example.com/depute"
     depute.image = "http://example.com/image.jpg"
     depute.to_string.return_value = "Alice Martin, députée de Lyon"
+    depute.dep = "69"
+    depute.dep_name = "Rhône"
+    depute.circo = "1"
     return depute
 
 
@@ -27,11 +33,10 @@ def mock_scrutin():
 
 
 @pytest.mark.parametrize("name, code_ref", [("Martin", "123")])
-@patch('os.listdir', return_value=["data.json"])
-@patch('utils.scrutinManager.Scrutin.from_json_by_ref', return_value=mock_scrutin())
-@patch('utils.deputeManager.Depute.from_json_by_name', return_value=mock_depute())
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_vote_handler_success(_mock_depute, _mock_scrutin, _mock_listdir, name, code_ref):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute()),
+                    scrutins=MagicMock(get=MagicMock(return_value=mock_scrutin()))))
+def test_vote_handler_success(name, code_ref):
     embeds = vote_handler(code_ref, name)
 
     assert isinstance(embeds, list)
@@ -45,11 +50,10 @@ def test_vote_handler_success(_mock_depute, _mock_scrutin, _mock_listdir, name,
 
 
 @pytest.mark.parametrize("last_name, first_name,  code_ref", [("Martin", "Alice", "123")])
-@patch('os.listdir', return_value=["data.json"])
-@patch('utils.scrutinManager.Scrutin.from_json_by_ref', return_value=mock_scrutin())
-@patch('utils.deputeManager.Depute.from_json_by_name', return_value=mock_depute())
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_vote_handler_first_name_success(_mock_depute, _mock_scrutin, _mock_listdir, last_name, first_name, code_ref):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute()),
+                    scrutins=MagicMock(get=MagicMock(return_value=mock_scrutin()))))
+def test_vote_handler_first_name_success(last_name, first_name, code_ref):
     embeds = vote_handler(code_ref, last_name, first_name)
 
     assert isinstance(embeds, list)
@@ -62,11 +66,10 @@ def test_vote_handler_first_name_success(_mock_depute, _mock_scrutin, _mock_list
 
 
 @pytest.mark.parametrize("name, code_ref", [("Martin", "999")])
-@patch('os.listdir', return_value=["data.json"])
-@patch('utils.scrutinManager.Scrutin.from_json_by_ref', return_value=None)
-@patch('utils.deputeManager.Depute.from_json_by_name', return_value=mock_depute())
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_vote_handler_scrutin_not_found(_mock_listdir, _mock_from_json_by_ref, _mock_from_json_by_name, name, code_ref):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(mock_depute()),
+                    scrutins=MagicMock(get=MagicMock(return_value=None))))
+def test_vote_handler_scrutin_not_found(name, code_ref):
     embed = vote_handler(code_ref, name)
 
     assert embed.title == "Scrutin non trouvé"
@@ -75,11 +78,10 @@ def test_vote_handler_scrutin_not_found(_mock_listdir, _mock_from_json_by_ref, _
 
 
 @pytest.mark.parametrize("name, code_ref", [("Inconnu", "123")])
-@patch('os.listdir', return_value=["data.json"])
-@patch('utils.scrutinManager.Scrutin.from_json_by_ref', return_value=mock_scrutin())
-@patch('utils.deputeManager.Depute.from_json_by_name', return_value=None)
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_vote_handler_depute_not_found(_mock_listdir, _mock_from_json_by_ref, _mock_from_json_by_name, name, code_ref):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(),
+                    scrutins=MagicMock(get=MagicMock(return_value=mock_scrutin()))))
+def test_vote_handler_depute_not_found(name, code_ref):
     embed = vote_handler(code_ref, name)
 
     assert embed.title == "Député non trouvé"
@@ -88,11 +90,10 @@ def test_vote_handler_depute_not_found(_mock_listdir, _mock_from_json_by_ref, _m
 
 
 @pytest.mark.parametrize("name, code_ref", [("Inconnu", "999")])
-@patch('os.listdir', return_value=["data.json"])
-@patch('utils.scrutinManager.Scrutin.from_json_by_ref', return_value=None)
-@patch('utils.deputeManager.Depute.from_json_by_name', return_value=None)
-@patch('builtins.open', mock_open(read_data='{}'))
-def test_vote_handler_both_not_found(_mock_listdir, _mock_from_json_by_ref, _mock_from_json_by_name, name, code_ref):
+@patch('handlers.deputeHandler.current_dataset',
+       make_dataset(deputes=make_repository(),
+                    scrutins=MagicMock(get=MagicMock(return_value=None))))
+def test_vote_handler_both_not_found(name, code_ref):
     embed = vote_handler(code_ref, name)
 
     assert embed.title == "Député et scrutin non trouvé"
@@ -101,14 +102,20 @@ def test_vote_handler_both_not_found(_mock_listdir, _mock_from_json_by_ref, _moc
 
 
 @pytest.mark.parametrize("name, code_ref", [("Martin", "123")])
-@patch('os.listdir', return_value=["data.json"])
-@patch('utils.scrutinManager.Scrutin.from_json_by_ref', side_effect=lambda data, code_ref: mock_scrutin())
-@patch('utils.deputeManager.Depute.from_json_by_name', side_effect=lambda data, name: mock_depute())
-@patch('builtins.open', mock_open(read_data='not json'))
-def test_vote_handler_malformed_json(_mock_listdir, _mock_from_json_by_ref, _mock_from_json_by_name, name, code_ref):
-    embed = vote_handler(code_ref, name)
+def test_vote_handler_database(name: str, code_ref: str) -> None:
+    database = MagicMock()
+    database.find_by_name.return_value = [mock_depute()]
+    database.scrutin.return_value = mock_scrutin()
+    database.result.return_value = ResultBallot.CONTRE
+    scrutins = MagicMock()
+    with patch('handlers.deputeHandler.current_dataset', make_dataset(database=database, scrutins=scrutins)):
+        embeds = vote_handler(code_ref, name)
 
-    assert isinstance(embed, Embed)
-    assert embed.title == "Député et scrutin non trouvé"
-    assert f"Je n'ai trouvé ni le député {name}, ni le scrutin {code_ref}." == embed.description
-    assert int(embed.color) == DISCORD_EMBED_COLOR_ERR
\ No newline at end of file
+    assert isinstance(embeds, list)
+    assert len(embeds) == 1
+    assert "Scrutin nº123 - Alice Martin" in embeds[0].title
+    assert ":bar_chart: **Position** : Contre :red_circle:" in embeds[0].fields[0].value
+    database.find_by_name.assert_called_once_with(name, None)
+    database.scrutin.assert_called_once_with(code_ref)
+    database.result.assert_called_once_with("PA1", "123")
+    scrutins.get.assert_not_called()
@@ -29,7 +29,10 @@ JSON_SCRUTIN = Dict[
 
 sample_gp_data = {
     "organe": {
-        "libelle": "Groupe Test"
+        "uid": "ORG123",
+        "libelle": "Groupe Test",
+        "libelleAbrev": "GT",
+        "couleurAssociee": "#123456"
     }
 }
 
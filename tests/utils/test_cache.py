@@ -0,0 +1,109 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+
+from unittest.mock import MagicMock, patch
+
+from utils.cacheManager import MISSING, ResponseCache, normalize_args
+
+
+def test_normalize_args(
+    mock_bot: MagicMock) -> None:
+
+    # Assertions result
+    assert normalize_args(("  Le   Pen ", None, "75")) == ("Le Pen", None, "75")
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@patch("utils.cacheManager.logger")
+def test_response_cache_lru(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    cache: ResponseCache = ResponseCache(size=2, ttl=0)
+    # nothing is cached before the first generation
+    cache.put(cache.key("dep", ("75",)), "not loaded")
+    assert cache.get(cache.key("dep", ("75",))) is MISSING
+
+    cache.invalidate(1)
+    cache.put(cache.key("dep", ("75",)), "Paris")
+    cache.put(cache.key("dep", ("69",)), "Rhône")
+    assert cache.get(cache.key("dep", (" 75",))) == "Paris"
+    cache.put(cache.key("scr", ("1",)), None)
+
+    # Assertions result
+    assert len(cache) == 2
+    assert cache.get(cache.key("dep", ("69",))) is MISSING
+    assert cache.get(cache.key("dep", ("75",))) == "Paris"
+    assert cache.get(cache.key("scr", ("1",))) is None
+    assert cache.get(cache.key("scr", ("1", None))) is MISSING
+
+    # Assertions logs
+    mock_log.info.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@patch("utils.cacheManager.logger")
+def test_response_cache_invalidate(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    cache: ResponseCache = ResponseCache(size=10, ttl=0)
+    cache.invalidate(1)
+    key = cache.key("dep", ("75",))
+    cache.put(key, "Paris")
+    cache.invalidate(2)
+    # computed from the previous generation while the new one was published
+    cache.put(key, "Paris")
+
+    # Assertions result
+    assert cache.generation == 2
+    assert len(cache) == 0
+    assert cache.get(key) is MISSING
+    assert cache.get(cache.key("dep", ("75",))) is MISSING
+
+    # Assertions logs
+    mock_log.info.assert_called_once_with("Dropped %s cached responses", 1)
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@patch("utils.cacheManager.time")
+def test_response_cache_ttl(
+    mock_time: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    cache: ResponseCache = ResponseCache(size=10, ttl=60)
+    cache.invalidate(1)
+    mock_time.monotonic.return_value = 100
+    cache.put(cache.key("dep", ("75",)), "Paris")
+    mock_time.monotonic.return_value = 160
+    cached = cache.get(cache.key("dep", ("75",)))
+    mock_time.monotonic.return_value = 161
+
+    # Assertions result
+    assert cached == "Paris"
+    assert cache.get(cache.key("dep", ("75",))) is MISSING
+    assert len(cache) == 0
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+def test_response_cache_disabled(
+    mock_bot: MagicMock) -> None:
+
+    cache: ResponseCache = ResponseCache(size=0, ttl=60)
+    cache.invalidate(1)
+    cache.put(cache.key("dep", ("75",)), "Paris")
+
+    # Assertions result
+    assert cache.get(cache.key("dep", ("75",))) is MISSING
+
+    # Assertions bot
+    mock_bot.assert_not_called()
@@ -0,0 +1,594 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import shutil
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Tuple
+from unittest.mock import MagicMock, call, patch
+
+import numpy as np
+import pytest
+
+from tests.utils.conftest import JSON_DEPUTE, JSON_SCRUTIN, sample_gp_data
+from utils import dataManager
+from utils.dataManager import Dataset, current_dataset, database_path, is_loaded, keep_scrutin_files, load_data, \
+    load_snapshot, save_snapshot, source_hash
+from utils.voteManager import VoteMatrix
+
+
+@pytest.fixture
+def data_folders(
+    tmp_path: Path,
+    sample_valid_depute_json: JSON_DEPUTE,
+    sample_scrutin_data_json: JSON_SCRUTIN) -> Iterator[Tuple[Path, Path, Path]]:
+
+    folders: Tuple[Path, Path, Path] = (tmp_path / "acteur", tmp_path / "organe", tmp_path / "scrutins")
+    for folder in folders:
+        folder.mkdir()
+    acteur_folder, organe_folder, scrutins_folder = folders
+    with open(acteur_folder / "PA123456.json", "w", encoding="utf-8") as f:
+        json.dump(sample_valid_depute_json, f)
+    with open(organe_folder / "ORG123.json", "w", encoding="utf-8") as f:
+        json.dump(sample_gp_data, f)
+    with open(scrutins_folder / "VTANR5L17V1001.json", "w", encoding="utf-8") as f:
+        json.dump(sample_scrutin_data_json, f)
+
+    with patch.multiple(dataManager,
+                        ACTEUR_FOLDER=acteur_folder,
+                        ORGANE_FOLDER=organe_folder,
+                        SCRUTINS_FOLDER=scrutins_folder,
+                        SNAPSHOT_FILE=tmp_path / "snapshot.pickle",
+                        VOTE_MATRIX_FILE=tmp_path / "votes.matrix",
+                        _current=Dataset()):
+        yield folders
+
+
+def test_source_hash(
+    data_folders: Tuple[Path, Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    data_hash: str = source_hash()
+    same_hash: str = source_hash()
+    with open(data_folders[2] / "VTANR5L17V1002.json", "w", encoding="utf-8") as f:
+        f.write("{}")
+
+    # Assertions result
+    assert data_hash == same_hash
+    assert source_hash() != data_hash
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_data_write_snapshot(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    data_folders: Tuple[Path, Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    assert not is_loaded()
+    load_data()
+    dataset: Dataset = current_dataset()
+
+    # Assertions result
+    assert is_loaded()
+    assert dataset.generation == 1
+    assert (tmp_path / "snapshot.pickle").exists()
+    assert not (tmp_path / "snapshot.pickle.tmp").exists()
+    assert (tmp_path / "votes.matrix").exists()
+    assert dataset.deputes.get("PA123456").gp == "Groupe Test"
+    assert "1001" in dataset.scrutins
+
+    # Assertions logs
+    mock_log.info.assert_has_calls([
+        call("Snapshot written to %s", tmp_path / "snapshot.pickle"),
+        call("Serving data generation %s", 1),
+    ])
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_data_from_snapshot(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    data_folders: Tuple[Path, Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    load_data()
+    previous: Dataset = current_dataset()
+
+    # The folders are untouched, the snapshot is used instead of parsing them
+    with patch("utils.dataManager.build_dataset") as mock_build_dataset:
+        load_data()
+    dataset: Dataset = current_dataset()
+
+    # Assertions result
+    mock_build_dataset.assert_not_called()
+    assert dataset is not previous
+    assert dataset.generation == 2
+    assert dataset.deputes.get("PA123456").gp == "Groupe Test"
+    assert dataset.organes.get("ORG123").libelle == "Groupe Test"
+    assert dataset.scrutins.get("1001").ref == "1001"
+    assert dataset.matrix.refs == ["PA123456"]
+    assert isinstance(dataset.matrix.row("PA123456"), np.memmap)
+    # the previous generation is still usable by the commands holding it
+    assert previous.deputes.get("PA123456").gp == "Groupe Test"
+
+    # Assertions logs
+    mock_log.info.assert_has_calls([
+        call("Loaded snapshot %s", tmp_path / "snapshot.pickle"),
+        call("Serving data generation %s", 2),
+    ])
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_data_served_until_published(
+    mock_log: MagicMock,
+    data_folders: Tuple[Path, Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    load_data()
+    previous: Dataset = current_dataset()
+    served: List[Dataset] = []
+
+    def build_dataset(generation: int, _data_hash: str) -> Dataset:
+        served.append(current_dataset())
+        return Dataset(generation=generation)
+
+    # the data changed, the next generation must be built
+    with open(data_folders[2] / "VTANR5L17V1002.json", "w", encoding="utf-8") as f:
+        f.write("{}")
+    with patch("utils.dataManager.update_dataset", return_value=None), \
+            patch("utils.dataManager.build_dataset", side_effect=build_dataset):
+        load_data()
+
+    # Assertions result
+    assert served == [previous]
+    assert current_dataset() is not previous
+    assert current_dataset().generation == 2
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_data_incremental(
+    mock_log: MagicMock,
+    data_folders: Tuple[Path, Path, Path],
+    sample_scrutin_data_json: JSON_SCRUTIN,
+    mock_bot: MagicMock) -> None:
+
+    load_data()
+    previous: Dataset = current_dataset()
+
+    # a scrutin is added and another removed
+    sample_scrutin_data_json["scrutin"]["numero"] = "1002"
+    with open(data_folders[2] / "VTANR5L17V1002.json", "w", encoding="utf-8") as f:
+        json.dump(sample_scrutin_data_json, f)
+    os.remove(data_folders[2] / "VTANR5L17V1001.json")
+    with patch("utils.dataManager.build_dataset") as mock_build_dataset:
+        load_data()
+    dataset: Dataset = current_dataset()
+
+    # Assertions result
+    mock_build_dataset.assert_not_called()
+    assert dataset.generation == 2
+    assert dataset.deputes is previous.deputes
+    assert dataset.scrutins.numeros() == ["1002"]
+    assert dataset.matrix.numeros == ["1002"]
+    assert previous.matrix.numeros == ["1001"]
+    assert dataset.matrix.result("PA123456", "1002") == previous.matrix.result("PA123456", "1001")
+    assert dataset.statistics.get("PA123456") == previous.statistics.get("PA123456")
+
+    # Assertions logs
+    mock_log.info.assert_any_call("Applied %s added or modified and %s removed scrutins", 1, 1)
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+@patch("download.core.logger")
+def test_load_data_keep_scrutin_files(
+    mock_core_log: MagicMock,
+    mock_log: MagicMock,
+    tmp_path: Path,
+    data_folders: Tuple[Path, Path, Path],
+    sample_scrutin_data_json: JSON_SCRUTIN,
+    mock_bot: MagicMock) -> None:
+
+    previous_folder: Path = tmp_path / "scrutins.previous"
+    with patch("utils.dataManager.SCRUTINS_PREVIOUS_FOLDER", previous_folder):
+        load_data()
+        previous: Dataset = current_dataset()
+        keep_scrutin_files()
+
+        # the scrutin file is replaced, as extract_members does
+        sample_scrutin_data_json["scrutin"]["titre"] = "Nouveau titre"
+        with open(tmp_path / "VTANR5L17V1001.json", "w", encoding="utf-8") as f:
+            json.dump(sample_scrutin_data_json, f)
+        os.replace(tmp_path / "VTANR5L17V1001.json", data_folders[2] / "VTANR5L17V1001.json")
+        served = previous.scrutins.get("1001")
+        load_data()
+    dataset: Dataset = current_dataset()
+
+    # Assertions result
+    assert served is not None and served.titre != "Nouveau titre"
+    assert previous.scrutins.directory == previous_folder
+    assert dataset.generation == 2
+    assert dataset.scrutins.directory == data_folders[2]
+    scrutin = dataset.scrutins.get("1001")
+    assert scrutin is not None and scrutin.titre == "Nouveau titre"
+    # the copy is removed once the next generation is published
+    assert not previous_folder.exists()
+
+    # Assertions logs
+    mock_core_log.info.assert_any_call("Copying %s to %s", data_folders[2], previous_folder)
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_data_from_zip(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    data_folders: Tuple[Path, Path, Path],
+    sample_scrutin_data_json: JSON_SCRUTIN,
+    mock_bot: MagicMock) -> None:
+
+    zip_path: Path = tmp_path / "scrutins.zip"
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.write(data_folders[2] / "VTANR5L17V1001.json", "json/VTANR5L17V1001.json")
+    os.remove(data_folders[2] / "VTANR5L17V1001.json")
+
+    with patch.multiple(dataManager, SCRUTINS_FROM_ZIP=True, SCRUTINS_ZIP_FILE=zip_path):
+        load_data()
+        previous: Dataset = current_dataset()
+        data_hash: str = source_hash()
+
+        # the zip file is replaced with an added scrutin
+        sample_scrutin_data_json["scrutin"]["numero"] = "1002"
+        with zipfile.ZipFile(tmp_path / "new.zip", "w") as zipf:
+            with zipfile.ZipFile(zip_path) as previous_zip:
+                zipf.writestr("json/VTANR5L17V1001.json", previous_zip.read("json/VTANR5L17V1001.json"))
+            zipf.writestr("json/VTANR5L17V1002.json", json.dumps(sample_scrutin_data_json))
+        os.replace(tmp_path / "new.zip", zip_path)
+        load_data()
+        dataset: Dataset = current_dataset()
+        new_hash: str = source_hash()
+
+    # Assertions result
+    assert previous.matrix.numeros == ["1001"]
+    assert new_hash != data_hash
+    assert dataset.generation == 2
+    assert dataset.deputes is previous.deputes
+    assert dataset.matrix.numeros == ["1001", "1002"]
+    assert dataset.scrutins.get("1002").ref == "1002"
+
+    # Assertions logs
+    mock_log.info.assert_any_call("Applied %s added or modified and %s removed scrutins", 1, 0)
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_data_acteur_modified(
+    mock_log: MagicMock,
+    data_folders: Tuple[Path, Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    load_data()
+    previous: Dataset = current_dataset()
+
+    # the acteurs changed, every store is rebuilt
+    with open(data_folders[0] / "PA654321.json", "w", encoding="utf-8") as f:
+        f.write("{}")
+    load_data()
+    dataset: Dataset = current_dataset()
+
+    # Assertions result
+    assert dataset.generation == 2
+    assert dataset.deputes is not previous.deputes
+    assert dataset.people_hash != previous.people_hash
+    assert dataset.matrix.numeros == ["1001"]
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_snapshot_outdated(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+
+    snapshot_file: Path = tmp_path / "snapshot.pickle"
+    save_snapshot(snapshot_file, Dataset(), "old")
+    result_hash: Dataset | None = load_snapshot(snapshot_file, "new")
+    with open(snapshot_file, "wb") as f:
+        pickle.dump({"version": 0, "source_hash": "new"}, f)
+    result_version: Dataset | None = load_snapshot(snapshot_file, "new")
+
+    # Assertions result
+    assert result_hash is None
+    assert result_version is None
+
+    # Assertions logs
+    mock_log.info.assert_called_with("Snapshot %s is outdated", snapshot_file)
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_snapshot_invalid(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+
+    snapshot_file: Path = tmp_path / "snapshot.pickle"
+    result_missing: Dataset | None = load_snapshot(snapshot_file, "hash")
+    with open(snapshot_file, "wb") as f:
+        f.write(b"not a pickle")
+    result_invalid: Dataset | None = load_snapshot(snapshot_file, "hash")
+
+    # Assertions result
+    assert result_missing is None
+    assert result_invalid is None
+    assert os.path.exists(snapshot_file)
+
+    # Assertions logs
+    mock_log.warning.assert_called_once()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_data_database(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    data_folders: Tuple[Path, Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    load_data()
+    in_memory: Dataset = current_dataset()
+    with patch.multiple(dataManager, USE_DATABASE=True, DATABASE_FILE=tmp_path / "database.sqlite"):
+        load_data()
+        dataset: Dataset = current_dataset()
+        # the snapshot keeps the database
+        with patch("utils.databaseManager.Database.write") as mock_write:
+            load_data()
+        from_snapshot: Dataset = current_dataset()
+        path: Path = database_path(source_hash())
+        # the scrutin files are not read by a generation served from a database
+        with patch("utils.dataManager.SCRUTINS_PREVIOUS_FOLDER", tmp_path / "scrutins.previous"):
+            keep_scrutin_files()
+    load_data()
+    disabled: Dataset = current_dataset()
+
+    # Assertions result
+    assert dataset.database is not None
+    assert dataset.database.path == path
+    assert path.parent == tmp_path
+    # the stores replaced by the database are not built
+    assert len(dataset.deputes) == 0
+    assert dataset.matrix.shape == (0, 0)
+    assert "1001" in dataset.scrutins
+    assert dataset.database.find_by_name("Dupont", "Jean") == [in_memory.deputes.get("PA123456")]
+    assert dataset.database.scrutin("1001") == in_memory.scrutins.get("1001")
+    assert dataset.database.result("PA123456", "1001") == in_memory.matrix.result("PA123456", "1001")
+    assert dataset.database.statistics("PA123456") == in_memory.statistics.get("PA123456")
+    mock_write.assert_not_called()
+    assert from_snapshot.database.path == path
+    assert from_snapshot.database.find_by_circo("75", "1") == in_memory.deputes.get("PA123456")
+    assert not (tmp_path / "scrutins.previous").exists()
+    assert from_snapshot.scrutins.directory == data_folders[2]
+    assert disabled.database is None
+    assert disabled.deputes.get("PA123456") == in_memory.deputes.get("PA123456")
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+@patch("utils.databaseManager.logger")
+def test_load_data_database_incremental(
+    mock_database_log: MagicMock,
+    mock_log: MagicMock,
+    tmp_path: Path,
+    data_folders: Tuple[Path, Path, Path],
+    sample_scrutin_data_json: JSON_SCRUTIN,
+    mock_bot: MagicMock) -> None:
+
+    with patch.multiple(dataManager, USE_DATABASE=True, DATABASE_FILE=tmp_path / "database.sqlite"):
+        load_data()
+        previous: Dataset = current_dataset()
+
+        # a scrutin is added and another removed
+        sample_scrutin_data_json["scrutin"]["numero"] = "1002"
+        with open(data_folders[2] / "VTANR5L17V1002.json", "w", encoding="utf-8") as f:
+            json.dump(sample_scrutin_data_json, f)
+        os.remove(data_folders[2] / "VTANR5L17V1001.json")
+        with patch("utils.databaseManager.Database.write") as mock_write:
+            load_data()
+        dataset: Dataset = current_dataset()
+        # the previous generation is left untouched
+        previous_scrutins = (previous.database.scrutin("1001"), previous.database.scrutin("1002"))
+
+        # a third generation removes the file of the first one
+        with open(data_folders[2] / "VTANR5L17V1003.json", "w", encoding="utf-8") as f:
+            f.write("{}")
+        load_data()
+        last: Dataset = current_dataset()
+
+    # Assertions result
+    mock_write.assert_not_called()
+    assert dataset.database.path != previous.database.path
+    assert previous_scrutins[0] is not None
+    assert previous_scrutins[1] is None
+    assert dataset.database.scrutin("1001") is None
+    assert dataset.database.scrutin("1002").ref == "1002"
+    assert dataset.database.result("PA123456", "1001") is None
+    assert dataset.database.result("PA123456", "1002") == previous.database.result("PA123456", "1001")
+    assert dataset.database.statistics("PA123456") == previous.database.statistics("PA123456")
+    assert dataset.database.find_by_name("Dupont", "Jean") == previous.database.find_by_name("Dupont", "Jean")
+    assert not previous.database.path.exists()
+    assert dataset.database.path.exists()
+    assert last.database.path.exists()
+    assert [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"] == []
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+    mock_database_log.info.assert_any_call(
+        "Database %s written from %s, %s scrutins replaced or removed",
+        dataset.database.path, previous.database.path, 2
+    )
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_data_database_error(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    data_folders: Tuple[Path, Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    # the database folder is a file, the database cannot be written
+    (tmp_path / "file").touch()
+    with patch.multiple(dataManager, USE_DATABASE=True, DATABASE_FILE=tmp_path / "file" / "database.sqlite"):
+        load_data()
+    dataset: Dataset = current_dataset()
+
+    # Assertions result
+    assert dataset.generation == 1
+    assert dataset.database is None
+    assert dataset.deputes.get("PA123456").gp == "Groupe Test"
+
+    # Assertions logs
+    mock_log.error.assert_called_once()
+    assert mock_log.error.call_args[0][0] == "Cannot write database %s, serving from memory: %s"
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_data_matrix_shared(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    data_folders: Tuple[Path, Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    load_data()
+    inode: int = os.stat(tmp_path / "votes.matrix").st_ino
+    # another process builds the same data without the snapshot, it maps the existing file
+    os.remove(tmp_path / "snapshot.pickle")
+    with patch.object(dataManager, "_current", Dataset()), \
+            patch("utils.voteManager.VoteMatrix.save") as mock_save:
+        load_data()
+    same_data: Dataset = current_dataset()
+    with open(data_folders[2] / "VTANR5L17V1002.json", "w", encoding="utf-8") as f:
+        f.write("{}")
+    load_data()
+
+    # Assertions result
+    mock_save.assert_not_called()
+    assert same_data.matrix.refs == ["PA123456"]
+    assert isinstance(same_data.matrix.row("PA123456"), np.memmap)
+    assert os.stat(tmp_path / "votes.matrix").st_ino != inode
+    assert VoteMatrix.source(tmp_path / "votes.matrix") == source_hash()
+    assert [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"] == []
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.dataManager.logger")
+def test_load_data_missing_folder(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    data_folders: Tuple[Path, Path, Path],
+    mock_bot: MagicMock) -> None:
+
+    # fresh install, the first download is not done yet
+    shutil.rmtree(data_folders[0])
+    load_data()
+    first: Dataset = current_dataset()
+
+    # Assertions result
+    assert not is_loaded()
+    assert first.generation == 0
+    assert not (tmp_path / "snapshot.pickle").exists()
+
+    # Assertions logs
+    mock_log.warning.assert_called_once_with("Data files are missing, still serving data generation %s", 0)
+
+    # the data is back, then the scrutins go missing: the current generation stays served
+    data_folders[0].mkdir()
+    load_data()
+    loaded: Dataset = current_dataset()
+    shutil.rmtree(data_folders[2])
+    load_data()
+
+    # Assertions result
+    assert is_loaded()
+    assert current_dataset() is loaded
+    assert loaded.generation == 1
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
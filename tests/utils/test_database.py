@@ -0,0 +1,246 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+
+import copy
+import pickle
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.utils.conftest import JSON_SCRUTIN
+from utils.databaseManager import Database
+from utils.deputeManager import Depute, DeputeRepository
+from utils.organeManager import Organe
+from utils.scrutinManager import ResultBallot, Scrutin, ScrutinStore
+from utils.voteManager import VoteMatrix, VoteStatistics
+
+
+def make_depute(ref: str, last_name: str, dep: str = "75", circo: str = "1", gp_ref: str = "GP001") -> Depute:
+    return Depute(
+        ref=ref,
+        last_name=last_name,
+        first_name="Claire",
+        dep=dep,
+        dep_name="Paris",
+        circo=circo,
+        gp_ref=gp_ref,
+        gp="Groupe Test"
+    )
+
+
+@pytest.fixture
+def sample_deputes() -> List[Depute]:
+    return [
+        make_depute("PA123", "Thiébault-Martinez"),
+        make_depute("PA456", "Durand", circo="2"),
+        make_depute("PA789", "Durand", dep="69", circo="3"),
+        make_depute("PA000", "Martin", dep="69", circo="1", gp_ref="GP002"),
+    ]
+
+
+@pytest.fixture
+def sample_scrutins(sample_scrutin_data_json: JSON_SCRUTIN) -> List[Scrutin]:
+    other_data = copy.deepcopy(sample_scrutin_data_json)
+    other_data["scrutin"]["numero"] = "1002"
+    votes = other_data["scrutin"]["ventilationVotes"]["organe"]["groupes"]["groupe"][0]["vote"]["decompteNominatif"]
+    votes["pours"] = {"votant": [{"acteurRef": "PA456"}, {"acteurRef": "PA789"}]}
+    votes["contres"] = None
+    return [Scrutin.from_json(sample_scrutin_data_json), Scrutin.from_json(other_data)]
+
+
+@pytest.fixture
+def database(tmp_path: Path, sample_deputes: List[Depute], sample_scrutins: List[Scrutin]) -> Database:
+    organes: List[Organe] = [Organe(ref="GP001", libelle="Groupe Test", libelle_abrev="GT", couleur="#123456")]
+    with patch("utils.databaseManager.logger"):
+        Database.write(tmp_path / "database.sqlite", organes, sample_deputes, sample_scrutins)
+    return Database(tmp_path / "database.sqlite")
+
+
+def test_database_queries(
+    database: Database,
+    sample_deputes: List[Depute],
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    matrix: VoteMatrix = VoteMatrix()
+    matrix.build(sample_deputes, sample_scrutins)
+    statistics: VoteStatistics = VoteStatistics()
+    with patch("utils.voteManager.logger"):
+        statistics.compute(matrix)
+
+    # Assertions result
+    assert database.find_by_name("thiebault martinez") == [sample_deputes[0]]
+    assert database.find_by_name("Durand") == sample_deputes[1:3]
+    assert database.find_by_name("Durand", "claire") == sample_deputes[1:3]
+    assert database.find_by_name("Durand", "Jean") == []
+    assert database.find_by_dep("69") == sample_deputes[2:]
+    assert database.find_by_dep("01") == []
+    assert database.find_by_circo("75", "2") == sample_deputes[1]
+    assert database.find_by_circo("75", "3") is None
+    assert database.scrutin("1002") == sample_scrutins[1]
+    assert database.scrutin("9999") is None
+    assert database.result("PA789", "1002") == ResultBallot.POUR
+    assert database.result("PA000", "1001") is None
+    for depute in sample_deputes:
+        assert database.statistics(depute.ref) == statistics.get(depute.ref)
+        for scrutin in sample_scrutins:
+            assert database.result(depute.ref, scrutin.ref) == matrix.result(depute.ref, scrutin.ref)
+    assert list(database.statistics("PA404")) == ["absent", "pour", "contre", "abstention", "nonvotant"]
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.databaseManager.logger")
+def test_database_rewrite(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    database: Database,
+    sample_deputes: List[Depute],
+    mock_bot: MagicMock) -> None:
+
+    assert database.scrutin("1001") is not None
+    Database.write(tmp_path / "database.sqlite", [], sample_deputes[:1], [])
+    rewritten: Database = Database(tmp_path / "database.sqlite")
+
+    # Assertions result
+    # the connections opened before keep reading the previous file
+    assert database.scrutin("1001") is not None
+    assert rewritten.scrutin("1001") is None
+    assert rewritten.find_by_name("Durand") == []
+    assert rewritten.find_by_name("Thiébault-Martinez") == sample_deputes[:1]
+    assert [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"] == []
+    with sqlite3.connect(tmp_path / "database.sqlite") as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    # Assertions logs
+    mock_log.info.assert_called_once_with("Database written to %s", tmp_path / "database.sqlite")
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.databaseManager.logger")
+def test_database_update(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    database: Database,
+    sample_deputes: List[Depute],
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    # the scrutin 1001 is removed and 1002 modified
+    modified: Scrutin = copy.deepcopy(sample_scrutins[1])
+    modified.groupes["GP001"]["pour"] = ["PA123"]
+    Database.update(database.path, tmp_path / "updated.sqlite", [modified], ["1001", "1002"])
+    updated: Database = Database(tmp_path / "updated.sqlite")
+    matrix: VoteMatrix = VoteMatrix()
+    matrix.build(sample_deputes, [modified])
+
+    # Assertions result
+    assert database.scrutin("1001") == sample_scrutins[0]
+    assert database.scrutin("1002") == sample_scrutins[1]
+    assert updated.scrutin("1001") is None
+    assert updated.scrutin("1002") == modified
+    assert updated.find_by_name("Durand") == sample_deputes[1:3]
+    for depute in sample_deputes:
+        assert updated.result(depute.ref, "1001") is None
+        assert updated.result(depute.ref, "1002") == matrix.result(depute.ref, "1002")
+    assert [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"] == []
+
+    # Assertions logs
+    mock_log.info.assert_called_once_with(
+        "Database %s written from %s, %s scrutins replaced or removed", tmp_path / "updated.sqlite", database.path, 2
+    )
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.databaseManager.logger")
+def test_database_update_missing_source(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    # Assertions result
+    with pytest.raises(sqlite3.Error):
+        Database.update(tmp_path / "missing.sqlite", tmp_path / "updated.sqlite", sample_scrutins, ["1001"])
+    assert list(tmp_path.iterdir()) == []
+
+    # Assertions logs
+    mock_log.info.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_database_completions(
+    tmp_path: Path,
+    database: Database,
+    sample_deputes: List[Depute],
+    mock_bot: MagicMock) -> None:
+
+    repository: DeputeRepository = DeputeRepository()
+    repository.index(sample_deputes)
+    store: ScrutinStore = ScrutinStore()
+    for numero in ("1001", "1002"):
+        (tmp_path / "scrutins").mkdir(exist_ok=True)
+        (tmp_path / "scrutins" / f"VTANR5L17V{numero}.json").touch()
+    with patch("utils.scrutinManager.logger"):
+        store.load(tmp_path / "scrutins")
+
+    # Assertions result
+    for last_name, first_name in [("Durant", None), ("Durand", "Clara"), ("thiebault", None), ("Martine", "Jean"), ("Zzz", None)]:
+        assert database.search(last_name, first_name) == repository.search(last_name, first_name)
+    assert database.search("Durand", limit=1) == repository.search("Durand", limit=1)
+    for prefix in ["", "d", "Mar", "thi", "x"]:
+        assert database.complete_name(prefix) == repository.complete_name(prefix)
+        assert database.complete_name(prefix, limit=1) == repository.complete_name(prefix, limit=1)
+    for prefix in ["", "6", "75", "par", "x"]:
+        assert database.complete_dep(prefix) == repository.complete_dep(prefix)
+    for prefix in ["", "1", "1002", "2", "1*", "["]:
+        assert database.complete(prefix) == store.complete(prefix)
+    assert database.complete("", limit=1) == ["1002"]
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_database_threads(
+    database: Database,
+    sample_deputes: List[Depute],
+    mock_bot: MagicMock) -> None:
+
+    database.find_by_name("Durand")
+    copy_database: Database = pickle.loads(pickle.dumps(database))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda depute: copy_database.find_by_circo(depute.dep, depute.circo), sample_deputes))
+
+    # Assertions result
+    assert copy_database.path == database.path
+    assert results == sample_deputes
+    # every connection is read-only
+    with pytest.raises(sqlite3.OperationalError):
+        copy_database._connection().execute("DELETE FROM acteurs")
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
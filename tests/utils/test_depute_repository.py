@@ -0,0 +1,159 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+
+import json
+from pathlib import Path
+from typing import List
+from unittest.mock import MagicMock, patch
+
+from tests.utils.conftest import JSON_DEPUTE, sample_gp_data
+from utils.deputeManager import Depute, DeputeRepository
+
+
+def make_depute(ref: str, last_name: str, first_name: str, dep: str, circo: str) -> Depute:
+    return Depute(
+        ref=ref,
+        last_name=last_name,
+        first_name=first_name,
+        dep=dep,
+        dep_name="Department test",
+        circo=circo,
+        gp_ref="GP001",
+        gp="Groupe Test"
+    )
+
+
+def sample_deputes() -> List[Depute]:
+    return [
+        make_depute("PA1", "Thiébault-Martinez", "Céline", "77", "2"),
+        make_depute("PA2", "Martin", "Paul", "75", "1"),
+        make_depute("PA3", "Martin", "Julie", "75", "3"),
+        make_depute("PA4", "D'Intorni", "Christelle", "06", "5"),
+    ]
+
+
+def test_index(
+    mock_bot: MagicMock) -> None:
+
+    repository: DeputeRepository = DeputeRepository()
+    repository.index(sample_deputes())
+
+    # Assertions result
+    assert len(repository) == 4
+    assert repository.get("PA2").first_name == "Paul"
+    assert repository.get("PA9") is None
+    assert [d.ref for d in repository.find_by_name("martin")] == ["PA2", "PA3"]
+    assert [d.ref for d in repository.find_by_name("Martin", "julie")] == ["PA3"]
+    assert [d.ref for d in repository.find_by_name("Thiebault Martinez")] == ["PA1"]
+    assert [d.ref for d in repository.find_by_name("DIntorni")] == ["PA4"]
+    assert repository.find_by_name("Inconnu") == []
+    assert [d.ref for d in repository.find_by_dep("75")] == ["PA2", "PA3"]
+    assert repository.find_by_dep("13") == []
+    assert repository.find_by_circo("75", "3").ref == "PA3"
+    assert repository.find_by_circo("75", "2") is None
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_index_replaces_content(
+    mock_bot: MagicMock) -> None:
+
+    repository: DeputeRepository = DeputeRepository()
+    repository.index(sample_deputes())
+    repository.index([make_depute("PA5", "Durand", "Claire", "13", "1")])
+
+    # Assertions result
+    assert len(repository) == 1
+    assert repository.find_by_name("Martin") == []
+    assert repository.find_by_circo("13", "1").ref == "PA5"
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_search(
+    mock_bot: MagicMock) -> None:
+
+    repository: DeputeRepository = DeputeRepository()
+    repository.index(sample_deputes())
+
+    # Assertions result
+    assert [d.ref for d in repository.search("Martin")] == ["PA2", "PA3"]
+    assert [d.ref for d in repository.search("Martin", "Jule")] == ["PA3", "PA2"]
+    assert [d.ref for d in repository.search("Thiebaut-Martines")] == ["PA1"]
+    assert [d.ref for d in repository.search("Thiébault")] == ["PA1"]
+    assert [d.ref for d in repository.search("Mart", limit=1)] == ["PA2"]
+    assert repository.search("Dupont") == []
+    assert [d.ref for d in repository.complete_name("mart")] == ["PA2", "PA3"]
+    assert [d.ref for d in repository.complete_name("d'in")] == ["PA4"]
+    assert repository.complete_dep("7") == [("75", "Department test"), ("77", "Department test")]
+    assert repository.complete_dep("depart", limit=1) == [("06", "Department test")]
+    assert repository.complete_dep("13") == []
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.deputeManager.logger")
+def test_load(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    sample_valid_depute_json: JSON_DEPUTE,
+    mock_bot: MagicMock) -> None:
+
+    acteur_folder: Path = tmp_path / "acteur"
+    acteur_folder.mkdir()
+    with open(acteur_folder / "PA123456.json", "w", encoding="utf-8") as f:
+        json.dump(sample_valid_depute_json, f)
+    organe_folder: Path = tmp_path / "organe"
+    organe_folder.mkdir()
+    with open(organe_folder / "ORG123.json", "w", encoding="utf-8") as f:
+        json.dump(sample_gp_data, f)
+
+    repository: DeputeRepository = DeputeRepository()
+    with patch("utils.deputeManager.ORGANE_FOLDER", organe_folder):
+        repository.load(acteur_folder)
+
+    # Assertions result
+    assert len(repository) == 1
+    assert repository.get("PA123456").gp == "Groupe Test"
+    assert repository.find_by_circo("75", "1").ref == "PA123456"
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+    mock_log.warning.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.deputeManager.logger")
+def test_load_missing_folder(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+
+    repository: DeputeRepository = DeputeRepository()
+    repository.index(sample_deputes())
+    repository.load(tmp_path / "missing")
+
+    # Assertions result
+    assert len(repository) == 4
+
+    # Assertions logs
+    mock_log.error.assert_called_once()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
@@ -0,0 +1,94 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, call, patch
+
+from tests.utils.conftest import JSON_DEPUTE, sample_gp_data
+from utils.deputeManager import Depute
+from utils.organeManager import Organe, OrganeRepository
+
+
+def test_from_json(
+    mock_bot: MagicMock) -> None:
+
+    organe: Organe = Organe.from_json(sample_gp_data)
+
+    # Assertions result
+    assert organe.ref == "ORG123"
+    assert organe.libelle == "Groupe Test"
+    assert organe.libelle_abrev == "GT"
+    assert organe.couleur == "#123456"
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.organeManager.logger")
+def test_load(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+
+    with open(tmp_path / "ORG123.json", "w", encoding="utf-8") as f:
+        json.dump(sample_gp_data, f)
+    with open(tmp_path / "ORG456.json", "w", encoding="utf-8") as f:
+        json.dump({"organe": {"uid": "ORG456", "libelle": "Commission Test"}}, f)
+    with open(tmp_path / "invalid.json", "w", encoding="utf-8") as f:
+        json.dump({"acteur": {}}, f)
+
+    repository: OrganeRepository = OrganeRepository()
+    repository.load(tmp_path)
+
+    # Assertions result
+    assert len(repository) == 2
+    assert repository.get("ORG123").libelle_abrev == "GT"
+    assert repository.get("ORG456").couleur == ""
+    assert repository.get("ORG789") is None
+
+    # Assertions logs
+    mock_log.error.assert_called_once()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.deputeManager.logger")
+def test_depute_from_json_with_organes(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    sample_valid_depute_json: JSON_DEPUTE,
+    sample_invalid_depute_json: JSON_DEPUTE,
+    mock_bot: MagicMock) -> None:
+
+    with open(tmp_path / "ORG123.json", "w", encoding="utf-8") as f:
+        json.dump(sample_gp_data, f)
+    repository: OrganeRepository = OrganeRepository()
+    repository.load(tmp_path)
+
+    with patch("builtins.open") as mock_builtins_open:
+        depute: Depute = Depute.from_json(sample_valid_depute_json, repository)
+        invalid_depute: Depute = Depute.from_json(sample_invalid_depute_json, repository)
+
+    # Assertions result
+    assert depute.gp_ref == "ORG123"
+    assert depute.gp == "Groupe Test"
+    assert invalid_depute.gp_ref == ""
+    assert invalid_depute.gp == ""
+    mock_builtins_open.assert_not_called()
+
+    # Assertions logs
+    mock_log.warning.assert_has_calls([
+        call("Cannot find the organe %s for %s", "INVALID", invalid_depute.ref)
+    ])
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
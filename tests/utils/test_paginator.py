@@ -0,0 +1,114 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+
+from typing import cast
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+
+from utils.paginatorManager import Pages, Paginator, send_pages
+
+
+def make_pages(count: int, per_page: int = 2) -> Pages:
+    return Pages(
+        items=[str(i) for i in range(count)],
+        per_page=per_page,
+        render=MagicMock(side_effect=lambda items: discord.Embed(title=",".join(items))),
+    )
+
+
+def make_interaction() -> MagicMock:
+    interaction = MagicMock()
+    interaction.response.edit_message = AsyncMock()
+    return interaction
+
+
+def test_pages(
+    mock_bot: MagicMock) -> None:
+
+    pages: Pages = make_pages(5)
+    embed: discord.Embed = pages.page(2)
+
+    # Assertions result
+    assert pages.count == 3
+    assert pages.items == ("0", "1", "2", "3", "4")
+    assert embed.title == "4"
+    assert embed.footer.text == "Page 3/3"
+    # only the displayed page is rendered
+    cast(MagicMock, pages.render).assert_called_once_with(("4",))
+    assert make_pages(0).count == 1
+    assert make_pages(4).count == 2
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_paginator_buttons(
+    mock_bot: MagicMock) -> None:
+
+    paginator: Paginator = Paginator(make_pages(5))
+    disabled_at_start = (paginator.previous_page.disabled, paginator.next_page.disabled)
+    interaction: MagicMock = make_interaction()
+    await paginator.next_page.callback(interaction)
+    await paginator.next_page.callback(interaction)
+    at_end = (paginator.previous_page.disabled, paginator.next_page.disabled)
+    await paginator.previous_page.callback(interaction)
+
+    # Assertions result
+    assert disabled_at_start == (True, False)
+    assert at_end == (False, True)
+    assert paginator.index == 1
+    titles = [kwargs["embed"].title for _, kwargs in interaction.response.edit_message.await_args_list]
+    assert titles == ["2,3", "4", "2,3"]
+    assert interaction.response.edit_message.await_args.kwargs["view"] is paginator
+    assert paginator.pages.render.call_count == 3
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_paginator_timeout(
+    mock_bot: MagicMock) -> None:
+
+    paginator: Paginator = Paginator(make_pages(5))
+    paginator.message = MagicMock()
+    paginator.message.edit = AsyncMock(side_effect=discord.NotFound(MagicMock(status=404), "Unknown Message"))
+    await paginator.on_timeout()
+
+    # Assertions result
+    assert paginator.previous_page.disabled and paginator.next_page.disabled
+    paginator.message.edit.assert_awaited_once_with(view=paginator)
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("utils.paginatorManager.PAGINATOR_TIMEOUT_SECOND", 30)
+async def test_send_pages(
+    mock_bot: MagicMock) -> None:
+
+    context = MagicMock()
+    context.send = AsyncMock()
+    pages: Pages = make_pages(5)
+    await send_pages(context, pages)
+    single_context = MagicMock()
+    single_context.send = AsyncMock()
+    await send_pages(single_context, make_pages(2))
+
+    # Assertions result
+    kwargs = context.send.await_args.kwargs
+    assert kwargs["embed"].title == "0,1"
+    assert kwargs["embed"].footer.text == "Page 1/3"
+    assert isinstance(kwargs["view"], Paginator)
+    assert kwargs["view"].timeout == 30
+    assert kwargs["view"].message is context.send.return_value
+    cast(MagicMock, pages.render).assert_called_once()
+    assert "view" not in single_context.send.await_args.kwargs
+
+    # Assertions bot
+    mock_bot.assert_not_called()
@@ -2,13 +2,19 @@
 # See LICENSE file for extended copyright information.
 # This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
 
-from typing import Union
-from unittest.mock import MagicMock
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import List, Union
+from unittest.mock import MagicMock, patch
+import zipfile
 import pytest
 
 from tests.utils.conftest import JSON_SCRUTIN
 from utils.deputeManager import Depute
-from utils.scrutinManager import Scrutin, ResultBallot
+from utils.scrutinManager import Scrutin, ResultBallot, ScrutinStore
 
 
 def test_from_json(
@@ -224,3 +230,200 @@ def test_to_string_depute_absent(
     mock_bot.assert_not_called()
     mock_bot.update_lock.__aenter__.assert_not_called()
     mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.scrutinManager.logger")
+def test_store_load(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    sample_scrutin_data_json: JSON_SCRUTIN,
+    mock_bot: MagicMock) -> None:
+
+    with open(tmp_path / "VTANR5L17V1001.json", "w", encoding="utf-8") as f:
+        json.dump(sample_scrutin_data_json, f)
+    sample_scrutin_data_json["scrutin"]["numero"] = "1002"
+    with open(tmp_path / "unnamed.json", "w", encoding="utf-8") as f:
+        json.dump(sample_scrutin_data_json, f)
+
+    store: ScrutinStore = ScrutinStore()
+    store.load(tmp_path)
+
+    # Assertions result
+    assert len(store) == 2
+    assert "1001" in store
+    assert "1002" in store
+    assert store.get("1001").ref == "1001"
+    assert store.get("1002").ref == "1002"
+    assert store.get("9999") is None
+    assert sorted(scrutin.ref for scrutin in store) == ["1001", "1002"]
+    assert store.complete("100") == ["1002", "1001"]
+    assert store.complete("1002") == ["1002"]
+    assert store.complete("2") == []
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+    mock_log.warning.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.scrutinManager.logger")
+def test_store_malformed_file(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+
+    with open(tmp_path / "VTANR5L17V1001.json", "w", encoding="utf-8") as f:
+        f.write("not json")
+    with open(tmp_path / "unnamed.json", "w", encoding="utf-8") as f:
+        f.write("not json")
+
+    store: ScrutinStore = ScrutinStore()
+    store.load(tmp_path)
+
+    # Assertions result
+    assert len(store) == 1
+    assert store.get("1001") is None
+
+    # Assertions logs
+    assert mock_log.error.call_count == 2
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.scrutinManager.logger")
+def test_store_missing_folder(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    sample_scrutin_data_json: JSON_SCRUTIN,
+    mock_bot: MagicMock) -> None:
+
+    with open(tmp_path / "VTANR5L17V1001.json", "w", encoding="utf-8") as f:
+        json.dump(sample_scrutin_data_json, f)
+
+    store: ScrutinStore = ScrutinStore()
+    store.load(tmp_path)
+    store.load(tmp_path / "missing")
+
+    # Assertions result
+    assert "1001" in store
+
+    # Assertions logs
+    mock_log.error.assert_called_once()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.scrutinManager.logger")
+def test_store_load_zip(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    sample_scrutin_data_json: JSON_SCRUTIN,
+    mock_bot: MagicMock) -> None:
+
+    zip_path: Path = tmp_path / "scrutins.zip"
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.writestr("json/VTANR5L17V1001.json", json.dumps(sample_scrutin_data_json))
+        sample_scrutin_data_json["scrutin"]["numero"] = "1002"
+        zipf.writestr("json/unnamed.json", json.dumps(sample_scrutin_data_json))
+        zipf.writestr("other/VTANR5L17V1003.json", "ignored")
+
+    store: ScrutinStore = ScrutinStore()
+    store.load_zip(zip_path)
+    unpickled: ScrutinStore = pickle.loads(pickle.dumps(store))
+
+    # Assertions result
+    assert len(store) == 2
+    assert store.get("1001").ref == "1001"
+    assert store.get("1002").ref == "1002"
+    assert store.get("1003") is None
+    assert unpickled.get("1001").ref == "1001"
+    assert store.changes(unpickled) == ([], [])
+    assert not (tmp_path / "json").exists()
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+    mock_log.warning.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.scrutinManager.logger")
+def test_store_load_zip_threads(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    sample_scrutin_data_json: JSON_SCRUTIN,
+    mock_bot: MagicMock) -> None:
+
+    zip_path: Path = tmp_path / "scrutins.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for numero in range(1001, 1051):
+            sample_scrutin_data_json["scrutin"]["numero"] = str(numero)
+            zipf.writestr(f"json/VTANR5L17V{numero}.json", json.dumps(sample_scrutin_data_json))
+    store: ScrutinStore = ScrutinStore()
+    store.load_zip(zip_path)
+
+    # the members are decompressed by several threads at once from the same zip file
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        refs: List[str] = list(executor.map(lambda numero: store.get(numero).ref, store.numeros() * 4))
+
+    # Assertions result
+    assert refs == store.numeros() * 4
+    assert not store._lock.locked()
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+@patch("utils.scrutinManager.logger")
+def test_store_load_zip_changes(
+    mock_log: MagicMock,
+    tmp_path: Path,
+    sample_scrutin_data_json: JSON_SCRUTIN,
+    mock_bot: MagicMock) -> None:
+
+    zip_path: Path = tmp_path / "scrutins.zip"
+    with zipfile.ZipFile(zip_path, "w") as zipf:
+        zipf.writestr("json/VTANR5L17V1001.json", json.dumps(sample_scrutin_data_json))
+        zipf.writestr("json/VTANR5L17V1002.json", "{}")
+    previous: ScrutinStore = ScrutinStore()
+    previous.load_zip(zip_path)
+
+    # the zip file is replaced, the previous store keeps reading the previous one
+    new_path: Path = tmp_path / "scrutins.zip.tmp"
+    with zipfile.ZipFile(new_path, "w") as zipf:
+        zipf.writestr("json/VTANR5L17V1001.json", json.dumps(sample_scrutin_data_json, indent=1))
+        zipf.writestr("json/VTANR5L17V1003.json", "{}")
+    os.replace(new_path, zip_path)
+    store: ScrutinStore = ScrutinStore()
+    store.load_zip(zip_path)
+    store.load_zip(tmp_path / "missing.zip")
+
+    # Assertions result
+    assert store.changes(previous) == (["1001", "1003"], ["1002"])
+    assert previous.get("1001").ref == "1001"
+
+    # Assertions logs
+    mock_log.error.assert_called_once()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
@@ -0,0 +1,61 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+
+import pytest
+
+from utils.searchManager import NameIndex, edit_distance
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("", "", 0),
+    ("panot", "panot", 0),
+    ("panot", "pannot", 1),
+    ("panot", "panto", 2),
+    ("lepen", "", 5),
+    ("kitten", "sitting", 3),
+])
+def test_edit_distance(a: str, b: str, expected: int) -> None:
+    assert edit_distance(a, b) == expected
+    assert edit_distance(b, a) == expected
+
+
+@pytest.fixture
+def name_index() -> NameIndex:
+    index: NameIndex = NameIndex()
+    index.build([
+        ("martin", "PA1"),
+        ("martin", "PA2"),
+        ("martinez", "PA3"),
+        ("martineau", "PA4"),
+        ("panot", "PA5"),
+        ("lepen", "PA6"),
+    ])
+    return index
+
+
+def test_exact(name_index: NameIndex) -> None:
+    assert len(name_index) == 5
+    assert name_index.exact("martin") == ["PA1", "PA2"]
+    assert name_index.exact("marti") == []
+
+
+def test_prefix(name_index: NameIndex) -> None:
+    assert name_index.prefix_keys("mart") == ["martin", "martineau", "martinez"]
+    assert name_index.prefix_keys("mart", limit=2) == ["martin", "martineau"]
+    assert name_index.prefix("martine") == ["PA3", "PA4"]
+    assert name_index.prefix("") == ["PA6", "PA5", "PA1", "PA2", "PA3", "PA4"]
+    assert name_index.prefix("x") == []
+
+
+def test_fuzzy(name_index: NameIndex) -> None:
+    assert name_index.fuzzy_keys("pannot") == [(1, "panot")]
+    assert name_index.fuzzy_keys("martinz") == [(1, "martin"), (1, "martinez")]
+    assert name_index.fuzzy_keys("dupont") == []
+
+
+def test_search(name_index: NameIndex) -> None:
+    assert name_index.search("martin") == ["PA1", "PA2", "PA3", "PA4"]
+    assert name_index.search("martin", limit=2) == ["PA1", "PA2"]
+    assert name_index.search("lepn") == ["PA6"]
+    assert name_index.search("dupont") == []
@@ -0,0 +1,307 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+
+import asyncio
+import json
+import threading
+from contextlib import nullcontext
+import time
+from pathlib import Path
+from typing import List
+from unittest.mock import AsyncMock, MagicMock, call, patch
+
+import discord
+import pytest
+
+from common.config import DISCORD_EMBED_COLOR_ERR
+from utils.cacheManager import ResponseCache
+from utils.paginatorManager import Pages
+from utils import utils as utils_module
+from utils.utils import read_json_file, send_embeds
+
+
+def slow_handler(*_args: str) -> discord.Embed:
+    """Handler taking longer than the patched HANDLER_TIMEOUT_SECOND"""
+    time.sleep(0.5)
+    return discord.Embed()
+
+
+@pytest.mark.asyncio
+@patch("utils.utils.logger")
+async def test_send_embeds_list(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    context = MagicMock()
+    context.send = AsyncMock()
+    embeds = [discord.Embed(title="1"), discord.Embed(title="2")]
+    handler_threads = []
+
+    def handler() -> List[discord.Embed]:
+        handler_threads.append(threading.current_thread())
+        return embeds
+
+    await send_embeds(context, handler)
+
+    # Assertions result
+    context.send.assert_awaited_once_with(embeds=embeds)
+    assert handler_threads[0] is not threading.main_thread()
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("utils.utils.logger")
+async def test_send_embeds_batches(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    context = MagicMock()
+    context.send = AsyncMock()
+    embeds = [discord.Embed(title=str(i)) for i in range(12)]
+    # alone in its message since the next embed would exceed the character limit
+    embeds.append(discord.Embed(title="big", description="x" * 5000))
+    embeds.append(discord.Embed(title="last", description="x" * 1000))
+
+    await send_embeds(context, lambda: embeds)
+
+    # Assertions result
+    context.send.assert_has_awaits([
+        call(embeds=embeds[:10]),
+        call(embeds=embeds[10:13]),
+        call(embed=embeds[13]),
+    ])
+    assert context.send.await_count == 3
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("utils.utils.logger")
+async def test_send_embeds_pages(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    context = MagicMock()
+    context.send = AsyncMock()
+    pages = Pages(items=["1", "2", "3"], per_page=1, render=lambda items: discord.Embed(title=items[0]))
+
+    await send_embeds(context, lambda: pages)
+
+    # Assertions result
+    context.send.assert_awaited_once()
+    assert context.send.await_args.kwargs["embed"].title == "1"
+    assert context.send.await_args.kwargs["view"].pages is pages
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("utils.utils.logger")
+async def test_send_embeds_single(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    context = MagicMock()
+    context.send = AsyncMock()
+    embed = discord.Embed(title="1")
+
+    await send_embeds(context, lambda: embed)
+
+    # Assertions result
+    context.send.assert_awaited_once_with(embed=embed)
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("utils.utils.HANDLER_TIMEOUT_SECOND", 0.05)
+@patch("utils.utils.logger")
+async def test_send_embeds_timeout(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    context = MagicMock()
+    context.send = AsyncMock()
+
+    await send_embeds(context, slow_handler)
+
+    # Assertions result
+    context.send.assert_awaited_once()
+    embed = context.send.await_args.kwargs["embed"]
+    assert embed.title == "Délai dépassé"
+    assert int(embed.color) == DISCORD_EMBED_COLOR_ERR
+
+    # Assertions logs
+    mock_log.error.assert_called_once()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("utils.utils.logger")
+async def test_send_embeds_cached(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    context = MagicMock()
+    context.send = AsyncMock()
+    context.command.qualified_name = "dep"
+    cache = ResponseCache(size=10, ttl=0)
+    cache.invalidate(1)
+    handler = MagicMock(side_effect=lambda code_dep: discord.Embed(title=code_dep))
+
+    with patch("utils.utils.response_cache", cache):
+        await send_embeds(context, handler, "75", cached=True)
+        await send_embeds(context, handler, " 75 ", cached=True)
+        await send_embeds(context, handler, "69", cached=True)
+        cache.invalidate(2)
+        await send_embeds(context, handler, "75", cached=True)
+        await send_embeds(context, handler, "75")
+
+    # Assertions result
+    assert handler.call_args_list == [call("75"), call("69"), call("75"), call("75")]
+    sent = [kwargs["embed"] for _, kwargs in context.send.await_args_list]
+    assert [embed.title for embed in sent] == ["75", "75", "69", "75", "75"]
+    assert sent[0] is sent[1]
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("utils.utils.HANDLER_TIMEOUT_SECOND", 0.05)
+@patch("utils.utils.logger")
+async def test_send_embeds_timeout_not_cached(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    context = MagicMock()
+    context.send = AsyncMock()
+    context.command.qualified_name = "scr"
+    cache = ResponseCache(size=10, ttl=0)
+    cache.invalidate(1)
+
+    with patch("utils.utils.response_cache", cache):
+        await send_embeds(context, slow_handler, "1", cached=True)
+
+    # Assertions result
+    assert context.send.await_args.kwargs["embed"].title == "Délai dépassé"
+    assert len(cache) == 0
+
+    # Assertions logs
+    mock_log.error.assert_called_once()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("utils.utils.logger")
+async def test_send_embeds_coalesced(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    contexts = [MagicMock() for _ in range(3)]
+    for context in contexts:
+        context.send = AsyncMock()
+        context.command.qualified_name = "scr"
+    cache = ResponseCache(size=0, ttl=0)
+    cache.invalidate(1)
+    release = threading.Event()
+    handler = MagicMock(side_effect=lambda code_ref: release.wait(1) and discord.Embed(title=code_ref))
+
+    with patch("utils.utils.response_cache", cache):
+        sends = [asyncio.ensure_future(send_embeds(context, handler, "1", cached=True)) for context in contexts]
+        await asyncio.sleep(0.05)
+        in_flight = dict(utils_module._in_flight)
+        release.set()
+        await asyncio.gather(*sends)
+
+    # Assertions result
+    handler.assert_called_once_with("1")
+    assert list(in_flight) == [("scr", ("1",), 1)]
+    assert not utils_module._in_flight
+    embeds = [context.send.await_args.kwargs["embed"] for context in contexts]
+    assert embeds[0].title == "1"
+    assert embeds[1] is embeds[0] and embeds[2] is embeds[0]
+
+    # Assertions logs
+    mock_log.error.assert_not_called()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("utils.utils.HANDLER_TIMEOUT_SECOND", 0.05)
+@patch("utils.utils.logger")
+async def test_send_embeds_coalesced_cancelled(
+    mock_log: MagicMock,
+    mock_bot: MagicMock) -> None:
+
+    contexts = [MagicMock() for _ in range(2)]
+    for context in contexts:
+        context.send = AsyncMock()
+        context.command.qualified_name = "stat"
+    handler = MagicMock(side_effect=lambda last_name: time.sleep(0.2))
+
+    with patch("utils.utils.response_cache", ResponseCache(size=0, ttl=0)):
+        sends = [asyncio.ensure_future(send_embeds(context, handler, "Panot", cached=True)) for context in contexts]
+        await asyncio.sleep(0.01)
+        # the first command is cancelled, the second still gets the timeout of the shared run
+        sends[0].cancel()
+        await asyncio.gather(*sends, return_exceptions=True)
+
+    # Assertions result
+    handler.assert_called_once_with("Panot")
+    assert sends[0].cancelled()
+    contexts[0].send.assert_not_awaited()
+    assert contexts[1].send.await_args.kwargs["embed"].title == "Délai dépassé"
+    assert not utils_module._in_flight
+
+    # Assertions logs
+    mock_log.error.assert_called_once()
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+
+
+@pytest.mark.parametrize("decoder", ["default", "stdlib"])
+def test_read_json_file(
+    tmp_path: Path,
+    decoder: str) -> None:
+
+    file_path: Path = tmp_path / "data.json"
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({"organe": {"libelle": "Écologiste et Social"}}, f, ensure_ascii=False)
+    malformed_path: Path = tmp_path / "malformed.json"
+    with open(malformed_path, "w", encoding="utf-8") as f:
+        f.write("not json")
+
+    with patch("utils.utils.json_loads", json.loads) if decoder == "stdlib" else nullcontext():
+        # Assertions result
+        assert read_json_file(file_path) == {"organe": {"libelle": "Écologiste et Social"}}
+        with pytest.raises(json.JSONDecodeError):
+            read_json_file(malformed_path)
@@ -0,0 +1,332 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+
+import copy
+import pickle
+from pathlib import Path
+from typing import List
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from tests.utils.conftest import JSON_SCRUTIN
+from utils.deputeManager import Depute
+from utils.scrutinManager import Scrutin, ResultBallot
+from utils.voteManager import NO_BALLOT, VoteHistory, VoteMatrix, VoteStatistics
+
+
+def make_depute(ref: str, gp_ref: str = "GP001") -> Depute:
+    return Depute(
+        ref=ref,
+        last_name="Test",
+        first_name="Test",
+        dep="00",
+        dep_name="Department test",
+        circo="1",
+        gp_ref=gp_ref,
+        gp="Groupe Test"
+    )
+
+
+@pytest.fixture
+def sample_deputes() -> List[Depute]:
+    deputes = [make_depute(ref) for ref in ("PA123", "PA456", "PA789", "PA321", "PA999")]
+    deputes.append(make_depute("PA000", "GP002"))
+    return deputes
+
+
+@pytest.fixture
+def sample_scrutins(sample_scrutin_data_json: JSON_SCRUTIN) -> List[Scrutin]:
+    other_data = copy.deepcopy(sample_scrutin_data_json)
+    other_data["scrutin"]["numero"] = "1002"
+    votes = other_data["scrutin"]["ventilationVotes"]["organe"]["groupes"]["groupe"][0]["vote"]["decompteNominatif"]
+    votes["pours"] = {"votant": [{"acteurRef": "PA456"}, {"acteurRef": "PA789"}]}
+    votes["contres"] = None
+    return [Scrutin.from_json(sample_scrutin_data_json), Scrutin.from_json(other_data)]
+
+
+def test_matrix_build(
+    sample_deputes: List[Depute],
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    matrix: VoteMatrix = VoteMatrix()
+    matrix.build(sample_deputes, sample_scrutins)
+
+    # Assertions result
+    assert matrix.shape == (6, 2)
+    assert matrix.refs == [depute.ref for depute in sample_deputes]
+    assert matrix.numeros == ["1001", "1002"]
+    assert matrix.row("PA404") is None
+    assert matrix.row("PA000").tolist() == [NO_BALLOT, NO_BALLOT]
+    assert matrix.row("PA789").dtype == np.int8
+    assert matrix.result("PA789", "1002") == ResultBallot.POUR
+    assert matrix.result("PA000", "1001") is None
+    assert matrix.result("PA456", "9999") is None
+    for depute in sample_deputes:
+        for scrutin in sample_scrutins:
+            assert matrix.result(depute.ref, scrutin.ref) == scrutin.result(depute)
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_matrix_participation_similarity(
+    sample_deputes: List[Depute],
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    matrix: VoteMatrix = VoteMatrix()
+    matrix.build(sample_deputes, sample_scrutins)
+
+    # Assertions result
+    assert matrix.participation("PA456") == 1.0
+    assert matrix.participation("PA999") == 0.0
+    assert matrix.participation("PA000") is None
+    assert matrix.similarity("PA456", "PA789") == 0.5
+    assert matrix.similarity("PA456", "PA456") == 1.0
+    assert matrix.similarity("PA456", "PA999") is None
+    assert matrix.similarity("PA456", "PA404") is None
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_matrix_empty(
+    sample_deputes: List[Depute],
+    mock_bot: MagicMock) -> None:
+
+    matrix: VoteMatrix = VoteMatrix()
+    matrix.build(sample_deputes, [])
+
+    # Assertions result
+    assert matrix.shape == (6, 0)
+    assert matrix.counts().shape == (6, len(ResultBallot))
+    assert matrix.participation("PA456") is None
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_matrix_save_open(
+    tmp_path: Path,
+    sample_deputes: List[Depute],
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    built: VoteMatrix = VoteMatrix()
+    built.build(sample_deputes, sample_scrutins)
+    built.save(tmp_path / "votes.matrix")
+    matrix: VoteMatrix = VoteMatrix()
+    matrix.open(tmp_path / "votes.matrix")
+    unpickled: VoteMatrix = pickle.loads(pickle.dumps(matrix))
+
+    # Assertions result
+    assert isinstance(matrix.row("PA789"), np.memmap)
+    assert matrix.shape == built.shape
+    assert matrix.refs == built.refs
+    assert matrix.numeros == built.numeros
+    assert (matrix.counts() == built.counts()).all()
+    assert matrix.result("PA789", "1002") == ResultBallot.POUR
+    assert isinstance(unpickled.row("PA789"), np.memmap)
+    assert unpickled.result("PA789", "1002") == ResultBallot.POUR
+    assert [path.name for path in tmp_path.iterdir()] == ["votes.matrix"]
+    assert VoteMatrix.source(tmp_path / "votes.matrix") == ""
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_matrix_source(
+    tmp_path: Path,
+    sample_deputes: List[Depute],
+    mock_bot: MagicMock) -> None:
+
+    built: VoteMatrix = VoteMatrix()
+    built.build(sample_deputes, [])
+    built.save(tmp_path / "votes.matrix", "a" * 64)
+    with open(tmp_path / "invalid.matrix", "wb") as f:
+        f.write(b"not a matrix")
+
+    # Assertions result
+    assert VoteMatrix.source(tmp_path / "votes.matrix") == "a" * 64
+    assert VoteMatrix.source(tmp_path / "invalid.matrix") is None
+    assert VoteMatrix.source(tmp_path / "missing.matrix") is None
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_matrix_open_empty(
+    tmp_path: Path,
+    sample_deputes: List[Depute],
+    mock_bot: MagicMock) -> None:
+
+    built: VoteMatrix = VoteMatrix()
+    built.build(sample_deputes, [])
+    built.save(tmp_path / "votes.matrix")
+    matrix: VoteMatrix = VoteMatrix()
+    matrix.open(tmp_path / "votes.matrix")
+
+    # Assertions result
+    assert matrix.shape == (6, 0)
+    assert matrix.refs == built.refs
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_matrix_open_invalid(
+    tmp_path: Path,
+    mock_bot: MagicMock) -> None:
+
+    with open(tmp_path / "votes.matrix", "wb") as f:
+        f.write(b"not a matrix")
+
+    # Assertions result
+    with pytest.raises(ValueError):
+        VoteMatrix().open(tmp_path / "votes.matrix")
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_matrix_update(
+    sample_deputes: List[Depute],
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    previous: VoteMatrix = VoteMatrix()
+    previous.build(sample_deputes, sample_scrutins[:1])
+    matrix: VoteMatrix = VoteMatrix()
+    result: bool = matrix.update(previous, sample_deputes, ["1001", "1002", "1003"], sample_scrutins[1:])
+    expected: VoteMatrix = VoteMatrix()
+    expected.build(sample_deputes, sample_scrutins)
+
+    # Assertions result
+    assert result
+    assert matrix.numeros == ["1001", "1002"]
+    assert (matrix.counts() == expected.counts()).all()
+    assert previous.numeros == ["1001"]
+    assert not matrix.update(previous, sample_deputes[1:], ["1001"], [])
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_history_update(
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    previous: VoteHistory = VoteHistory()
+    previous.start()
+    previous.add(sample_scrutins[1])
+    previous.commit()
+    history: VoteHistory = VoteHistory()
+    history.update(previous, sample_scrutins[:1], [])
+    removed: VoteHistory = VoteHistory()
+    removed.update(history, [], ["1002"])
+
+    # Assertions result
+    assert history.history("PA789") == [("1002", ResultBallot.POUR), ("1001", ResultBallot.CONTRE)]
+    assert previous.history("PA789") == [("1002", ResultBallot.POUR)]
+    assert removed.history("PA789") == [("1001", ResultBallot.CONTRE)]
+    assert "PA789" in removed
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_history_build(
+    sample_deputes: List[Depute],
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    history: VoteHistory = VoteHistory()
+    matrix: VoteMatrix = VoteMatrix()
+    matrix.build(sample_deputes, sample_scrutins, history)
+
+    # Assertions result
+    assert len(history) == 4
+    assert "PA999" not in history
+    assert history.history("PA789") == [("1002", ResultBallot.POUR), ("1001", ResultBallot.CONTRE)]
+    assert history.history("PA789", limit=1) == [("1002", ResultBallot.POUR)]
+    assert history.history("PA789", ResultBallot.CONTRE) == [("1001", ResultBallot.CONTRE)]
+    assert history.history("PA123", ResultBallot.POUR) == []
+    assert history.history("PA999") == []
+    assert history.count("PA456", ResultBallot.POUR) == 2
+    assert history.count("PA999", ResultBallot.POUR) == 0
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_history_served_until_commit(
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    history: VoteHistory = VoteHistory()
+    history.start()
+    history.add(sample_scrutins[0])
+    history.commit()
+    history.start()
+    history.add(sample_scrutins[1])
+
+    # Assertions result
+    assert history.history("PA789") == [("1001", ResultBallot.CONTRE)]
+    history.commit()
+    assert history.history("PA789") == [("1002", ResultBallot.POUR)]
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
+
+
+def test_statistics_compute(
+    sample_deputes: List[Depute],
+    sample_scrutins: List[Scrutin],
+    mock_bot: MagicMock) -> None:
+
+    matrix: VoteMatrix = VoteMatrix()
+    matrix.build(sample_deputes, sample_scrutins)
+    statistics: VoteStatistics = VoteStatistics()
+    statistics.compute(matrix)
+
+    # Assertions result
+    assert len(statistics) == 6
+    assert list(statistics.get("PA123")) == ["absent", "pour", "contre", "abstention", "nonvotant"]
+    assert statistics.get("PA123")["nonvotant"] == 2
+    assert statistics.get("PA456")["pour"] == 2
+    assert statistics.get("PA789") == {"absent": 0, "pour": 1, "contre": 1, "abstention": 0, "nonvotant": 0}
+    assert statistics.get("PA321")["abstention"] == 2
+    assert statistics.get("PA999")["absent"] == 2
+    assert sum(statistics.get("PA000").values()) == 0
+    assert sum(statistics.get("PA404").values()) == 0
+
+    # Assertions bot
+    mock_bot.assert_not_called()
+    mock_bot.update_lock.__aenter__.assert_not_called()
+    mock_bot.update_lock.__aexit__.assert_not_called()
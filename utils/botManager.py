@@ -18,6 +18,7 @@ from typing_extensions import Self
 from common.logger import logger
 from common.config import DISCORD_BOT_MODE, DISCORD_CMD_PREFIX, UPDATE_AT_LAUNCH, MODE
 from download.update import start_planning
+from utils.utils import handler_executor, update_executor
 
 
 class DiscordBot(commands.Bot):
@@ -35,7 +36,6 @@ class DiscordBot(commands.Bot):
             intents=intents,
             help_command=None,
         )
-        self.database = None
         self.bot_prefix: str = DISCORD_CMD_PREFIX
         self.mode: MODE = DISCORD_BOT_MODE
 
@@ -83,6 +83,14 @@ class DiscordBot(commands.Bot):
         )
 
 
+    async def close(self: Self) -> None:
+        """
+        Stop the handler and update threads, then close the connection to Discord.
+        """
+        handler_executor.shutdown(wait=False)
+        update_executor.shutdown(wait=False)
+        await super().close()
+
     async def on_message(self: Self, message: discord.Message) -> None:
         """
         The code in this event is executed every time someone sends a message, 
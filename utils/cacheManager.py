@@ -0,0 +1,101 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Tuple
+
+from common.config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECOND
+from common.logger import logger
+
+# returned by ResponseCache.get when a key is not cached, since a handler result may be falsy
+MISSING = object()
+
+# command name, normalized arguments and data generation
+CacheKey = Tuple[str, Tuple[Any, ...], int]
+
+
+def normalize_args(args: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    """
+    Normalize the arguments of a command to build a cache key.
+
+    Only the whitespaces are collapsed: the handlers quote the arguments as typed in their error messages,
+    so two arguments differing by case or accents do not always share a response.
+    """
+    return tuple(" ".join(arg.split()) if isinstance(arg, str) else arg for arg in args)
+
+
+class ResponseCache:
+    """
+    LRU cache of the handler results, with a time to live.
+
+    The keys hold the data generation the results were computed from, the whole cache is dropped
+    when a new generation is published.
+    """
+
+    def __init__(self, size: int, ttl: float) -> None:
+        self._size: int = size
+        self._ttl: float = ttl
+        self._generation: int = 0
+        # key -> (expiry time, result), the least recently used first
+        self._entries: OrderedDict[CacheKey, Tuple[float, Any]] = OrderedDict()
+        # the generations are published from the update threads
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        """Return the data generation of the cached results"""
+        return self._generation
+
+    def key(self, command: str, args: Tuple[Any, ...]) -> CacheKey:
+        """Return the cache key of a command called with the given arguments in the current generation"""
+        return command, normalize_args(args), self._generation
+
+    def get(self, key: CacheKey) -> Any:
+        """Return the cached result of a key, MISSING if not cached or expired"""
+        with self._lock:
+            entry: Tuple[float, Any] | None = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expiry, result = entry
+            if self._ttl and expiry < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: CacheKey, result: Any) -> None:
+        """
+        Cache the result of a key, evicting the least recently used results beyond the cache size.
+        A result computed from a previous generation is not cached.
+        """
+        with self._lock:
+            if not self._size or not self._generation or key[-1] != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self._ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, generation: int) -> None:
+        """
+        Drop every cached result, to be called when a new generation is published.
+
+        Parameters:
+            generation (int): The generation now served.
+        """
+        with self._lock:
+            if self._entries:
+                logger.info("Dropped %s cached responses", len(self._entries))
+            self._entries.clear()
+            self._generation = generation
+
+
+# results of the commands, shared by every guild
+response_cache: ResponseCache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_SECOND)
@@ -11,10 +11,11 @@ from discord.ext.commands.hybrid import T
 from typing_extensions import Self
 
 from utils.botManager import DiscordBot
+from utils.dataManager import is_loaded
 
 
 class ProtectedCog(commands.Cog):
-    """Class with all commands protected during updates"""
+    """Class with all commands protected until the data is loaded"""
     def __init__(self: Self, bot: DiscordBot) -> None:
         self.bot: DiscordBot = bot
         if not hasattr(bot, "update_lock"):
@@ -23,14 +24,18 @@ class ProtectedCog(commands.Cog):
                 name="ProtectedCog"
             )
 
-def not_updating():
-    """Decorator to ensure commands will not be executed during an update"""
+def requires_data():
+    """
+    Decorator to ensure commands will not be executed before the data is loaded.
+
+    Updates do not block the commands, the previous data generation is served until the new one is published.
+    """
     def decorator(func: T) -> T:
         @wraps(func)
         async def wrapper(cog: ProtectedCog, context: Context, *args, **kwargs):
-            if cog.bot.update_lock.locked() or cog.bot.is_updating:
+            if not is_loaded():
                 await context.send(
-                    "Le bot est en cours de mise à jour. Service temporairement indisponible."
+                    "Le bot est en cours de chargement des données. Service temporairement indisponible."
                 )
                 return None
 
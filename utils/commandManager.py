@@ -12,13 +12,13 @@ from discord.ext.commands.hybrid import HybridCommand, CogT, P, T
 from discord.utils import MISSING
 from typing_extensions import Self
 
-from utils.cogManager import not_updating
+from utils.cogManager import requires_data
 
 if TYPE_CHECKING:
     from discord.ext.commands.hybrid import CommandCallback
 
 class ProtectedCommand(HybridCommand[CogT, P, T]):
-    """A class that is a protected during updates version of hybrid commands."""
+    """A class that is a version of hybrid commands protected until the data is loaded."""
     __commands_is_hybrid__: ClassVar[bool] = True
 
     def __init__(
@@ -30,7 +30,7 @@ class ProtectedCommand(HybridCommand[CogT, P, T]):
         description: str | app_commands.locale_str = MISSING,
         **kwargs: Any,
     ) -> None:
-        super().__init__(not_updating()(func),
+        super().__init__(requires_data()(func),
                          name=name,
                          description=description,
                          **kwargs)
@@ -0,0 +1,388 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import pickle
+import shutil
+import sqlite3
+from pathlib import Path
+from typing import Dict, List
+
+from attrs import define, evolve, field
+
+from common.config import (
+    ACTEUR_FOLDER,
+    DATABASE_FILE,
+    ORGANE_FOLDER,
+    SCRUTINS_FOLDER,
+    SCRUTINS_FROM_ZIP,
+    SCRUTINS_ZIP_FILE,
+    SNAPSHOT_FILE,
+    USE_DATABASE,
+    VOTE_MATRIX_FILE,
+)
+from common.logger import logger
+from download.core import copy_folder
+from utils.cacheManager import response_cache
+from utils.databaseManager import DATABASE_VERSION, Database
+from utils.deputeManager import Depute, DeputeRepository, read_deputes
+from utils.organeManager import OrganeRepository
+from utils.scrutinManager import Scrutin, ScrutinStore
+from utils.utils import update_executor
+from utils.voteManager import VoteHistory, VoteMatrix, VoteStatistics
+
+# to be incremented whenever a pickled class changes
+SNAPSHOT_VERSION = 4
+
+# copy of the scrutin files read by the served generation while SCRUTINS_FOLDER is updated, see keep_scrutin_files
+SCRUTINS_PREVIOUS_FOLDER: Path = SCRUTINS_FOLDER.with_name(SCRUTINS_FOLDER.name + ".previous")
+
+
+@define(kw_only=True, frozen=True)
+class Dataset:
+    """
+    A generation of the in-memory stores, published as a whole and never modified afterwards.
+
+    When served from a database, only the index of the scrutin files is kept to find the next changes,
+    the other stores are left empty.
+    """
+    generation: int = 0
+    # folders_hash of the acteur and organe folders the députés were loaded from
+    people_hash: str = ""
+    organes: OrganeRepository = field(factory=OrganeRepository)
+    deputes: DeputeRepository = field(factory=DeputeRepository)
+    scrutins: ScrutinStore = field(factory=ScrutinStore)
+    matrix: VoteMatrix = field(factory=VoteMatrix)
+    history: VoteHistory = field(factory=VoteHistory)
+    statistics: VoteStatistics = field(factory=VoteStatistics)
+    # SQLite store queried by the handlers instead of the others if USE_DATABASE is set
+    database: Database | None = None
+
+
+# the generation served to the commands, an empty generation 0 until the first load
+_current: Dataset = Dataset()
+
+
+def current_dataset() -> Dataset:
+    """
+    Return the generation being served.
+
+    A command must read it once and use it until it answers, so it never mixes two generations.
+    """
+    return _current
+
+
+def is_loaded() -> bool:
+    """Return True once a generation has been published"""
+    return _current.generation > 0
+
+
+def publish(dataset: Dataset) -> None:
+    """
+    Serve the given generation, the previous one stays valid for the commands still using it.
+
+    Parameters:
+        dataset (Dataset): The new generation.
+    """
+    global _current
+    _current = dataset
+    response_cache.invalidate(dataset.generation)
+    logger.info("Serving data generation %s", dataset.generation)
+
+
+def keep_scrutin_files() -> None:
+    """
+    Make the served generation read its scrutin files from a copy in SCRUTINS_PREVIOUS_FOLDER,
+    so that SCRUTINS_FOLDER can be updated before the next generation is published.
+    The copy is removed once the next generation is published, see load_data.
+    """
+    store: ScrutinStore = _current.scrutins
+    # a generation served from a database does not read its scrutin files
+    if store.directory != SCRUTINS_FOLDER or _current.database is not None:
+        return
+    copy_folder(SCRUTINS_FOLDER, SCRUTINS_PREVIOUS_FOLDER)
+    store.move(SCRUTINS_PREVIOUS_FOLDER)
+
+
+async def keep_scrutin_files_async() -> None:
+    """Copy the scrutin files of the served generation asynchronously, see keep_scrutin_files."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(update_executor, keep_scrutin_files)
+
+
+def folders_hash(*folders: Path) -> str:
+    """Return a hash of the name, size and modification time of every file of the folders, or of the files given."""
+    digest = hashlib.sha256()
+    for folder in folders:
+        digest.update(str(folder).encode())
+        if os.path.isfile(folder):
+            stat = os.stat(folder)
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+            continue
+        try:
+            entries = sorted(os.scandir(folder), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            stat = entry.stat()
+            digest.update(f"{entry.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def source_hash() -> str:
+    """Return a hash of every data file, see folders_hash."""
+    return folders_hash(ACTEUR_FOLDER, ORGANE_FOLDER, SCRUTINS_ZIP_FILE if SCRUTINS_FROM_ZIP else SCRUTINS_FOLDER)
+
+
+def load_scrutins(store: ScrutinStore) -> bool:
+    """
+    Index the scrutins from SCRUTINS_ZIP_FILE if SCRUTINS_FROM_ZIP is set, from SCRUTINS_FOLDER otherwise.
+    Return False if they are missing.
+    """
+    if SCRUTINS_FROM_ZIP:
+        return store.load_zip(SCRUTINS_ZIP_FILE)
+    return store.load(SCRUTINS_FOLDER)
+
+
+def map_matrix(matrix: VoteMatrix, data_hash: str) -> None:
+    """
+    Serve a vote matrix from VOTE_MATRIX_FILE, shared with the other bot processes.
+
+    The file is only written if it was built from other data, so that every process maps the same file.
+
+    Parameters:
+        matrix (VoteMatrix): The matrix to serve.
+        data_hash (str): The source_hash of the data the matrix was built from.
+    """
+    try:
+        if VoteMatrix.source(VOTE_MATRIX_FILE) != data_hash:
+            matrix.save(VOTE_MATRIX_FILE, data_hash)
+        matrix.open(VOTE_MATRIX_FILE)
+    except (OSError, ValueError) as e:
+        logger.error("Cannot map vote matrix %s, keeping it in memory: %s", VOTE_MATRIX_FILE, e)
+
+
+def database_path(data_hash: str) -> Path:
+    """
+    Return the database file of the generations built from some data, next to DATABASE_FILE.
+    Each generation is written to its own file, so that the previous one is never modified while served.
+
+    Parameters:
+        data_hash (str): The source_hash of the data.
+    """
+    return DATABASE_FILE.with_name(f"{DATABASE_FILE.stem}.{DATABASE_VERSION}.{data_hash[:16]}{DATABASE_FILE.suffix}")
+
+
+def remove_databases(*kept: Database | None) -> None:
+    """
+    Remove the database files next to DATABASE_FILE but the given ones.
+
+    Parameters:
+        *kept (Database | None): The databases still served.
+    """
+    kept_paths: List[Path] = [database.path for database in kept if database is not None]
+    for path in DATABASE_FILE.parent.glob(f"{DATABASE_FILE.stem}.*{DATABASE_FILE.suffix}"):
+        if path in kept_paths:
+            continue
+        for file_path in (path, path.with_name(path.name + "-wal"), path.with_name(path.name + "-shm")):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning("Cannot remove database file %s: %s", file_path, e)
+
+
+def database_outdated(dataset: Dataset, data_hash: str) -> bool:
+    """Return True if a generation is not served as USE_DATABASE requires, or its database file is missing"""
+    if not USE_DATABASE:
+        return dataset.database is not None
+    return (dataset.database is None
+            or dataset.database.path != database_path(data_hash)
+            or not dataset.database.path.exists())
+
+
+def read_scrutins(store: ScrutinStore, numeros: List[str]) -> Dict[str, Scrutin]:
+    """Parse the scrutins with the given numeros, the ones which cannot be read are skipped"""
+    scrutins: Dict[str, Scrutin] = {}
+    for numero in numeros:
+        if (scrutin := store.get(numero)) is not None:
+            scrutins[numero] = scrutin
+    return scrutins
+
+
+def build_dataset(generation: int, data_hash: str) -> Dataset | None:
+    """
+    Parse the data files into a new generation, without touching the one being served.
+    If USE_DATABASE is set, the generation is written to a new database file without building the stores it replaces,
+    it is served from memory if the database cannot be written.
+
+    Parameters:
+        generation (int): The number of the new generation.
+        data_hash (str): The source_hash of the data files.
+
+    Returns:
+        Dataset | None: The new generation, None if a data folder is missing.
+    """
+    people_hash: str = folders_hash(ACTEUR_FOLDER, ORGANE_FOLDER)
+    organes: OrganeRepository = OrganeRepository()
+    scrutins: ScrutinStore = ScrutinStore()
+    if not organes.load(ORGANE_FOLDER):
+        return None
+    deputes: List[Depute] | None = read_deputes(ACTEUR_FOLDER, organes)
+    if deputes is None or not load_scrutins(scrutins):
+        return None
+
+    if USE_DATABASE:
+        path: Path = database_path(data_hash)
+        try:
+            Database.write(path, organes, deputes, scrutins)
+            return Dataset(generation=generation, people_hash=people_hash, scrutins=scrutins, database=Database(path))
+        except (OSError, sqlite3.Error) as e:
+            logger.error("Cannot write database %s, serving from memory: %s", path, e)
+
+    dataset: Dataset = Dataset(generation=generation, people_hash=people_hash, organes=organes, scrutins=scrutins)
+    dataset.deputes.index(deputes)
+    logger.info("Loaded %s députés from %s", len(dataset.deputes), ACTEUR_FOLDER)
+    dataset.matrix.build(dataset.deputes, dataset.scrutins, dataset.history)
+    map_matrix(dataset.matrix, data_hash)
+    dataset.statistics.compute(dataset.matrix)
+    return dataset
+
+
+def update_dataset(previous: Dataset, generation: int, data_hash: str) -> Dataset | None:
+    """
+    Build a new generation from a previous one, parsing only the added or modified scrutin files.
+    A generation served from a database is written to a copy of its database file where only the rows
+    of these scrutins are replaced.
+
+    Parameters:
+        previous (Dataset): The generation being served, left untouched.
+        generation (int): The number of the new generation.
+        data_hash (str): The source_hash of the data files.
+
+    Returns:
+        Dataset | None: The new generation, None if the acteurs or organes were modified, the scrutins are missing,
+            the previous generation is not served as USE_DATABASE requires or its database cannot be copied.
+    """
+    if not previous.generation or previous.people_hash != folders_hash(ACTEUR_FOLDER, ORGANE_FOLDER):
+        return None
+    if (previous.database is not None) != USE_DATABASE:
+        return None
+
+    dataset: Dataset = Dataset(generation=generation, people_hash=previous.people_hash)
+    if not load_scrutins(dataset.scrutins):
+        return None
+    modified, removed = dataset.scrutins.changes(previous.scrutins)
+    scrutins: Dict[str, Scrutin] = read_scrutins(dataset.scrutins, modified)
+
+    if previous.database is not None:
+        path: Path = database_path(data_hash)
+        try:
+            Database.update(previous.database.path, path, scrutins.values(), modified + removed)
+        except (OSError, sqlite3.Error) as e:
+            logger.error("Cannot update database %s, writing it again: %s", path, e)
+            return None
+        logger.info("Applied %s added or modified and %s removed scrutins", len(modified), len(removed))
+        return evolve(dataset, database=Database(path))
+
+    dataset = evolve(dataset, organes=previous.organes, deputes=previous.deputes)
+    # a modified scrutin which cannot be read anymore is dropped, as build_dataset would
+    numeros: List[str] = [numero for numero in dataset.scrutins.numeros() if numero in scrutins or numero not in modified]
+    if not dataset.matrix.update(previous.matrix, dataset.deputes, numeros, scrutins.values()):
+        return None
+    dataset.history.update(previous.history, scrutins.values(), modified + removed)
+    map_matrix(dataset.matrix, data_hash)
+    dataset.statistics.compute(dataset.matrix)
+    logger.info("Applied %s added or modified and %s removed scrutins", len(modified), len(removed))
+    return dataset
+
+
+def save_snapshot(path: Path, dataset: Dataset, data_hash: str) -> None:
+    """
+    Write a generation to a snapshot file.
+
+    Parameters:
+        path (Path): The path of the snapshot file.
+        dataset (Dataset): The generation to write.
+        data_hash (str): The source_hash of the data the generation was built from.
+    """
+    snapshot = {"version": SNAPSHOT_VERSION, "source_hash": data_hash, "dataset": dataset}
+    temp_path: Path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "wb") as f:
+            pickle.dump(snapshot, f, protocol=5)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.error("Cannot write snapshot %s: %s", path, e)
+        return
+    logger.info("Snapshot written to %s", path)
+
+
+def load_snapshot(path: Path, data_hash: str) -> Dataset | None:
+    """
+    Read a generation from a snapshot file.
+
+    Parameters:
+        path (Path): The path of the snapshot file.
+        data_hash (str): The source_hash of the current data.
+
+    Returns:
+        Dataset | None: The generation if the snapshot was valid and up to date.
+    """
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, pickle.UnpicklingError, AttributeError, EOFError, ImportError) as e:
+        logger.warning("Cannot read snapshot %s: %s", path, e)
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("source_hash") != data_hash:
+        logger.info("Snapshot %s is outdated", path)
+        return None
+
+    logger.info("Loaded snapshot %s", path)
+    dataset: Dataset = snapshot["dataset"]
+    return dataset
+
+
+def load_data() -> None:
+    """
+    Build the next generation from the snapshot if it is up to date, from the data folders otherwise,
+    then publish it. The current generation is served until then.
+
+    When only scrutins changed since the current generation, only the added or modified ones are parsed.
+    When a data folder is missing, nothing is published and the current generation is still served.
+    When USE_DATABASE is set, the database file of the previous generation is removed with the next publication.
+    """
+    generation: int = _current.generation + 1
+    data_hash: str = source_hash()
+    dataset: Dataset | None = load_snapshot(SNAPSHOT_FILE, data_hash)
+    if dataset is not None and not database_outdated(dataset, data_hash):
+        dataset = evolve(dataset, generation=generation)
+    else:
+        dataset = update_dataset(_current, generation, data_hash) or build_dataset(generation, data_hash)
+        if dataset is None:
+            logger.warning("Data files are missing, still serving data generation %s", _current.generation)
+            return
+        save_snapshot(SNAPSHOT_FILE, dataset, data_hash)
+    previous: Dataset = _current
+    publish(dataset)
+    if previous.scrutins.directory == SCRUTINS_PREVIOUS_FOLDER:
+        shutil.rmtree(SCRUTINS_PREVIOUS_FOLDER, ignore_errors=True)
+    if USE_DATABASE:
+        # the file of the previous generation is kept for the commands still using it, the older ones are removed
+        remove_databases(dataset.database, previous.database)
+
+
+async def load_data_async() -> None:
+    """Load the next generation asynchronously, see load_data."""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(update_executor, load_data)
@@ -0,0 +1,385 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from collections.abc import Collection, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from common.logger import logger
+from utils.deputeManager import Depute, normalize_name
+from utils.organeManager import Organe
+from utils.scrutinManager import ResultBallot, Scrutin
+from utils.searchManager import NameIndex, edit_distance
+from utils.utils import json_loads
+from utils.voteManager import VoteStatistics, group_positions
+
+# to be incremented whenever the schema changes, see database_path in dataManager
+DATABASE_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS organes (
+    ref TEXT PRIMARY KEY,
+    libelle TEXT NOT NULL,
+    libelle_abrev TEXT NOT NULL,
+    couleur TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS acteurs (
+    ref TEXT PRIMARY KEY,
+    last_name TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name_key TEXT NOT NULL,
+    first_name_key TEXT NOT NULL,
+    dep TEXT NOT NULL,
+    dep_name TEXT NOT NULL,
+    circo TEXT NOT NULL,
+    gp_ref TEXT NOT NULL,
+    gp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS acteurs_name ON acteurs (last_name_key, first_name_key);
+CREATE INDEX IF NOT EXISTS acteurs_circo ON acteurs (dep, circo);
+CREATE TABLE IF NOT EXISTS scrutins (
+    numero TEXT PRIMARY KEY,
+    titre TEXT NOT NULL,
+    date TEXT NOT NULL,
+    sort TEXT NOT NULL,
+    nombre_votants TEXT NOT NULL,
+    non_votants TEXT NOT NULL,
+    pour TEXT NOT NULL,
+    contre TEXT NOT NULL,
+    abstention TEXT NOT NULL,
+    non_votants_volontaires TEXT NOT NULL,
+    groupes TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ballots (
+    acteur_ref TEXT NOT NULL,
+    numero TEXT NOT NULL,
+    ballot INTEGER NOT NULL,
+    PRIMARY KEY (acteur_ref, numero)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ballots_numero ON ballots (numero);
+"""
+
+ACTEUR_COLUMNS = "ref, last_name, first_name, dep, dep_name, circo, gp_ref, gp"
+
+
+def _depute(row: Tuple[str, ...]) -> Depute:
+    """Convert a row selected with ACTEUR_COLUMNS into a Depute dataclass"""
+    ref, last_name, first_name, dep, dep_name, circo, gp_ref, gp = row
+    return Depute(
+        ref=ref,
+        last_name=last_name,
+        first_name=first_name,
+        dep=dep,
+        dep_name=dep_name,
+        circo=circo,
+        gp_ref=gp_ref,
+        gp=gp,
+    )
+
+
+def _scrutin_row(scrutin: Scrutin) -> Tuple[str, ...]:
+    """Convert a Scrutin dataclass into a row of the scrutins table"""
+    return (scrutin.ref, scrutin.titre, scrutin.dateScrutin, scrutin.sort,
+            scrutin.nombreVotants, scrutin.nonVotant, scrutin.pour, scrutin.contre,
+            scrutin.abstention, scrutin.nonVotantsVolontaire, json.dumps(scrutin.groupes))
+
+
+def _refs_by_gp(deputes: Iterable[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """Return the acteur references of the députés by group, from their acteur and group references"""
+    refs_by_gp: Dict[str, List[str]] = {}
+    for ref, gp_ref in dict(deputes).items():
+        refs_by_gp.setdefault(gp_ref, []).append(ref)
+    return refs_by_gp
+
+
+def _ballot_rows(scrutin: Scrutin, refs_by_gp: Dict[str, List[str]]) -> Iterator[Tuple[str, str, int]]:
+    """Yield the acteur reference, scrutin numero and ResultBallot code of every ballot of a scrutin, as VoteMatrix encodes them"""
+    for gp_ref, groupe in scrutin.groupes.items():
+        refs: List[str] | None = refs_by_gp.get(gp_ref)
+        if not refs:
+            continue
+        positions: Dict[str, int] = group_positions(groupe)
+        for ref in refs:
+            yield ref, scrutin.ref, positions.get(ref, ResultBallot.ABSENT.value)
+
+
+def _insert_scrutins(
+        connection: sqlite3.Connection,
+        scrutins: Iterable[Scrutin],
+        refs_by_gp: Dict[str, List[str]]) -> None:
+    """Insert the rows of the scrutins and of their ballots, every scrutin is read once"""
+    for scrutin in scrutins:
+        connection.execute("INSERT OR REPLACE INTO scrutins VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", _scrutin_row(scrutin))
+        connection.executemany("INSERT OR REPLACE INTO ballots VALUES (?, ?, ?)", _ballot_rows(scrutin, refs_by_gp))
+
+
+def _glob_prefix(prefix: str) -> str:
+    """Return a GLOB pattern matching the strings starting with prefix, its wildcards being matched literally"""
+    return re.sub(r"([*?\[])", r"[\1]", prefix) + "*"
+
+
+@contextmanager
+def _new_file(path: Path) -> Iterator[Path]:
+    """
+    Yield a temporary path next to path, moved to path once the block succeeds and removed otherwise.
+    The connections opened to a previous file at path keep reading it.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # unique, several bot processes may write the same database at the same time
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield Path(temp_name)
+        os.replace(temp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_name)
+        raise
+
+
+@contextmanager
+def _transaction(connection: sqlite3.Connection) -> Iterator[None]:
+    """Run the statements of the block in a single write transaction, readers see either the old or the new data"""
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+
+
+class Database:
+    """
+    SQLite copy of a generation, written once by the update job and queried read-only by the handlers.
+
+    Every generation has its own file, never modified once written. Every thread opens its own connection,
+    the database is pickled as its file path.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path: Path = path
+        self._local: threading.local = threading.local()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"_path": self._path}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._path = state["_path"]
+        self._local = threading.local()
+
+    @property
+    def path(self) -> Path:
+        """Return the path of the database file"""
+        return self._path
+
+    @staticmethod
+    def write(
+            path: Path,
+            organes: Iterable[Organe],
+            deputes: Collection[Depute],
+            scrutins: Iterable[Scrutin]) -> None:
+        """
+        Write a new database file, moved to path once complete.
+
+        Parameters:
+            path (Path): The path of the database file, replaced if it exists.
+            organes (Iterable[Organe]): The organes.
+            deputes (Collection[Depute]): The députés.
+            scrutins (Iterable[Scrutin]): The scrutins, read once.
+
+        Raises:
+            OSError: If the file cannot be created.
+            sqlite3.Error: If the database cannot be written.
+        """
+        with _new_file(path) as temp_path:
+            connection: sqlite3.Connection = sqlite3.connect(temp_path, isolation_level=None)
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.execute(f"PRAGMA user_version={DATABASE_VERSION}")
+                connection.executescript(SCHEMA)
+
+                with _transaction(connection):
+                    connection.executemany(
+                        "INSERT INTO organes VALUES (?, ?, ?, ?)",
+                        ((organe.ref, organe.libelle, organe.libelle_abrev, organe.couleur) for organe in organes)
+                    )
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO acteurs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            (depute.ref, depute.last_name, depute.first_name,
+                             normalize_name(depute.last_name), normalize_name(depute.first_name),
+                             depute.dep, depute.dep_name, depute.circo, depute.gp_ref, depute.gp)
+                            for depute in deputes
+                        )
+                    )
+                    _insert_scrutins(connection, scrutins, _refs_by_gp((depute.ref, depute.gp_ref) for depute in deputes))
+            finally:
+                connection.close()
+        logger.info("Database written to %s", path)
+
+    @staticmethod
+    def update(source: Path, path: Path, scrutins: Iterable[Scrutin], numeros: Iterable[str]) -> None:
+        """
+        Write a copy of a database file written by write, replacing the rows of some scrutins,
+        moved to path once complete. The source file is left untouched.
+
+        Parameters:
+            source (Path): The path of the database file to copy.
+            path (Path): The path of the new database file, replaced if it exists.
+            scrutins (Iterable[Scrutin]): The added or modified scrutins, their ballots are the ones of the copied députés.
+            numeros (Iterable[str]): The numeros of the added, modified or removed scrutins, whose rows are deleted.
+
+        Raises:
+            OSError: If the file cannot be created.
+            sqlite3.Error: If the source cannot be read or the database cannot be written.
+        """
+        deleted: List[Tuple[str]] = [(numero,) for numero in numeros]
+        with _new_file(path) as temp_path:
+            source_connection: sqlite3.Connection = sqlite3.connect(f"{source.resolve().as_uri()}?mode=ro", uri=True)
+            connection: sqlite3.Connection = sqlite3.connect(temp_path, isolation_level=None)
+            try:
+                source_connection.backup(connection)
+                refs_by_gp: Dict[str, List[str]] = _refs_by_gp(
+                    connection.execute("SELECT ref, gp_ref FROM acteurs ORDER BY rowid")
+                )
+                with _transaction(connection):
+                    connection.executemany("DELETE FROM ballots WHERE numero = ?", deleted)
+                    connection.executemany("DELETE FROM scrutins WHERE numero = ?", deleted)
+                    _insert_scrutins(connection, scrutins, refs_by_gp)
+            finally:
+                connection.close()
+                source_connection.close()
+        logger.info("Database %s written from %s, %s scrutins replaced or removed", path, source, len(deleted))
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the read-only connection of the calling thread, opened on first use"""
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"{self._path.resolve().as_uri()}?mode=ro", uri=True)
+            self._local.connection = connection
+        return connection
+
+    def find_by_name(self, last_name: str, first_name: str | None = None) -> List[Depute]:
+        """Return the députés matching the given name"""
+        query: str = f"SELECT {ACTEUR_COLUMNS} FROM acteurs WHERE last_name_key = ?"
+        parameters: Tuple[str, ...] = (normalize_name(last_name),)
+        if first_name is not None:
+            query += " AND first_name_key = ?"
+            parameters += (normalize_name(first_name),)
+        # in insertion order, as DeputeRepository.find_by_name
+        query += " ORDER BY rowid"
+        return [_depute(row) for row in self._connection().execute(query, parameters)]
+
+    def search(self, last_name: str, first_name: str | None = None, limit: int = 5) -> List[Depute]:
+        """
+        Return the députés whose name is the closest to the given one, as DeputeRepository.search would.
+        The last names are indexed on each call, it is only used when no député is found.
+        """
+        connection: sqlite3.Connection = self._connection()
+        keys: NameIndex[str] = NameIndex()
+        keys.build((key, key) for key, in connection.execute("SELECT DISTINCT last_name_key FROM acteurs"))
+
+        # every député with its normalized first name, by rank of last name
+        ranked: List[Tuple[Depute, str]] = []
+        for key in keys.search(normalize_name(last_name), limit=len(keys)):
+            if first_name is None and len(ranked) >= limit:
+                break
+            rows = connection.execute(
+                f"SELECT {ACTEUR_COLUMNS}, first_name_key FROM acteurs WHERE last_name_key = ? ORDER BY rowid", (key,)
+            )
+            ranked.extend((_depute(row[:-1]), row[-1]) for row in rows)
+        if first_name is not None:
+            first_name_key: str = normalize_name(first_name)
+            # stable sort, the last name rank is kept between equally distant first names
+            ranked.sort(key=lambda entry: edit_distance(first_name_key, entry[1]))
+        return [depute for depute, _ in ranked[:limit]]
+
+    def complete_name(self, prefix: str, limit: int = 25) -> List[Depute]:
+        """Return the députés whose normalized last name starts with prefix, as DeputeRepository.complete_name would"""
+        rows = self._connection().execute(
+            f"SELECT {ACTEUR_COLUMNS} FROM acteurs WHERE last_name_key GLOB ? "
+            "ORDER BY length(last_name_key), last_name_key, rowid LIMIT ?",
+            (_glob_prefix(normalize_name(prefix)), limit)
+        )
+        return [_depute(row) for row in rows]
+
+    def complete_dep(self, prefix: str, limit: int = 25) -> List[Tuple[str, str]]:
+        """Return the code and name of the departments whose code or normalized name starts with prefix"""
+        name_prefix: str = normalize_name(prefix)
+        # the name of a department is the one of its first député, as in DeputeRepository.index
+        rows = self._connection().execute(
+            "SELECT dep, dep_name, MIN(rowid) FROM acteurs WHERE dep != '' GROUP BY dep ORDER BY dep"
+        )
+        return [
+            (dep, dep_name)
+            for dep, dep_name, _ in rows
+            if dep.startswith(prefix) or (name_prefix and normalize_name(dep_name).startswith(name_prefix))
+        ][:limit]
+
+    def find_by_dep(self, code_dep: str) -> List[Depute]:
+        """Return the députés elected in the given administrative division"""
+        rows = self._connection().execute(
+            f"SELECT {ACTEUR_COLUMNS} FROM acteurs WHERE dep = ? ORDER BY rowid", (code_dep,)
+        )
+        return [_depute(row) for row in rows]
+
+    def find_by_circo(self, code_dep: str, code_circo: str) -> Depute | None:
+        """Return the député elected in the given admin and sub-admin division"""
+        row = self._connection().execute(
+            f"SELECT {ACTEUR_COLUMNS} FROM acteurs WHERE dep = ? AND circo = ?", (code_dep, code_circo)
+        ).fetchone()
+        return _depute(row) if row else None
+
+    def scrutin(self, numero: str) -> Scrutin | None:
+        """Return the scrutin with the given numero"""
+        row = self._connection().execute("SELECT * FROM scrutins WHERE numero = ?", (numero,)).fetchone()
+        if row is None:
+            return None
+        ref, titre, date, sort, nombre_votants, non_votants, pour, contre, abstention, volontaires, groupes = row
+        return Scrutin(
+            ref=ref,
+            titre=titre,
+            dateScrutin=date,
+            sort=sort,
+            nombreVotants=nombre_votants,
+            nonVotant=non_votants,
+            pour=pour,
+            contre=contre,
+            abstention=abstention,
+            nonVotantsVolontaire=volontaires,
+            groupes=json_loads(groupes),
+        )
+
+    def complete(self, prefix: str, limit: int = 25) -> List[str]:
+        """Return the scrutin numeros starting with prefix, most recent first, as ScrutinStore.complete would"""
+        rows = self._connection().execute(
+            "SELECT numero FROM scrutins WHERE numero GLOB ? ORDER BY length(numero) DESC, numero DESC LIMIT ?",
+            (_glob_prefix(prefix), limit)
+        )
+        return [numero for numero, in rows]
+
+    def result(self, ref: str, numero: str) -> ResultBallot | None:
+        """Return the ballot of a député for a scrutin, as VoteMatrix.result would"""
+        row = self._connection().execute(
+            "SELECT ballot FROM ballots WHERE acteur_ref = ? AND numero = ?", (ref, numero)
+        ).fetchone()
+        return ResultBallot(row[0]) if row else None
+
+    def statistics(self, ref: str) -> Dict[str, int]:
+        """Return the vote counters of a député, as VoteStatistics.get would"""
+        counts: Dict[int, int] = dict(self._connection().execute(
+            "SELECT ballot, COUNT(*) FROM ballots WHERE acteur_ref = ? GROUP BY ballot", (ref,)
+        ))
+        return {result.name.lower(): counts.get(result.value, 0) for result in VoteStatistics.KEYS}
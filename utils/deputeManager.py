@@ -3,8 +3,10 @@
 # This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
 from __future__ import annotations
 
-import json
 import re
+from collections.abc import Iterable, Iterator
+from os import PathLike
+from typing import Dict, List, Tuple, TYPE_CHECKING
 
 from attrs import define
 from typing_extensions import Self
@@ -12,9 +14,20 @@ from unidecode import unidecode
 
 from common.config import ORGANE_FOLDER
 from common.logger import logger
+from utils.searchManager import NameIndex, edit_distance
+from utils.utils import read_files_from_directory, read_json_file
+
+if TYPE_CHECKING:
+    from utils.organeManager import OrganeRepository
 
 ELECTION = "\u00e9lections g\u00e9n\u00e9rales"
 
+
+def normalize_name(name: str) -> str:
+    """Normalize a name to compare it regardless of case, accents and punctuation"""
+    return re.sub(r'[^a-z]', '', unidecode(name).lower())
+
+
 @define(kw_only=True)
 class Depute:
     """Dataclass for storing member of parliament's data"""
@@ -29,8 +42,11 @@ class Depute:
     gp: str
 
     @classmethod
-    def from_json(cls, data: dict) -> Self:
-        """Convert json data into a Depute dataclass"""
+    def from_json(cls, data: dict, organes: OrganeRepository | None = None) -> Self:
+        """
+        Convert json data into a Depute dataclass.
+        The group libellé is taken from organes when given, otherwise from the organe file.
+        """
 
         ref: str = data["acteur"]["uid"]["#text"]
         last_name: str = data["acteur"]["etatCivil"]["ident"]["nom"]
@@ -60,11 +76,16 @@ class Depute:
             dep_name = elec["lieu"]["departement"]
             circo = elec["lieu"]["numCirco"]
 
-        if gp_ref:
+        if gp_ref and organes is not None:
+            if organe := organes.get(gp_ref):
+                gp = organe.libelle
+            else:
+                logger.warning("Cannot find the organe %s for %s", gp_ref, ref)
+                gp_ref = ""
+        elif gp_ref:
             organe_file = ORGANE_FOLDER / f"{gp_ref}.json"
             try:
-                with open(organe_file, "r", encoding="utf-8") as g:
-                    gp: str = json.load(g)["organe"]["libelle"]
+                gp = read_json_file(organe_file)["organe"]["libelle"]
             except OSError:
                 logger.warning("Cannot find the organe file %s for %s", gp_ref, ref)
                 gp = ""
@@ -86,8 +107,6 @@ class Depute:
     @classmethod
     def from_json_by_name(cls, data: dict, last_name: str, first_name: str | None = None) -> Self | None:
         """Return a Depute dataclass if input json matches the given name"""
-        def normalize_name(name: str) -> str:
-            return re.sub(r'[^a-z]', '', unidecode(name).lower())
         data_last_name: str = data["acteur"]["etatCivil"]["ident"]["nom"]
         data_first_name: str = data["acteur"]["etatCivil"]["ident"]["prenom"]
         if normalize_name(last_name) == normalize_name(data_last_name):
@@ -155,3 +174,138 @@ class Depute:
         return f"{self.first_name} {self.last_name} député élu.e \
 de la circonscription {self.dep}-{self.circo} ({self.dep_name}) \
 appartenant au groupe {self.gp}."
+
+
+def read_deputes(directory: PathLike[str], organes: OrganeRepository | None = None) -> List[Depute] | None:
+    """
+    Parse every acteur file of a directory, skipping the invalid ones.
+
+    Parameters:
+        directory (PathLike): The directory containing the acteur files.
+        organes (OrganeRepository | None): The organes used to name the groups.
+
+    Returns:
+        List[Depute] | None: The députés, None if the directory does not exist.
+    """
+    deputes: List[Depute] = []
+    try:
+        for data in read_files_from_directory(directory):
+            try:
+                deputes.append(Depute.from_json(data, organes))
+            except (KeyError, TypeError) as e:
+                logger.error("Invalid acteur data: %s", e)
+    except FileNotFoundError:
+        logger.error("%s does not exist, no député loaded.", directory)
+        return None
+    return deputes
+
+
+class DeputeRepository:
+    """In-memory index of every member of parliament, rebuilt after each update"""
+
+    def __init__(self) -> None:
+        self._by_ref: Dict[str, Depute] = {}
+        self._first_names: Dict[str, str] = {}
+        self._names: NameIndex[Depute] = NameIndex()
+        self._by_dep: Dict[str, List[Depute]] = {}
+        self._by_circo: Dict[Tuple[str, str], Depute] = {}
+        self._departments: List[Tuple[str, str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._by_ref)
+
+    def __iter__(self) -> Iterator[Depute]:
+        return iter(list(self._by_ref.values()))
+
+    def load(self, directory: PathLike[str], organes: OrganeRepository | None = None) -> bool:
+        """
+        Parse every acteur file of a directory and index the resulting députés.
+
+        Parameters:
+            directory (PathLike): The directory containing the acteur files.
+            organes (OrganeRepository | None): The organes used to name the groups.
+
+        Returns:
+            bool: False if the directory does not exist, the repository is then left untouched.
+        """
+        deputes: List[Depute] | None = read_deputes(directory, organes)
+        if deputes is None:
+            return False
+        self.index(deputes)
+        logger.info("Loaded %s députés from %s", len(self), directory)
+        return True
+
+    def index(self, deputes: Iterable[Depute]) -> None:
+        """
+        Replace the content of the repository with the given députés.
+
+        Parameters:
+            deputes (Iterable[Depute]): The députés to index.
+        """
+        by_ref: Dict[str, Depute] = {}
+        first_names: Dict[str, str] = {}
+        names: NameIndex[Depute] = NameIndex()
+        by_dep: Dict[str, List[Depute]] = {}
+        by_circo: Dict[Tuple[str, str], Depute] = {}
+        for depute in deputes:
+            by_ref[depute.ref] = depute
+            first_names[depute.ref] = normalize_name(depute.first_name)
+            if depute.dep:
+                by_dep.setdefault(depute.dep, []).append(depute)
+                by_circo[(depute.dep, depute.circo)] = depute
+        names.build((normalize_name(depute.last_name), depute) for depute in by_ref.values())
+
+        departments: List[Tuple[str, str, str]] = sorted(
+            (dep, deputes[0].dep_name, normalize_name(deputes[0].dep_name))
+            for dep, deputes in by_dep.items()
+        )
+
+        # swap every index at once so readers never see a half-built repository
+        self._by_ref, self._first_names, self._names = by_ref, first_names, names
+        self._by_dep, self._by_circo, self._departments = by_dep, by_circo, departments
+
+    def get(self, ref: str) -> Depute | None:
+        """Return the député with the given acteur reference"""
+        return self._by_ref.get(ref)
+
+    def find_by_name(self, last_name: str, first_name: str | None = None) -> List[Depute]:
+        """Return the députés matching the given name"""
+        deputes: List[Depute] = self._names.exact(normalize_name(last_name))
+        if first_name is None:
+            return deputes
+        first_name = normalize_name(first_name)
+        return [depute for depute in deputes if self._first_names[depute.ref] == first_name]
+
+    def search(self, last_name: str, first_name: str | None = None, limit: int = 5) -> List[Depute]:
+        """
+        Return the députés whose name is the closest to the given one, tolerating typos.
+        Exact last names come first, then last names starting with the query, then close last names.
+        When given, the first name is used to rank the députés sharing a last name.
+        """
+        deputes: List[Depute] = self._names.search(normalize_name(last_name), limit=len(self))
+        if first_name is not None:
+            first_name = normalize_name(first_name)
+            # stable sort, the last name rank is kept between equally distant first names
+            deputes.sort(key=lambda depute: edit_distance(first_name, self._first_names[depute.ref]))
+        return deputes[:limit]
+
+    def complete_name(self, prefix: str, limit: int = 25) -> List[Depute]:
+        """Return the députés whose normalized last name starts with prefix"""
+        return self._names.prefix(normalize_name(prefix), limit)
+
+    def complete_dep(self, prefix: str, limit: int = 25) -> List[Tuple[str, str]]:
+        """Return the code and name of the departments whose code or normalized name starts with prefix"""
+        name_prefix: str = normalize_name(prefix)
+        return [
+            (dep, dep_name)
+            for dep, dep_name, normalized in self._departments
+            if dep.startswith(prefix) or (name_prefix and normalized.startswith(name_prefix))
+        ][:limit]
+
+    def find_by_dep(self, code_dep: str) -> List[Depute]:
+        """Return the députés elected in the given administrative division"""
+        return list(self._by_dep.get(code_dep, []))
+
+    def find_by_circo(self, code_dep: str, code_circo: str) -> Depute | None:
+        """Return the député elected in the given admin and sub-admin division"""
+        return self._by_circo.get((code_dep, code_circo))
@@ -0,0 +1,81 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+from __future__ import annotations
+
+from collections.abc import Iterator
+from os import PathLike
+from typing import Any, Dict
+
+from attrs import define
+from typing_extensions import Self
+
+from common.logger import logger
+from utils.utils import read_files_from_directory
+
+
+@define(kw_only=True)
+class Organe:
+    """Dataclass for storing an organe (parliamentary group, commission...)"""
+
+    ref: str
+    libelle: str
+    libelle_abrev: str
+    couleur: str
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> Self:
+        """Convert json data into an Organe dataclass"""
+        organe: Dict[str, Any] = data["organe"]
+        return cls(
+            ref=organe["uid"],
+            libelle=organe["libelle"],
+            libelle_abrev=organe.get("libelleAbrev") or "",
+            couleur=organe.get("couleurAssociee") or "",
+        )
+
+
+class OrganeRepository:
+    """In-memory cache of the organes, reloaded after each update"""
+
+    def __init__(self) -> None:
+        self._by_ref: Dict[str, Organe] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_ref)
+
+    def __contains__(self, ref: str) -> bool:
+        return ref in self._by_ref
+
+    def __iter__(self) -> Iterator[Organe]:
+        return iter(list(self._by_ref.values()))
+
+    def load(self, directory: PathLike[str]) -> bool:
+        """
+        Parse every organe file of a directory.
+
+        Parameters:
+            directory (PathLike): The directory containing the organe files.
+
+        Returns:
+            bool: False if the directory does not exist, the repository is then left untouched.
+        """
+        by_ref: Dict[str, Organe] = {}
+        try:
+            for data in read_files_from_directory(directory):
+                try:
+                    organe: Organe = Organe.from_json(data)
+                except (KeyError, TypeError) as e:
+                    logger.error("Invalid organe data: %s", e)
+                    continue
+                by_ref[organe.ref] = organe
+        except FileNotFoundError:
+            logger.error("%s does not exist, no organe loaded.", directory)
+            return False
+        self._by_ref = by_ref
+        logger.info("Loaded %s organes from %s", len(self), directory)
+        return True
+
+    def get(self, ref: str) -> Organe | None:
+        """Return the organe with the given reference"""
+        return self._by_ref.get(ref)
@@ -0,0 +1,107 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Tuple
+
+import discord
+from attrs import define, field
+from discord.ext.commands import Context
+
+from common.config import PAGINATOR_TIMEOUT_SECOND
+
+
+def _to_tuple(items: Iterable[Any]) -> Tuple[Any, ...]:
+    """Convert the items of Pages into a tuple, so that they are never modified"""
+    return tuple(items)
+
+
+@define(kw_only=True, frozen=True)
+class Pages:
+    """
+    Result of a handler split into pages, a page is only rendered when it is displayed.
+    It is never modified, so it can be cached and browsed from several messages at once.
+    """
+    items: Tuple[Any, ...] = field(converter=_to_tuple)
+    per_page: int
+    # renders the items of a page into an embed
+    render: Callable[[Tuple[Any, ...]], discord.Embed]
+
+    @property
+    def count(self) -> int:
+        """Return the number of pages"""
+        return max(1, -(-len(self.items) // self.per_page))
+
+    def page(self, index: int) -> discord.Embed:
+        """
+        Render a page.
+
+        Parameters:
+            index (int): The index of the page, from 0.
+
+        Returns:
+            discord.Embed: The embed of the page, its footer holds the page number.
+        """
+        start: int = index * self.per_page
+        embed: discord.Embed = self.render(self.items[start:start + self.per_page])
+        return embed.set_footer(text=f"Page {index + 1}/{self.count}")
+
+
+class Paginator(discord.ui.View):
+    """Buttons browsing Pages in a message, disabled after PAGINATOR_TIMEOUT_SECOND seconds without use"""
+
+    def __init__(self, pages: Pages) -> None:
+        super().__init__(timeout=PAGINATOR_TIMEOUT_SECOND or None)
+        self.pages: Pages = pages
+        self.index: int = 0
+        # the message holding the buttons, edited on timeout
+        self.message: discord.Message | None = None
+        self._update_buttons()
+
+    def _update_buttons(self) -> None:
+        """Disable the buttons leading out of the pages"""
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = self.index >= self.pages.count - 1
+
+    async def _show(self, interaction: discord.Interaction, index: int) -> None:
+        """Display a page in the message of the interaction"""
+        self.index = min(max(index, 0), self.pages.count - 1)
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages.page(self.index), view=self)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, _button: discord.ui.Button[Paginator]) -> None:
+        """Display the previous page"""
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, _button: discord.ui.Button[Paginator]) -> None:
+        """Display the next page"""
+        await self._show(interaction, self.index + 1)
+
+    async def on_timeout(self) -> None:
+        """Disable every button, the current page stays displayed"""
+        self.previous_page.disabled = True
+        self.next_page.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                # the message was deleted meanwhile
+                pass
+
+
+async def send_pages(context: Context[Any], pages: Pages) -> None:
+    """
+    Send the first page to the context, with buttons to browse the others if any.
+
+    Parameters:
+        context (Context): The context in which to send the pages.
+        pages (Pages): The pages to send.
+    """
+    if pages.count == 1:
+        await context.send(embed=pages.page(0))
+        return
+    paginator: Paginator = Paginator(pages)
+    paginator.message = await context.send(embed=pages.page(0), view=paginator)
@@ -3,12 +3,26 @@
 # This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
 from __future__ import annotations
 
+import json
+import os
+import re
+import threading
+import zipfile
+from bisect import bisect_left
 from enum import Enum
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Dict, IO, List, Tuple
 from typing_extensions import Self
 
 from attrs import define
 
+from common.logger import logger
 from utils.deputeManager import Depute
+from utils.utils import json_loads, read_json_file
+
+# scrutin files are named after their uid, e.g. VTANR5L17V1234.json for the scrutin 1234
+SCRUTIN_FILE_PATTERN = re.compile(r"V(\d+)\.json$")
 
 
 # class syntax
@@ -169,3 +183,210 @@ class Scrutin:
 
     def depute_vote(self, depute: Depute) -> ResultBallot:
         return self.result(depute)
+
+
+class ScrutinStore:
+    """Index of the scrutin files by numero, in a folder or in a zip file, rebuilt after each update"""
+
+    def __init__(self) -> None:
+        self._files: Dict[str, Path] = {}
+        self._sorted: List[str] = []
+        # size and modification time (or CRC-32 in a zip file) of every file,
+        # to find the scrutins modified between two loads
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        # when loaded from a zip file, _files holds the member names
+        self._archive: Path | None = None
+        self._zip: zipfile.ZipFile | None = None
+        # held to open a file, so that the store can be moved to another directory meanwhile, see move
+        self._lock: threading.Lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = dict(self.__dict__)
+        # the zip file is opened again on first read
+        state["_zip"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, numero: str) -> bool:
+        return numero in self._files
+
+    def __iter__(self) -> Iterator[Scrutin]:
+        for numero in self.numeros():
+            if scrutin := self.get(numero):
+                yield scrutin
+
+    def numeros(self) -> List[str]:
+        """Return the numero of every indexed scrutin, in chronological order"""
+        return sorted(self._files, key=lambda numero: (len(numero), numero))
+
+    def complete(self, prefix: str, limit: int = 25) -> List[str]:
+        """Return the numeros starting with prefix, most recent first"""
+        numeros: List[str] = []
+        for i in range(bisect_left(self._sorted, prefix), len(self._sorted)):
+            if not self._sorted[i].startswith(prefix):
+                break
+            numeros.append(self._sorted[i])
+        numeros.sort(key=lambda numero: (len(numero), numero), reverse=True)
+        return numeros[:limit]
+
+    def load(self, directory: Path) -> bool:
+        """
+        Map every scrutin file of a directory to its numero.
+        The numero is read from the file name, the file is only parsed when its name does not match.
+
+        Parameters:
+            directory (Path): The directory containing the scrutin files.
+
+        Returns:
+            bool: False if the directory does not exist, the store is then left untouched.
+        """
+        files: Dict[str, Path] = {}
+        stats: Dict[str, Tuple[int, int]] = {}
+        try:
+            entries: List[os.DirEntry[str]] = list(os.scandir(directory))
+        except FileNotFoundError:
+            logger.error("%s does not exist, no scrutin loaded.", directory)
+            return False
+
+        for entry in entries:
+            file_path: Path = directory / entry.name
+            if match := SCRUTIN_FILE_PATTERN.search(entry.name):
+                numero: str = match.group(1)
+            else:
+                try:
+                    numero = read_json_file(file_path)["scrutin"]["numero"]
+                except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+                    logger.error("Error reading %s: %s", entry.name, e)
+                    continue
+            try:
+                stat: os.stat_result = entry.stat()
+            except OSError as e:
+                logger.error("Error reading %s: %s", entry.name, e)
+                continue
+            files[numero] = file_path
+            stats[numero] = (stat.st_size, stat.st_mtime_ns)
+
+        self._files, self._sorted, self._stats = files, sorted(files), stats
+        self._archive, self._zip = None, None
+        logger.info("Indexed %s scrutins from %s", len(self), directory)
+        return True
+
+    def load_zip(self, path: Path, member_folder: str = "json") -> bool:
+        """
+        Map every scrutin file of a folder of a zip file to its numero, without extracting them.
+        The scrutins are then read from the zip file, which must not be modified but can be replaced.
+
+        Parameters:
+            path (Path): The path of the zip file.
+            member_folder (str): The folder of the zip file containing the scrutin files.
+
+        Returns:
+            bool: False if the zip file does not exist or is invalid, the store is then left untouched.
+        """
+        prefix: str = member_folder.rstrip("/") + "/"
+        files: Dict[str, Path] = {}
+        stats: Dict[str, Tuple[int, int]] = {}
+        try:
+            archive: zipfile.ZipFile = zipfile.ZipFile(path, "r")
+        except FileNotFoundError:
+            logger.error("%s does not exist, no scrutin loaded.", path)
+            return False
+        except zipfile.BadZipFile:
+            logger.error("%s is not a correct Zip File, no scrutin loaded.", path)
+            return False
+
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.startswith(prefix):
+                continue
+            if match := SCRUTIN_FILE_PATTERN.search(info.filename):
+                numero: str = match.group(1)
+            else:
+                try:
+                    numero = json_loads(archive.read(info))["scrutin"]["numero"]
+                except (OSError, zipfile.BadZipFile, json.JSONDecodeError, KeyError, TypeError) as e:
+                    logger.error("Error reading %s: %s", info.filename, e)
+                    continue
+            files[numero] = Path(info.filename)
+            stats[numero] = (info.file_size, info.CRC)
+
+        self._files, self._sorted, self._stats = files, sorted(files), stats
+        self._archive, self._zip = path, archive
+        logger.info("Indexed %s scrutins from %s", len(self), path)
+        return True
+
+    @property
+    def directory(self) -> Path | None:
+        """Return the directory the scrutin files are read from, None if loaded from a zip file or empty"""
+        if self._archive is not None or not self._files:
+            return None
+        return next(iter(self._files.values())).parent
+
+    def move(self, directory: Path) -> None:
+        """
+        Read the scrutin files from another directory holding the same files,
+        so that the directory they were loaded from can be updated while the store is still used.
+
+        Parameters:
+            directory (Path): The directory holding a copy of the scrutin files.
+        """
+        files: Dict[str, Path] = {numero: directory / file_path.name for numero, file_path in self._files.items()}
+        with self._lock:
+            self._files = files
+
+    def _read(self, numero: str) -> Dict[str, Any]:
+        """Return the JSON data of the file of a scrutin, from the zip file if the store was loaded from one"""
+        with self._lock:
+            file_path: Path = self._files[numero]
+            file: IO[bytes]
+            if self._archive is None:
+                # opened under the lock, the file is read whole even if the store is moved meanwhile
+                file = open(file_path, "rb")
+            else:
+                if self._zip is None:
+                    self._zip = zipfile.ZipFile(self._archive, "r")
+                # only the handle is taken under the lock, the member is decompressed by the caller thread,
+                # the readers of a zip file only share the reads of the compressed bytes
+                file = self._zip.open(file_path.as_posix())
+        with file:
+            data: Dict[str, Any] = json_loads(file.read())
+        return data
+
+    def changes(self, previous: ScrutinStore) -> Tuple[List[str], List[str]]:
+        """
+        Compare the files with the ones of a previous load.
+
+        Parameters:
+            previous (ScrutinStore): The store of the previous load.
+
+        Returns:
+            Tuple[List[str], List[str]]: The numeros of the added or modified scrutins, in chronological order,
+            and the numeros of the removed scrutins.
+        """
+        modified: List[str] = [
+            numero for numero in self.numeros() if previous._stats.get(numero) != self._stats.get(numero)
+        ]
+        removed: List[str] = [numero for numero in previous._files if numero not in self._files]
+        return modified, removed
+
+    def get(self, numero: str) -> Scrutin | None:
+        """
+        Return the scrutin with the given numero, reading only its file.
+
+        Parameters:
+            numero (str): The numero of the scrutin.
+        """
+        file_path: Path | None = self._files.get(numero)
+        if file_path is None:
+            return None
+        try:
+            return Scrutin.from_json_by_ref(self._read(numero), numero)
+        except (OSError, zipfile.BadZipFile, json.JSONDecodeError, KeyError, TypeError) as e:
+            logger.error("Error reading %s: %s", file_path, e)
+            return None
@@ -0,0 +1,115 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Dict, Generic, List, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def trigrams(key: str) -> Set[str]:
+    """Return the trigrams of a key, padded so that short keys still have some"""
+    padded: str = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Return the Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous: List[int] = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current: List[int] = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def max_typos(key: str) -> int:
+    """Return the number of typos tolerated for a key of this length"""
+    return max(1, len(key) // 4)
+
+
+class NameIndex(Generic[T]):
+    """Index of values by normalized key, with exact, prefix and typo-tolerant lookups"""
+
+    def __init__(self) -> None:
+        self._values: Dict[str, List[T]] = {}
+        self._keys: List[str] = []
+        self._trigrams: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def build(self, entries: Iterable[Tuple[str, T]]) -> None:
+        """
+        Replace the content of the index.
+
+        Parameters:
+            entries (Iterable[Tuple[str, T]]): Normalized keys and their values.
+        """
+        values: Dict[str, List[T]] = {}
+        for key, value in entries:
+            values.setdefault(key, []).append(value)
+
+        by_trigram: Dict[str, List[str]] = {}
+        for key in values:
+            for trigram in trigrams(key):
+                by_trigram.setdefault(trigram, []).append(key)
+
+        self._values, self._keys, self._trigrams = values, sorted(values), by_trigram
+
+    def exact(self, key: str) -> List[T]:
+        """Return the values of a key"""
+        return list(self._values.get(key, []))
+
+    def prefix_keys(self, prefix: str, limit: int | None = None) -> List[str]:
+        """Return the keys starting with prefix, in alphabetical order"""
+        keys: List[str] = []
+        for i in range(bisect_left(self._keys, prefix), len(self._keys)):
+            if not self._keys[i].startswith(prefix) or (limit is not None and len(keys) >= limit):
+                break
+            keys.append(self._keys[i])
+        return keys
+
+    def prefix(self, prefix: str, limit: int | None = None) -> List[T]:
+        """Return the values whose key starts with prefix, shortest keys first"""
+        keys: List[str] = sorted(self.prefix_keys(prefix), key=len)
+        values: List[T] = [value for key in keys for value in self._values[key]]
+        return values if limit is None else values[:limit]
+
+    def fuzzy_keys(self, query: str) -> List[Tuple[int, str]]:
+        """Return the keys within max_typos edits of query with their distance, closest first"""
+        query_trigrams: Set[str] = trigrams(query)
+        shared: Dict[str, int] = {}
+        for trigram in query_trigrams:
+            for key in self._trigrams.get(trigram, []):
+                shared[key] = shared.get(key, 0) + 1
+
+        ranked: List[Tuple[int, float, str]] = []
+        for key, count in shared.items():
+            distance: int = edit_distance(query, key)
+            if distance <= max_typos(query):
+                similarity: float = count / len(query_trigrams | trigrams(key))
+                ranked.append((distance, -similarity, key))
+        ranked.sort()
+        return [(distance, key) for distance, _, key in ranked]
+
+    def search(self, query: str, limit: int = 5) -> List[T]:
+        """Return ranked candidates for query: exact match, then prefix matches, then close keys"""
+        keys: List[str] = []
+        if query in self._values:
+            keys.append(query)
+        keys.extend(key for key in sorted(self.prefix_keys(query), key=len) if key not in keys)
+        keys.extend(key for _, key in self.fuzzy_keys(query) if key not in keys)
+
+        values: List[T] = [value for key in keys for value in self._values[key]]
+        return values[:limit]
@@ -2,14 +2,53 @@
 # See LICENSE file for extended copyright information.
 # This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
 
+import asyncio
+import functools
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from os import PathLike
-from typing import Callable, Tuple, Generator
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Generator, Union
 
+import discord
 from discord.ext.commands import Context
+from common.config import HANDLER_TIMEOUT_SECOND, HANDLER_WORKERS, UPDATE_WORKERS
 from common.logger import logger
+from handlers.commonHandler import error_handler
+from utils.cacheManager import MISSING, CacheKey, response_cache
+from utils.paginatorManager import Pages, send_pages
+
+json_loads: Callable[[Union[bytes, str]], Any]
+try:
+    # optional faster decoder, its errors subclass json.JSONDecodeError
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# shared by every command so that a slow handler never blocks the event loop
+handler_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=HANDLER_WORKERS,
+    thread_name_prefix="handler",
+)
+
+# shared by the updates to download, unzip and parse the data files in parallel
+update_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=UPDATE_WORKERS,
+    thread_name_prefix="update",
+)
+
+T = TypeVar("T")
+
+# result of a handler, see send_embeds
+Response = Union[discord.Embed, List[discord.Embed], Pages]
+
+# Discord limits of a message
+EMBEDS_PER_MESSAGE = 10
+EMBED_CHARACTERS_PER_MESSAGE = 6000
+
+# handler runs in progress by cache key, awaited by the identical commands issued meanwhile
+_in_flight: Dict[CacheKey, "asyncio.Future[Any]"] = {}
 
 
 def compute_time_for_update(update_hour: str) -> Tuple[datetime, float]:
@@ -32,6 +71,25 @@ def compute_time_for_update(update_hour: str) -> Tuple[datetime, float]:
     return target_time, (target_time - now).total_seconds()
 
 
+def read_json_file(file_path: Union[str, "PathLike[str]"]) -> Dict[str, Any]:
+    """
+    Reads and returns the JSON data of a file.
+
+    Parameters:
+        file_path PathLike: The path of the file to be read.
+
+    Returns:
+        Dict[str, Any]: The parsed JSON data.
+
+    Raises:
+        OSError: If the file cannot be read.
+        json.JSONDecodeError: If the file is not valid JSON.
+    """
+    with open(file_path, "rb") as f:
+        data: Dict[str, Any] = json_loads(f.read())
+    return data
+
+
 def read_files_from_directory(directory: PathLike) -> Generator[dict, None, None]:
     """
     Reads and yields the JSON data of each file in a given directory.
@@ -44,27 +102,139 @@ def read_files_from_directory(directory: PathLike) -> Generator[dict, None, None
         dict: The parsed JSON data from each file.
     """
     for file in os.listdir(directory):
-        file_path = directory / file
         file_path = directory / file
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                yield json.load(f)
+            yield read_json_file(file_path)
         except (OSError, json.JSONDecodeError) as e:
             logger.error("Error reading %s: %s", file, e)
             continue
 
 
-async def send_embeds(context: Context, handler : Callable):
+def batch_embeds(embeds: List[discord.Embed]) -> List[List[discord.Embed]]:
+    """
+    Split embeds into as few messages as possible, in order, within the Discord limits
+    of EMBEDS_PER_MESSAGE embeds and EMBED_CHARACTERS_PER_MESSAGE characters per message.
+
+    Parameters:
+        embeds (List[discord.Embed]): The embeds to send.
+
+    Returns:
+        List[List[discord.Embed]]: The embeds of each message, an embed over the character limit is sent alone.
+    """
+    batches: List[List[discord.Embed]] = []
+    size: int = 0
+    for embed in embeds:
+        if batches and len(batches[-1]) < EMBEDS_PER_MESSAGE and size + len(embed) <= EMBED_CHARACTERS_PER_MESSAGE:
+            batches[-1].append(embed)
+            size += len(embed)
+        else:
+            batches.append([embed])
+            size = len(embed)
+    return batches
+
+
+async def run_handler(handler: Callable[[], T]) -> T:
+    """
+    Run a handler in the handler thread pool and await its result from the event loop.
+
+    Parameters:
+        handler: A function without arguments.
+
+    Raises:
+        asyncio.TimeoutError: If the handler takes more than HANDLER_TIMEOUT_SECOND seconds.
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(
+        loop.run_in_executor(handler_executor, handler),
+        timeout=HANDLER_TIMEOUT_SECOND or None
+    )
+
+
+async def run_handler_once(key: CacheKey, handler: Callable[[], Any]) -> Any:
+    """
+    Run a handler with run_handler, unless an identical command is already running it:
+    then wait for the same result instead of running it again.
+
+    Parameters:
+        key (CacheKey): The command, arguments and data generation of the handler, see ResponseCache.key.
+        handler: A function without arguments.
+
+    Raises:
+        asyncio.TimeoutError: If the handler takes more than HANDLER_TIMEOUT_SECOND seconds.
+    """
+    future: Optional[asyncio.Future[Any]] = _in_flight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(run_handler(handler))
+        _in_flight[key] = future
+
+        def done(_future: "asyncio.Future[Any]") -> None:
+            if _in_flight.get(key) is _future:
+                del _in_flight[key]
+            # retrieved here in case every command awaiting it was cancelled
+            if not _future.cancelled():
+                _future.exception()
+
+        future.add_done_callback(done)
+    # a cancelled command must not cancel the others awaiting the same result
+    return await asyncio.shield(future)
+
+
+async def run_handler_cached(key: CacheKey, handler: Callable[[], Response]) -> Response:
+    """
+    Return the cached result of a handler, running it with run_handler_once if it is not cached.
+
+    Parameters:
+        key (CacheKey): The command, arguments and data generation of the handler, see ResponseCache.key.
+        handler: A function without arguments.
+
+    Raises:
+        asyncio.TimeoutError: If the handler takes more than HANDLER_TIMEOUT_SECOND seconds, nothing is cached then.
+    """
+    response: Response = response_cache.get(key)
+    if response is MISSING:
+        response = await run_handler_once(key, handler)
+        response_cache.put(key, response)
+    return response
+
+
+async def send_embeds(
+        context: Context[Any],
+        handler: Callable[..., Response],
+        *args: Any,
+        cached: bool = False) -> None:
     """
-    Send a list of embeds to the context.
+    Send a list of embeds to the context, batched into as few messages as possible, see batch_embeds,
+    or the first of the pages with buttons to browse the others, see send_pages.
+    The handler is run outside of the event loop, see run_handler.
 
     Parameters:
         context (Context): The context in which to send the embeds.
-        handler: A function that returns a list of embeds or an embed.
+        handler: A function that returns a list of embeds, an embed or pages.
+        *args: The arguments of the handler.
+        cached (bool): If True, the response is cached by command, arguments and data generation,
+            and the identical commands received while the handler runs share its result, see run_handler_cached.
     """
-    embeds_or_embed = handler()
-    if isinstance(embeds_or_embed, list):
-        for embed in embeds_or_embed:
-            await context.send(embed=embed)
-    else:
-        await context.send(embed=embeds_or_embed)
+    call: Callable[[], Response] = functools.partial(handler, *args)
+    response: Response
+    try:
+        if cached and context.command is not None:
+            response = await run_handler_cached(response_cache.key(context.command.qualified_name, args), call)
+        else:
+            response = await run_handler(call)
+    except asyncio.TimeoutError:
+        logger.error("Handler of %s timed out after %s seconds", context.command, HANDLER_TIMEOUT_SECOND)
+        response = error_handler(
+            title="Délai dépassé",
+            description="La commande a pris trop de temps, veuillez réessayer plus tard."
+        )
+    if isinstance(response, Pages):
+        await send_pages(context, response)
+        return
+    if not isinstance(response, list):
+        await context.send(embed=response)
+        return
+    for batch in batch_embeds(response):
+        if len(batch) == 1:
+            await context.send(embed=batch[0])
+        else:
+            await context.send(embeds=batch)
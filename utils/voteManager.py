@@ -0,0 +1,491 @@
+# Copyright (C) 2025 Rémy Cases
+# See LICENSE file for extended copyright information.
+# This file is part of MyDeputeFr project from https://github.com/remyCases/MyDeputeFr.
+from __future__ import annotations
+
+import json
+import os
+import struct
+import tempfile
+from array import array
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from common.logger import logger
+from utils.deputeManager import Depute
+from utils.scrutinManager import ResultBallot, Scrutin
+
+# the group of the député did not take part to the scrutin, Scrutin.result returns None
+NO_BALLOT: int = -1
+
+# from the lowest to the highest priority, mirroring Scrutin.result
+POSITIONS: Tuple[Tuple[str, ResultBallot], ...] = (
+    ("abstention", ResultBallot.ABSTENTION),
+    ("contre", ResultBallot.CONTRE),
+    ("pour", ResultBallot.POUR),
+    ("nonVotant", ResultBallot.NONVOTANT),
+)
+
+EXPRESSED: Tuple[int, ...] = (
+    ResultBallot.POUR.value,
+    ResultBallot.CONTRE.value,
+    ResultBallot.ABSTENTION.value,
+)
+
+# header of a matrix file: magic, version, source hash of the data it was built from,
+# rows, columns, size of the JSON index following the header
+MATRIX_MAGIC: bytes = b"MDVM"
+MATRIX_VERSION: int = 2
+MATRIX_HEADER: struct.Struct = struct.Struct("<4sI64sIII")
+# the ballots start on a page boundary so that every process maps the same pages
+MATRIX_ALIGNMENT: int = 4096
+
+
+def group_positions(groupe: Dict[str, List[str]]) -> Dict[str, int]:
+    """
+    Return the ResultBallot code of every député listed in the vote of a group of a scrutin,
+    a member of the group not listed is absent.
+
+    Parameters:
+        groupe (Dict[str, List[str]]): The acteur references by position, see Scrutin.groupes.
+
+    Returns:
+        Dict[str, int]: The code by acteur reference, the highest priority position wins as in Scrutin.result.
+    """
+    positions: Dict[str, int] = {}
+    for position, result in POSITIONS:
+        positions.update(dict.fromkeys(groupe[position], result.value))
+    return positions
+
+
+class VoteMatrix:
+    """Ballot of every député for every scrutin, stored as ResultBallot codes in a député × scrutin int8 array"""
+
+    def __init__(self) -> None:
+        self._rows: Dict[str, int] = {}
+        self._columns: Dict[str, int] = {}
+        self._ballots: np.ndarray = np.full((0, 0), NO_BALLOT, dtype=np.int8)
+        self._path: Path | None = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = dict(self.__dict__)
+        if self._path is not None:
+            # a mapped matrix is pickled as its file path and remapped on load
+            del state["_rows"], state["_columns"], state["_ballots"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self._path is not None:
+            self.open(self._path)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Return the number of députés and scrutins of the matrix"""
+        return self._ballots.shape
+
+    @property
+    def refs(self) -> List[str]:
+        """Return the acteur reference of every row"""
+        return list(self._rows)
+
+    @property
+    def numeros(self) -> List[str]:
+        """Return the scrutin numero of every column"""
+        return list(self._columns)
+
+    @staticmethod
+    def _index_rows(deputes: Iterable[Depute]) -> Tuple[Dict[str, int], Dict[str, List[Tuple[str, int]]]]:
+        """Return the row of every député, and the députés with their row by group"""
+        rows: Dict[str, int] = {}
+        rows_by_gp: Dict[str, List[Tuple[str, int]]] = {}
+        for depute in deputes:
+            row: int = rows.setdefault(depute.ref, len(rows))
+            rows_by_gp.setdefault(depute.gp_ref, []).append((depute.ref, row))
+        return rows, rows_by_gp
+
+    @staticmethod
+    def _encode(
+            scrutin: Scrutin,
+            row_count: int,
+            rows_by_gp: Dict[str, List[Tuple[str, int]]]) -> np.ndarray:
+        """Return the column of ballot codes of a scrutin"""
+        ballots: np.ndarray = np.full(row_count, NO_BALLOT, dtype=np.int8)
+        for gp_ref, groupe in scrutin.groupes.items():
+            members: List[Tuple[str, int]] | None = rows_by_gp.get(gp_ref)
+            if not members:
+                continue
+            positions: Dict[str, int] = group_positions(groupe)
+            for ref, row in members:
+                ballots[row] = positions.get(ref, ResultBallot.ABSENT.value)
+        return ballots
+
+    def build(
+            self,
+            deputes: Iterable[Depute],
+            scrutins: Iterable[Scrutin],
+            history: VoteHistory | None = None) -> None:
+        """
+        Encode the ballots of the députés in a single pass over the scrutins.
+
+        Parameters:
+            deputes (Iterable[Depute]): The députés, one row each.
+            scrutins (Iterable[Scrutin]): The scrutins, one column each.
+            history (VoteHistory | None): If given, built during the same pass.
+        """
+        if history is not None:
+            history.start()
+        rows, rows_by_gp = self._index_rows(deputes)
+
+        columns: Dict[str, int] = {}
+        ballots_by_column: List[np.ndarray] = []
+        for scrutin in scrutins:
+            columns[scrutin.ref] = len(columns)
+            ballots_by_column.append(self._encode(scrutin, len(rows), rows_by_gp))
+            if history is not None:
+                history.add(scrutin)
+
+        if ballots_by_column:
+            matrix: np.ndarray = np.stack(ballots_by_column, axis=1)
+        else:
+            matrix = np.full((len(rows), 0), NO_BALLOT, dtype=np.int8)
+
+        self._rows, self._columns, self._ballots = rows, columns, matrix
+        self._path = None
+        if history is not None:
+            history.commit()
+        logger.info("Built vote matrix of %s députés and %s scrutins", *matrix.shape)
+
+    def update(
+            self,
+            previous: VoteMatrix,
+            deputes: Iterable[Depute],
+            numeros: Iterable[str],
+            scrutins: Iterable[Scrutin]) -> bool:
+        """
+        Build the matrix from a previous one, encoding only the given scrutins.
+
+        Parameters:
+            previous (VoteMatrix): The matrix of the previous data, left untouched.
+            deputes (Iterable[Depute]): The députés, must be the rows of the previous matrix.
+            numeros (Iterable[str]): The numero of every scrutin in chronological order,
+                the ones neither in scrutins nor in the previous matrix are skipped.
+            scrutins (Iterable[Scrutin]): The added or modified scrutins.
+
+        Returns:
+            bool: False if the députés are not the ones of the previous matrix, nothing is built then.
+        """
+        rows, rows_by_gp = self._index_rows(deputes)
+        if list(rows) != previous.refs:
+            return False
+
+        encoded: Dict[str, np.ndarray] = {
+            scrutin.ref: self._encode(scrutin, len(rows), rows_by_gp) for scrutin in scrutins
+        }
+        columns: Dict[str, int] = {}
+        for numero in numeros:
+            if numero in encoded or numero in previous._columns:
+                columns[numero] = len(columns)
+
+        matrix: np.ndarray = np.empty((len(rows), len(columns)), dtype=np.int8)
+        kept: List[Tuple[int, int]] = [
+            (column, previous._columns[numero]) for numero, column in columns.items() if numero not in encoded
+        ]
+        if kept:
+            # a single gather of the unchanged columns
+            new_columns, previous_columns = zip(*kept)
+            matrix[:, list(new_columns)] = previous._ballots[:, list(previous_columns)]
+        for numero, ballots in encoded.items():
+            if numero in columns:
+                matrix[:, columns[numero]] = ballots
+
+        self._rows, self._columns, self._ballots = rows, columns, matrix
+        self._path = None
+        logger.info("Updated vote matrix of %s députés and %s scrutins, %s encoded", *matrix.shape, len(encoded))
+        return True
+
+    def save(self, path: Path, source: str = "") -> None:
+        """
+        Write the matrix to a flat file that can be memory-mapped by every bot process.
+
+        The file is replaced atomically, processes which mapped the previous one keep reading it until they reopen.
+
+        Parameters:
+            path (Path): The path of the matrix file.
+            source (str): The source_hash of the data the matrix was built from, see VoteMatrix.source.
+        """
+        index: bytes = json.dumps({"refs": self.refs, "numeros": self.numeros}).encode("utf-8")
+        header_size: int = MATRIX_HEADER.size + len(index)
+        padding: int = -header_size % MATRIX_ALIGNMENT
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # unique, several bot processes may write the matrix at the same time
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+        try:
+            with open(fd, "wb") as f:
+                f.write(MATRIX_HEADER.pack(
+                    MATRIX_MAGIC, MATRIX_VERSION, source.encode("ascii"), *self.shape, len(index)
+                ))
+                f.write(index)
+                f.write(b"\0" * padding)
+                f.write(np.ascontiguousarray(self._ballots).tobytes())
+            os.replace(temp_name, path)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+        logger.info("Vote matrix written to %s", path)
+
+    @staticmethod
+    def source(path: Path) -> str | None:
+        """
+        Return the source hash a matrix file was saved with.
+
+        Parameters:
+            path (Path): The path of the matrix file.
+
+        Returns:
+            str | None: The hash, None if the file does not exist or is not a vote matrix of the current version.
+        """
+        try:
+            with open(path, "rb") as f:
+                header: bytes = f.read(MATRIX_HEADER.size)
+        except OSError:
+            return None
+        if len(header) != MATRIX_HEADER.size:
+            return None
+        magic, version, source, *_ = MATRIX_HEADER.unpack(header)
+        if magic != MATRIX_MAGIC or version != MATRIX_VERSION:
+            return None
+        return bytes(source).rstrip(b"\0").decode("ascii")
+
+    def open(self, path: Path) -> None:
+        """
+        Map the matrix from a file written by save, the ballots are shared with the other processes through the page cache.
+
+        Parameters:
+            path (Path): The path of the matrix file.
+
+        Raises:
+            ValueError: If the file is not a vote matrix of the current version.
+        """
+        with open(path, "rb") as f:
+            header: bytes = f.read(MATRIX_HEADER.size)
+            if len(header) != MATRIX_HEADER.size:
+                raise ValueError(f"{path} is not a vote matrix of version {MATRIX_VERSION}")
+            magic, version, _source, row_count, column_count, index_size = MATRIX_HEADER.unpack(header)
+            if magic != MATRIX_MAGIC or version != MATRIX_VERSION:
+                raise ValueError(f"{path} is not a vote matrix of version {MATRIX_VERSION}")
+            index: Dict[str, List[str]] = json.loads(f.read(index_size))
+
+        header_size: int = MATRIX_HEADER.size + index_size
+        offset: int = header_size + -header_size % MATRIX_ALIGNMENT
+        if row_count and column_count:
+            ballots: np.ndarray = np.memmap(
+                path, dtype=np.int8, mode="r", offset=offset, shape=(row_count, column_count)
+            )
+        else:
+            # an empty region cannot be mapped
+            ballots = np.full((row_count, column_count), NO_BALLOT, dtype=np.int8)
+
+        self._rows = {ref: row for row, ref in enumerate(index["refs"])}
+        self._columns = {numero: column for column, numero in enumerate(index["numeros"])}
+        self._ballots = ballots
+        self._path = path
+        logger.info("Mapped vote matrix of %s députés and %s scrutins from %s", row_count, column_count, path)
+
+    def row(self, ref: str) -> np.ndarray | None:
+        """Return the ballot codes of a député for every scrutin"""
+        row: int | None = self._rows.get(ref)
+        if row is None:
+            return None
+        ballots: np.ndarray = self._ballots[row]
+        return ballots
+
+    def column(self, numero: str) -> np.ndarray | None:
+        """Return the ballot codes of every député for a scrutin, in the order of refs"""
+        column: int | None = self._columns.get(numero)
+        if column is None:
+            return None
+        ballots: np.ndarray = self._ballots[:, column]
+        return ballots
+
+    def result(self, ref: str, numero: str) -> ResultBallot | None:
+        """Return the ballot of a député for a scrutin, as Scrutin.result would"""
+        row: int | None = self._rows.get(ref)
+        column: int | None = self._columns.get(numero)
+        if row is None or column is None:
+            return None
+        code: int = int(self._ballots[row, column])
+        return None if code == NO_BALLOT else ResultBallot(code)
+
+    def counts(self) -> np.ndarray:
+        """Return, for every député, the number of scrutins per ResultBallot code"""
+        return np.stack(
+            [(self._ballots == result.value).sum(axis=1) for result in ResultBallot],
+            axis=1
+        )
+
+    def participation(self, ref: str) -> float | None:
+        """Return the share of scrutins where a député voted pour, contre or abstention"""
+        ballots: np.ndarray | None = self.row(ref)
+        if ballots is None:
+            return None
+        applicable: int = int((ballots != NO_BALLOT).sum())
+        if not applicable:
+            return None
+        return float(np.isin(ballots, EXPRESSED).sum()) / applicable
+
+    def similarity(self, ref: str, other_ref: str) -> float | None:
+        """Return the share of identical ballots over the scrutins where both députés expressed a vote"""
+        ballots: np.ndarray | None = self.row(ref)
+        other_ballots: np.ndarray | None = self.row(other_ref)
+        if ballots is None or other_ballots is None:
+            return None
+        both: np.ndarray = np.isin(ballots, EXPRESSED) & np.isin(other_ballots, EXPRESSED)
+        if not both.any():
+            return None
+        return float((ballots[both] == other_ballots[both]).mean())
+
+
+class VoteHistory:
+    """Inverted index from acteur reference to the scrutins they voted in and their position"""
+
+    def __init__(self) -> None:
+        self._numeros: Dict[str, np.ndarray] = {}
+        self._positions: Dict[str, np.ndarray] = {}
+        self._staging: Dict[str, Tuple[array[int], array[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._numeros)
+
+    def __contains__(self, ref: str) -> bool:
+        return ref in self._numeros
+
+    def start(self) -> None:
+        """Start building a new index, the current one is served until commit"""
+        self._staging = {}
+
+    def add(self, scrutin: Scrutin) -> None:
+        """Record the nominative ballots of a scrutin, scrutins must be added in chronological order"""
+        numero: int = int(scrutin.ref)
+        for groupe in scrutin.groupes.values():
+            for position, result in POSITIONS:
+                for ref in groupe[position]:
+                    numeros, positions = self._staging.setdefault(ref, (array("i"), array("b")))
+                    numeros.append(numero)
+                    positions.append(result.value)
+
+    def commit(self) -> None:
+        """Replace the served index by the one built since start"""
+        staging: Dict[str, Tuple[array[int], array[int]]] = self._staging
+        self._numeros = {ref: np.frombuffer(numeros, dtype=np.int32) for ref, (numeros, _) in staging.items()}
+        self._positions = {ref: np.frombuffer(positions, dtype=np.int8) for ref, (_, positions) in staging.items()}
+        self._staging = {}
+        logger.info("Built vote history of %s acteurs", len(self._numeros))
+
+    def update(self, previous: VoteHistory, scrutins: Iterable[Scrutin], dropped: Iterable[str]) -> None:
+        """
+        Build the index from a previous one, adding only the given scrutins.
+
+        Parameters:
+            previous (VoteHistory): The index of the previous data, left untouched.
+            scrutins (Iterable[Scrutin]): The added or modified scrutins.
+            dropped (Iterable[str]): The numeros of the modified and removed scrutins, forgotten from previous.
+        """
+        self.start()
+        for scrutin in scrutins:
+            self.add(scrutin)
+        staging: Dict[str, Tuple[array[int], array[int]]] = self._staging
+        dropped_numeros: np.ndarray = np.array([int(numero) for numero in dropped], dtype=np.int32)
+
+        numeros_by_ref: Dict[str, np.ndarray] = {}
+        positions_by_ref: Dict[str, np.ndarray] = {}
+        for ref in previous._numeros.keys() | staging.keys():
+            numeros: np.ndarray = previous._numeros.get(ref, np.empty(0, dtype=np.int32))
+            positions: np.ndarray = previous._positions.get(ref, np.empty(0, dtype=np.int8))
+            if len(dropped_numeros):
+                kept: np.ndarray = ~np.isin(numeros, dropped_numeros)
+                numeros, positions = numeros[kept], positions[kept]
+            if ref in staging:
+                added_numeros, added_positions = staging[ref]
+                numeros = np.concatenate((numeros, np.frombuffer(added_numeros, dtype=np.int32)))
+                positions = np.concatenate((positions, np.frombuffer(added_positions, dtype=np.int8)))
+                order: np.ndarray = np.argsort(numeros, kind="stable")
+                numeros, positions = numeros[order], positions[order]
+            if len(numeros):
+                numeros_by_ref[ref], positions_by_ref[ref] = numeros, positions
+
+        self._numeros, self._positions, self._staging = numeros_by_ref, positions_by_ref, {}
+        logger.info("Updated vote history of %s acteurs", len(self._numeros))
+
+    def history(
+            self,
+            ref: str,
+            position: ResultBallot | None = None,
+            limit: int | None = None) -> List[Tuple[str, ResultBallot]]:
+        """
+        Return the scrutins an acteur voted in with their position, most recent first.
+
+        Parameters:
+            ref (str): The acteur reference.
+            position (ResultBallot | None): If given, only the scrutins with this position.
+            limit (int | None): The maximum number of scrutins returned.
+        """
+        numeros: np.ndarray | None = self._numeros.get(ref)
+        if numeros is None:
+            return []
+        positions: np.ndarray = self._positions[ref]
+        if position is not None:
+            selected: np.ndarray = positions == position.value
+            numeros, positions = numeros[selected], positions[selected]
+        numeros, positions = numeros[::-1][:limit], positions[::-1][:limit]
+        return [(str(numero), ResultBallot(int(code))) for numero, code in zip(numeros, positions)]
+
+    def count(self, ref: str, position: ResultBallot) -> int:
+        """Return the number of scrutins where an acteur voted with the given position"""
+        positions: np.ndarray | None = self._positions.get(ref)
+        if positions is None:
+            return 0
+        return int((positions == position.value).sum())
+
+
+class VoteStatistics:
+    """Vote counters of every member of parliament, computed once after each update"""
+
+    # display order of the counters
+    KEYS: Tuple[ResultBallot, ...] = (
+        ResultBallot.ABSENT,
+        ResultBallot.POUR,
+        ResultBallot.CONTRE,
+        ResultBallot.ABSTENTION,
+        ResultBallot.NONVOTANT,
+    )
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def compute(self, matrix: VoteMatrix) -> None:
+        """
+        Count the votes of every député from the vote matrix.
+
+        Parameters:
+            matrix (VoteMatrix): The ballots of every député.
+        """
+        counts: np.ndarray = matrix.counts()
+        self._stats = {
+            ref: {result.name.lower(): int(counts[row, result.value]) for result in self.KEYS}
+            for row, ref in enumerate(matrix.refs)
+        }
+        logger.info("Computed vote statistics for %s députés", len(self._stats))
+
+    def get(self, ref: str) -> Dict[str, int]:
+        """Return the vote counters of the député with the given acteur reference"""
+        stats: Dict[str, int] | None = self._stats.get(ref)
+        if stats is None:
+            return {result.name.lower(): 0 for result in self.KEYS}
+        return dict(stats)